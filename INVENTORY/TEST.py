@@ -1,62 +1,236 @@
-from typing import Any
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Sequence
+from itertools import islice, zip_longest
+import asyncio
 import flet as ft
 import sqlite3
 
 
 import flet as ft
 import sqlite3
+from sqlite_pool import ConnectionPool
+from async_db import AsyncDatabase
+from read_cache import ReadCache
+from sql_builder import SqlBuilder, quote_identifier
+from column_types import CONVERTERS, cell_formatter, column_type, to_column_value
+from migrations import CATALOG_MIGRATIONS, CATEGORY_TABLE, add_missing_columns, create_index, migrate
+from reports import REPORT_COLUMNS, price_category_names, report_cells
+from catalog_cache import CACHE_PATH, CatalogCache
+
+# Rows handed to executemany at a time by the *_many helpers; the whole batch
+# is still one transaction, only the Python-side buffering is bounded
+BATCH_CHUNK_SIZE = 500
+# Rows fetched per round trip by the streaming readers
+READ_CHUNK_SIZE = 500
+# Small tables every screen reads; table_reader serves them from Database.cache
+CACHED_TABLES = {CATEGORY_TABLE}
+# Where the Reports scene exports to; one CSV per report
+REPORT_EXPORT_PATH = "reports.csv"
+
+
+def chunked(rows: Iterable, size: int = BATCH_CHUNK_SIZE) -> Iterator[List]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def paired(rows: Iterable[Sequence], extra: Iterable[Any]) -> Iterator[tuple]:
+    """(*row, value) for each row and its value from extra, lazily; ValueError
+    once either runs out before the other instead of dropping the leftovers"""
+    missing = object()
+    for row, value in zip_longest(rows, extra, fillvalue=missing):
+        if row is missing or value is missing:
+            raise ValueError("Every row needs exactly one condition value")
+        yield (*row, value)
 
 class Database:
-    def __init__(self, db_path="mydb.db"):
+    def __init__(self, db_path="mydb.db", catalog_path=CACHE_PATH):
         self.db_path = db_path
+        # main.py's local catalog, which the Reports scene summarizes
+        self.catalog_path = catalog_path
+        self._reports = None
+        self.pool = ConnectionPool.for_path(db_path)
+        self.sql = SqlBuilder(self.get_connection)
+        migrate(self.get_connection(), CATALOG_MIGRATIONS)
+        # Awaitable reads/writes for async handlers (see async_db)
+        self.aio = AsyncDatabase(self.pool)
+        self.cache = ReadCache.for_path(db_path)
+
+    @property
+    def reports(self):
+        """Precomputed stock summaries of the app's catalog (see reports.py), with
+        price categories from this database; opened on first use"""
+        if self._reports is None:
+            self._reports = CatalogCache(self.catalog_path).reports(
+                lambda: price_category_names(self.get_connection()))
+        return self._reports
         
     def get_connection(self):
-        """Create a new connection for each operation (thread-safe)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Long-lived WAL connection for the calling thread (see sqlite_pool)"""
+        return self.pool.get()
+
+    def invalidate(self, table):
+        """Call after committing a change to table"""
+        self.cache.invalidate(table)
+
+    def close(self):
+        self.aio.close()
+        self.pool.close_all()
 
 class Parent:
-    def __init__(self, page: ft.Page):
+    def __init__(self, page: ft.Page, db_path="mydb.db"):
         self.page = page
-        self.db = Database()
+        self.db = Database(db_path)
         
-    def table_creater(self, name, listofcolumns=None):
+    def table_creater(self, name, listofcolumns=None, indexed=()):
+        """
+        Creates table name if needed and adds any of listofcolumns it lacks.
+        listofcolumns is a list of names (stored as TEXT) or a dict of
+        name -> category datatype ("numbers", "price", ...) for typed columns.
+        Each column in indexed gets an index, for sorting and table_range.
+        Tables the app itself relies on are created by migrations.py instead.
+        """
+        if listofcolumns and not isinstance(listofcolumns, dict):
+            listofcolumns = dict.fromkeys(listofcolumns, "text")
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(f'CREATE TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY)')
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS {quote_identifier(name)} (id INTEGER PRIMARY KEY)')
             if listofcolumns:
-                for col in listofcolumns:
-                    try:
-                        cursor.execute(f'ALTER TABLE {name} ADD COLUMN {col} TEXT')
-                    except sqlite3.Error:
-                        pass  # Column already exists
+                columns = {col: column_type(datatype) for col, datatype in listofcolumns.items()}
+                if add_missing_columns(conn, name, columns):
+                    self.db.sql.invalidate(name)
+            for col in indexed:
+                create_index(conn, name, [col])
             conn.commit()
+        self.db.invalidate(name)
+
+    def item_table_creater(self, name, indexed=()):
+        """
+        Creates/extends an item table with one typed column per category,
+        e.g. a "price" category becomes a REAL column that sorts and filters numerically.
+        """
+        categories = self.table_reader(CATEGORY_TABLE, ["name", "datatype"])
+        self.table_creater(name, {row["name"]: row["datatype"] for row in categories}, indexed)
+
+    def table_range(self, name, column, low=None, high=None, listofcolumns=None):
+        """
+        Rows whose column lies between low and high (inclusive, either may be None),
+        ordered by column. Bounds are converted like stored values, so
+        table_range("items", "price", "$10", "$25") compares numbers, and an index on
+        column (see table_creater) turns it into an index range scan.
+        """
+        declared = self.db.sql.types(name).get(column, "TEXT")
+        bounds = [to_column_value(declared, bound) for bound in (low, high) if bound is not None]
+        query = self.db.sql.select_range(name, column, listofcolumns, low is not None, high is not None)
+        return self.db.get_connection().execute(query, bounds).fetchall()
 
     def table_reader(self, name, listofcolumns=None):
+        if name in CACHED_TABLES:
+            return list(self.db.cache.get(name, tuple(listofcolumns or ()), lambda: self._read_table(name, listofcolumns)))
+        return self._read_table(name, listofcolumns)
+
+    def _read_table(self, name, listofcolumns=None):
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            if not listofcolumns:
-                cursor.execute(f'SELECT * FROM {name}')
-            else:
-                cols = ", ".join(listofcolumns)
-                cursor.execute(f'SELECT {cols} FROM {name}')
+            cursor.execute(self.db.sql.select(name, listofcolumns))
             return cursor.fetchall()
 
+    def table_stream(self, name, listofcolumns=None, chunk_size=READ_CHUNK_SIZE) -> Iterator[sqlite3.Row]:
+        """
+        table_reader as a generator: rows come off the cursor chunk_size at a time,
+        so memory stays flat however big the table is. Consume it on one thread.
+        """
+        cursor = self.db.get_connection().execute(self.db.sql.select(name, listofcolumns))
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            cursor.close()
+
+    def table_page(self, name, listofcolumns=None, after=None, limit=READ_CHUNK_SIZE, key="id") -> List[sqlite3.Row]:
+        """
+        Up to limit rows whose key is greater than after (None = first page), ordered by key.
+        Pass the last row's key as after to get the next page; unlike OFFSET this
+        costs the same on page 1000 as on page 1.
+        """
+        query = self.db.sql.select_page(name, listofcolumns, key, first=after is None)
+        params = (limit,) if after is None else (after, limit)
+        return self.db.get_connection().execute(query, params).fetchall()
+
+    def table_pages(self, name, listofcolumns=None, page_size=READ_CHUNK_SIZE, key="id") -> Iterator[List[sqlite3.Row]]:
+        """Every keyset page of table_page in order, for paged views and batch jobs"""
+        after = None
+        while True:
+            page = self.table_page(name, listofcolumns, after, page_size, key)
+            if not page:
+                return
+            yield page
+            after = page[-1][key]
+
+    def table_query(self, name, listofcolumns=None, order_by="id", descending=False, filters=None,
+                    limit=READ_CHUNK_SIZE, offset=0) -> List[sqlite3.Row]:
+        """
+        One page of name sorted by order_by and narrowed by filters, all done in SQL,
+        for grids that show a page at a time. filters maps column -> value: TEXT
+        columns match rows containing the value, typed columns rows equal to it
+        (converted like stored values, so {"salary": "$50,000"} works).
+        With an index on order_by (see table_creater) a page costs the same
+        however big the table is; deep offsets still step over the skipped rows.
+        """
+        shape, params = self._filter_params(name, filters)
+        query = self.db.sql.select_sorted(name, listofcolumns, order_by, descending, shape)
+        return self.db.get_connection().execute(query, (*params, limit, offset)).fetchall()
+
+    def table_count(self, name, filters=None) -> int:
+        """Number of rows table_query pages through for these filters"""
+        shape, params = self._filter_params(name, filters)
+        return self.db.get_connection().execute(self.db.sql.count(name, shape), params).fetchone()[0]
+
+    def column_formatters(self, name, listofcolumns=None):
+        """
+        Display formatter for each of listofcolumns (all columns if None), in order,
+        from the declared column types; pair them with the values of a projected row.
+        """
+        types = self.db.sql.types(name)
+        return [cell_formatter(types[col]) for col in (listofcolumns or types)]
+
+    def _filter_params(self, name, filters):
+        types = self.db.sql.types(name)
+        shape, params = [], []
+        for col, value in (filters or {}).items():
+            declared = types.get(col, "TEXT")
+            if declared == "TEXT":
+                escaped = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                shape.append((col, "like"))
+                params.append(f"%{escaped}%")
+            else:
+                shape.append((col, "="))
+                params.append(to_column_value(declared, value))
+        return shape, params
+
+    async def table_stream_async(self, name, listofcolumns=None, chunk_size=READ_CHUNK_SIZE, key="id") -> AsyncIterator[sqlite3.Row]:
+        """
+        Async iterator over the rows of name for async Flet handlers.
+        Each keyset page is read on a worker thread, so the event loop never waits on SQLite.
+        """
+        after = None
+        while True:
+            page = await asyncio.to_thread(self.table_page, name, listofcolumns, after, chunk_size, key)
+            if not page:
+                return
+            for row in page:
+                yield row
+            after = page[-1][key]
+
     def table_writer(self, name, data_dict):
         with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            columns = list(data_dict.keys())
-            values = list(zip(*data_dict.values()))
-            
-            placeholders = ", ".join(["?"] * len(columns))
-            cols = ", ".join(columns)
-            
-            cursor.executemany(
-                f'INSERT INTO {name} ({cols}) VALUES ({placeholders})',
-                values
-            )
+            self._insert_rows(conn, name, data_dict)
             conn.commit()
+        self.db.invalidate(name)
     
     
     
@@ -68,10 +242,10 @@ class Parent:
         """
         with self.db.get_connection() as conn:
             try:
-                cursor = conn.cursor()
-                query = f'DELETE FROM {table_name} WHERE {condition_column} = ?'
-                cursor.execute(query, (condition_value,))
+                deleted = self._delete_rows(conn, table_name, condition_column, condition_value)
                 conn.commit()
+                self.db.invalidate(table_name)
+                return deleted
             except Exception as e:
                 raise ValueError(f"Modification failed: {str(e)}")
           
@@ -79,14 +253,150 @@ class Parent:
     def item_modifier(self, table_name, columns, values, condition_col, condition_val):
         try:
             with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                set_clause = ", ".join([f"{col} = ?" for col in columns])
-                query = f"UPDATE {table_name} SET {set_clause} WHERE {condition_col} = ?"
-                params = [*values, condition_val]
-                cursor.execute(query, params)
+                self._update_rows(conn, table_name, columns, values, condition_col, condition_val)
                 conn.commit()
+            self.db.invalidate(table_name)
+        except Exception as e:
+            raise ValueError(f"Modification failed: {str(e)}")
+
+    def _insert_rows(self, conn, name, data_dict):
+        columns = list(data_dict.keys())
+        values = list(zip(*data_dict.values()))
+        convert = self._row_converter(name, columns)
+        if convert:
+            values = [convert(row) for row in values]
+        return conn.executemany(self.db.sql.insert(name, columns), values).rowcount
+
+    def _delete_rows(self, conn, table_name, condition_column, condition_value):
+        query = self.db.sql.delete(table_name, condition_column)
+        return conn.execute(query, (condition_value,)).rowcount
+
+    def _update_rows(self, conn, table_name, columns, values, condition_col, condition_val):
+        query = self.db.sql.update(table_name, columns, condition_col)
+        params = [*values, condition_val]
+        convert = self._row_converter(table_name, [*columns, condition_col])
+        if convert:
+            params = convert(params)
+        return conn.execute(query, params).rowcount
+
+    # Awaitable versions for async handlers. Reads run on a reader thread; writes
+    # go to the writer thread, which commits bursts of them as one transaction.
+    async def table_reader_async(self, name, listofcolumns=None):
+        cached = self.db.cache.peek(name, tuple(listofcolumns or ())) if name in CACHED_TABLES else None
+        if cached is not None:
+            return list(cached)  # no thread hop for a cache hit
+        return await self.db.aio.read(lambda conn: self.table_reader(name, listofcolumns))
+
+    async def table_writer_async(self, name, data_dict):
+        inserted = await self.db.aio.write(lambda conn: self._insert_rows(conn, name, data_dict))
+        self.db.invalidate(name)
+        return inserted
+
+    async def item_deleter_async(self, table_name, condition_column, condition_value):
+        try:
+            deleted = await self.db.aio.write(
+                lambda conn: self._delete_rows(conn, table_name, condition_column, condition_value)
+            )
+        except Exception as e:
+            raise ValueError(f"Modification failed: {str(e)}")
+        self.db.invalidate(table_name)
+        return deleted
+
+    async def item_modifier_async(self, table_name, columns, values, condition_col, condition_val):
+        try:
+            modified = await self.db.aio.write(
+                lambda conn: self._update_rows(conn, table_name, columns, values, condition_col, condition_val)
+            )
         except Exception as e:
             raise ValueError(f"Modification failed: {str(e)}")
+        self.db.invalidate(table_name)
+        return modified
+
+    def upsert_many(self, table_name: str, columns: Sequence[str], rows: Iterable[Sequence],
+                    key_columns: Sequence[str] = ("id",)) -> int:
+        """
+        Inserts rows, updating the other columns of any row whose key_columns already match.
+        rows are value sequences in the order of columns; key_columns must be among columns.
+        A UNIQUE index on key_columns is created if the table doesn't have one yet.
+        Runs as one transaction; returns the number of rows written.
+        Example: upsert_many("category", ["name", "datatype"], [("size", "numbers")], ["name"])
+        """
+        missing = [col for col in key_columns if col not in columns]
+        if missing:
+            raise ValueError(f"Key columns missing from columns: {', '.join(missing)}")
+        query = self.db.sql.upsert(table_name, columns, key_columns)
+        convert = self._row_converter(table_name, columns)
+        if convert:
+            rows = map(convert, rows)
+        return self._run_many(table_name, query, rows, before=lambda cursor: self._ensure_unique(cursor, table_name, key_columns))
+
+    def modify_many(self, table_name: str, columns: Sequence[str], values: Iterable[Sequence],
+                    condition_col: str, condition_vals: Iterable[Any]) -> int:
+        """
+        Batch item_modifier: row i of values is written where condition_col = condition_vals[i].
+        Runs as one transaction; returns the number of rows changed. Raises ValueError
+        (and changes nothing) if values and condition_vals differ in length.
+        Example: modify_many("category", ["datatype"], [("text",), ("date",)], "id", [1, 2])
+        """
+        query = self.db.sql.update(table_name, columns, condition_col)
+        rows = paired(values, condition_vals)
+        convert = self._row_converter(table_name, [*columns, condition_col])
+        if convert:
+            rows = map(convert, rows)
+        return self._run_many(table_name, query, rows)
+
+    def delete_many(self, table_name: str, condition_column: str, condition_values: Iterable[Any]) -> int:
+        """
+        Batch item_deleter: deletes rows whose condition_column is any of condition_values.
+        Runs as one transaction; returns the number of rows deleted.
+        Example: delete_many("category", "id", [3, 4, 5])
+        """
+        query = self.db.sql.delete(table_name, condition_column)
+        return self._run_many(table_name, query, ((val,) for val in condition_values))
+
+    def _row_converter(self, table_name, columns):
+        """Function mapping a row of user input for columns to stored values
+        (see column_types), or None when every column is plain TEXT"""
+        types = self.db.sql.types(table_name)
+        declared = [types.get(col, "TEXT") for col in columns]
+        if not any(t in CONVERTERS for t in declared):
+            return None
+
+        def convert(row):
+            stored = []
+            for col, t, value in zip(columns, declared, row):
+                try:
+                    stored.append(to_column_value(t, value))
+                except ValueError as e:
+                    raise ValueError(f"{table_name}.{col}: {e}")
+            return stored
+        return convert
+
+    def _ensure_unique(self, cursor, table_name, key_columns):
+        if tuple(key_columns) == ("id",):
+            return  # INTEGER PRIMARY KEY from table_creater
+        index_name = quote_identifier(f"ux_{table_name}_{'_'.join(key_columns)}")
+        cursor.execute(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS {index_name} ON {quote_identifier(table_name)} "
+            f"({', '.join(map(quote_identifier, key_columns))})"
+        )
+
+    def _run_many(self, table_name, query, rows, before=None):
+        """executemany over rows in BATCH_CHUNK_SIZE chunks inside a single transaction"""
+        conn = self.db.get_connection()
+        total = 0
+        try:
+            with conn:  # commits once at the end, rolls the whole batch back on error
+                cursor = conn.cursor()
+                if before:
+                    before(cursor)
+                for chunk in chunked(rows):
+                    cursor.executemany(query, chunk)
+                    total += cursor.rowcount
+        except sqlite3.Error as e:
+            raise ValueError(f"Batch modification failed: {str(e)}")
+        self.db.invalidate(table_name)
+        return total
             
     def main_scene(self):
         self.page.controls.clear()  # Clear existing controls
@@ -217,7 +527,7 @@ class Parent:
         content=ft.Column(controls=[add_group_row4], alignment=ft.MainAxisAlignment.CENTER),
         alignment=ft.alignment.center,
         padding=15,
-        on_click=lambda e: (self.manage_category_scene(None)),
+        on_click=self.manage_category_scene,
         ink=True,
         ink_color=ft.Colors.AMBER_100)
 
@@ -294,14 +604,39 @@ class Parent:
 
     def show_reports_scene(self, e):
         self.page.controls.clear()
+        status = ft.Text()
+
+        def export_reports(e):
+            try:
+                status.value = "Exported " + ", ".join(self.db.reports.export(REPORT_EXPORT_PATH))
+            except OSError as ex:
+                status.value = f"Export failed: {ex}"
+            self.page.update()
+
+        sections = []
+        # Read from the summary tables, so this costs O(groups), not O(items)
+        for name, rows in self.db.reports.all().items():
+            sections.append(ft.Text(name.replace("_", " ").upper(), size=16, weight=ft.FontWeight.BOLD))
+            if not rows:
+                sections.append(ft.Text("Nothing to show"))
+                continue
+            sections.append(ft.DataTable(
+                columns=[ft.DataColumn(ft.Text(column)) for column in REPORT_COLUMNS[name]],
+                rows=[ft.DataRow(cells=[ft.DataCell(ft.Text(text)) for text in report_cells(name, row)]) for row in rows]
+            ))
         self.page.add(
             ft.Container(
                 content=ft.Column([
                     ft.Text("Reports Scene", size=20, weight=ft.FontWeight.BOLD),
-                    ft.Text("View reports here."),
-                    ft.ElevatedButton("Back to Main Menu", on_click=self.back_to_main)
-                ]),
-                alignment=ft.alignment.center
+                    *sections,
+                    ft.Row([
+                        ft.ElevatedButton("Export CSV", on_click=export_reports),
+                        ft.ElevatedButton("Back to Main Menu", on_click=self.back_to_main)
+                    ]),
+                    status
+                ], scroll=ft.ScrollMode.AUTO),
+                alignment=ft.alignment.center,
+                expand=True
             )
         )
         self.page.update()
@@ -313,8 +648,20 @@ class Parent:
         page = self.page
         page.theme_mode = ft.ThemeMode.DARK if page.theme_mode == ft.ThemeMode.LIGHT else ft.ThemeMode.LIGHT
         page.update()
+
+    def show_snackbar(self, message, color=ft.Colors.GREEN_400):
+        """Short floating message, as CHATGPT_TEXT's UIUtils.show_snackbar"""
+        self.page.snack_bar = ft.SnackBar(
+            content=ft.Text(message),
+            bgcolor=color,
+            behavior=ft.SnackBarBehavior.FLOATING,
+            duration=3000,
+            show_close_icon=True
+        )
+        self.page.snack_bar.open = True
+        self.page.update()
     
-    def manage_category_scene(self,e):
+    async def manage_category_scene(self,e):
         self.page.controls.clear()
         main_text = ft.Text("EDIT CATEGORY", size=25, weight=ft.FontWeight.BOLD)
         exit_button = ft.IconButton(ft.Icons.EXIT_TO_APP_ROUNDED, on_click=self.show_inventory_scene)
@@ -323,7 +670,7 @@ class Parent:
          controls=[
             ft.Container(content=exit_button, alignment=ft.alignment.top_left),
             ft.Container(content=main_text, alignment=ft.alignment.center, expand=True)])
-        categ_temp=self.table_reader("category")
+        categ_temp=await self.table_reader_async("category")
         categ_list=[dict(x) for x in categ_temp] 
         
         item_tile=[ft.Container(content=ft.Row(controls=[ft.ListTile(
@@ -342,11 +689,8 @@ class Parent:
         
         
         
-    def add_category_scene(self,e):
-        categ_keys=["name","datatype","null_status"]
-        
-        self.table_creater("category",categ_keys)
-        categ_temp=self.table_reader("category",["name"])
+    async def add_category_scene(self,e):
+        categ_temp=await self.table_reader_async("category",["name"])
         categ_name_list=[row["name"] for row in categ_temp]
         print(categ_name_list)
         self.page.controls.clear()
@@ -379,13 +723,30 @@ class Parent:
             thumb_color=ft.Colors.WHITE24)
         
         
+        async def button_function_save(e):
+            if not text11.value or not text21.value:
+                return  # Don't save if required fields are empty
+                
+            # Correct dictionary construction
+            dict_temp = {
+                "name": [text11.value],
+                "datatype": [text21.value],
+                "null_status": [switch.value]
+            }
+            try:
+                await self.table_writer_async("category", dict_temp)
+            except sqlite3.IntegrityError:
+                self.show_snackbar(f"Category {text11.value!r} already exists", ft.Colors.RED_400)
+                return
+            await self.add_category_scene(None)  # Refresh the scene
+        
         text4=ft.Text(" SAVE ",size=25, weight=ft.FontWeight.BOLD)
         icon=ft.Icon(ft.Icons.WAREHOUSE_SHARP)
         save_button=ft.Container(
             content=ft.Column(controls=[text4,icon],
             alignment=ft.MainAxisAlignment.CENTER,  
             horizontal_alignment=ft.CrossAxisAlignment.CENTER ),
-            on_click=lambda e :(button_function_save(None)),
+            on_click=button_function_save,
             ink=True,
             alignment=ft.alignment.center,
             ink_color=ft.Colors.AMBER_100)
@@ -396,7 +757,7 @@ class Parent:
                 content=ft.Column(controls=[text6,icon6],
                 alignment=ft.MainAxisAlignment.CENTER,  
                 horizontal_alignment=ft.CrossAxisAlignment.CENTER ),
-                on_click=lambda e :(self.manage_category_scene(None)),
+                on_click=self.manage_category_scene,
                 ink=True,
                 alignment=ft.alignment.center,
                 ink_color=ft.Colors.AMBER_100)
@@ -432,26 +793,13 @@ class Parent:
             content=ft.Column(controls=[text5,icon1],
             alignment=ft.MainAxisAlignment.CENTER,  
             horizontal_alignment=ft.CrossAxisAlignment.CENTER ),
-            on_click=lambda e:(self.add_category_scene(None),),
+            on_click=self.add_category_scene,
             ink=True,
             alignment=ft.alignment.center,
             ink_color=ft.Colors.AMBER_100)
         
         buttonrow=ft.Row(controls=[save_button,cancel_button,delete_button],alignment=ft.MainAxisAlignment.CENTER)
         
-        def button_function_save(e):
-            if not text11.value or not text21.value:
-                return  # Don't save if required fields are empty
-                
-            # Correct dictionary construction
-            dict_temp = {
-                "name": [text11.value],
-                "datatype": [text21.value],
-                "null_status": [switch.value]
-            }
-            self.table_writer("category", dict_temp)
-            self.add_category_scene(None)  # Refresh the scene
-        
         temp1=ft.Row(controls=[
             ft.Container(content=text1),
             ft.Container(content=text11)],
@@ -0,0 +1,178 @@
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from column_types import CONVERTERS
+
+# ========== CONSTANTS ==========
+# Characteristic types (InventoryGroup.characteristics[...]["type"]) stored as float columns;
+# every other type is stored as category codes
+NUMBER_TYPES = {"number"}
+MISSING_CODE = -1
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def merged_schema(groups: Mapping[str, Any],
+                  global_characteristics: Optional[Mapping[str, Dict]] = None) -> Dict[str, Dict]:
+    """One {characteristic: spec} schema over every group (InventoryGroup or stored
+    group dict) plus the global characteristics. A name that is a number in any
+    group is a number column."""
+    schema: Dict[str, Dict] = dict(global_characteristics or {})
+    for group in groups.values():
+        characteristics = group["characteristics"] if isinstance(group, dict) else group.characteristics
+        for name, spec in (characteristics or {}).items():
+            if name not in schema or spec.get("type") in NUMBER_TYPES:
+                schema[name] = spec
+    return schema
+
+
+def _to_float(value: Any) -> float:
+    if value is None or value == "":
+        return math.nan
+    try:
+        return CONVERTERS["REAL"](value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _factorize(values: Iterable[Any], count: int, labels: List[str]) -> np.ndarray:
+    """int32 codes into labels (extended in place with unseen values); MISSING_CODE for None"""
+    index = {label: code for code, label in enumerate(labels)}
+
+    def code(value):
+        if value is None or value == "":
+            return MISSING_CODE
+        found = index.get(value)
+        if found is None:
+            found = index[value] = len(labels)
+            labels.append(value)
+        return found
+    return np.fromiter(map(code, values), dtype=np.int32, count=count)
+
+
+# ========== COLUMNAR BATCH ==========
+class ItemColumns:
+    """Item characteristics laid out as typed NumPy columns, one per characteristic
+    of the schema, so reports run as vectorized array operations instead of
+    Python loops over self.items.
+
+    Number characteristics are float64 arrays with NaN where an item has no
+    (or no numeric) value. Other characteristics, and the group, are int32
+    codes into a label list (dropdown options first), MISSING_CODE where unset.
+    Build once with from_items and query many times; it's a snapshot, so
+    rebuild it after the items change."""
+
+    def __init__(self, ids: List[str], schema: Dict[str, Dict], numbers: Dict[str, np.ndarray],
+                 codes: Dict[str, np.ndarray], labels: Dict[str, List[str]]):
+        self.ids = ids
+        self.schema = schema
+        self.numbers = numbers
+        self.codes = codes
+        self.labels = labels
+
+    @classmethod
+    def from_items(cls, items: Mapping[str, Any], schema: Dict[str, Dict]) -> "ItemColumns":
+        """items maps id -> InventoryItem or stored item dict; schema is
+        {characteristic: {type, min, max, options}} (see merged_schema)"""
+        ids = list(items)
+        count = len(ids)
+        groups, characteristics = [], []
+        for item in items.values():
+            if isinstance(item, dict):
+                groups.append(item.get("group"))
+                characteristics.append(item.get("characteristics") or {})
+            else:
+                groups.append(item.group)
+                characteristics.append(item.characteristics)
+
+        numbers, codes, labels = {}, {}, {"group": []}
+        codes["group"] = _factorize(groups, count, labels["group"])
+        for name, spec in schema.items():
+            values = (chars.get(name) for chars in characteristics)
+            if spec.get("type") in NUMBER_TYPES:
+                try:
+                    # Fast path: values are already numbers (as save_item stores them) or missing
+                    numbers[name] = np.fromiter(
+                        (math.nan if value is None else value for value in values), dtype=np.float64, count=count
+                    )
+                except (TypeError, ValueError):
+                    numbers[name] = np.fromiter(
+                        (_to_float(chars.get(name)) for chars in characteristics), dtype=np.float64, count=count
+                    )
+            else:
+                labels[name] = list(spec.get("options") or [])
+                codes[name] = _factorize(values, count, labels[name])
+        return cls(ids, schema, numbers, codes, labels)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _number(self, column: str) -> np.ndarray:
+        if column not in self.numbers:
+            raise ValueError(f"Not a number characteristic: {column}")
+        return self.numbers[column]
+
+    def _codes(self, by: str) -> Tuple[np.ndarray, List[str]]:
+        if by not in self.codes:
+            raise ValueError(f"Can't group by: {by}")
+        return self.codes[by], self.labels[by]
+
+    # ----- group-bys -----
+    def count_by(self, by: str = "group") -> Dict[str, int]:
+        """Items per value of by (the group or a non-number characteristic)"""
+        codes, labels = self._codes(by)
+        counts = np.bincount(codes[codes >= 0], minlength=len(labels))
+        return {label: int(n) for label, n in zip(labels, counts) if n}
+
+    def sum_by(self, column: str, by: str = "group") -> Dict[str, float]:
+        """Sum of a number characteristic per value of by; items without a value add nothing"""
+        sums, counts, labels = self._sums(column, by)
+        return {label: float(total) for label, total, n in zip(labels, sums, counts) if n}
+
+    def mean_by(self, column: str, by: str = "group") -> Dict[str, float]:
+        sums, counts, labels = self._sums(column, by)
+        return {label: float(total / n) for label, total, n in zip(labels, sums, counts) if n}
+
+    def _sums(self, column: str, by: str):
+        values = self._number(column)
+        codes, labels = self._codes(by)
+        present = (codes >= 0) & ~np.isnan(values)
+        sums = np.bincount(codes[present], weights=values[present], minlength=len(labels))
+        counts = np.bincount(codes[present], minlength=len(labels))
+        return sums, counts, labels
+
+    # ----- distributions -----
+    def histogram(self, column: str, bins: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+        """(counts, bin edges) of a number characteristic. The range is the
+        schema's min/max where set, else the data's; values outside it are left out."""
+        values = self._number(column)
+        values = values[~np.isnan(values)]
+        spec = self.schema.get(column, {})
+        low = spec.get("min") if spec.get("min") is not None else (values.min() if values.size else 0.0)
+        high = spec.get("max") if spec.get("max") is not None else (values.max() if values.size else 1.0)
+        return np.histogram(values, bins=bins, range=(low, high))
+
+    def percentiles(self, column: str, qs: Sequence[float] = DEFAULT_PERCENTILES,
+                    by: Optional[str] = None) -> Dict:
+        """{q: value} over all items, or {label: {q: value}} per value of by.
+        Linear interpolation between closest ranks, like numpy.percentile."""
+        values = self._number(column)
+        if by is None:
+            present = values[~np.isnan(values)]
+            if not present.size:
+                return {}
+            return {q: float(v) for q, v in zip(qs, np.percentile(present, qs))}
+
+        codes, labels = self._codes(by)
+        present = (codes >= 0) & ~np.isnan(values)
+        codes, values = codes[present], values[present]
+        # A stable sort on the int codes (a radix sort) puts each group's values in
+        # one contiguous run; np.percentile then partitions each run, no full sort
+        values = values[np.argsort(codes, kind="stable")]
+        counts = np.bincount(codes, minlength=len(labels))
+        ends = np.cumsum(counts)
+        return {
+            labels[code]: {q: float(v) for q, v in zip(qs, np.percentile(values[end - count:end], qs))}
+            for code, (count, end) in enumerate(zip(counts, ends)) if count
+        }
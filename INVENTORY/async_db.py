@@ -0,0 +1,120 @@
+import asyncio
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlite_pool import ConnectionPool
+
+# ========== CONSTANTS ==========
+READER_THREADS = 4
+# Most writes committed together in one transaction
+COALESCE_MAX_WRITES = 256
+
+
+# ========== ASYNC DATABASE ==========
+class AsyncDatabase:
+    """asyncio front end for one SQLite file, so Flet async handlers can await
+    database work instead of running it on the event loop.
+
+    Reads run on a small thread pool, each thread with its own pooled WAL
+    connection. Writes go to a single writer thread, which takes every write
+    queued by the time it is free and commits them as one transaction (group
+    commit: a lone write is committed at once, a burst shares one commit).
+    Each write runs in its own SAVEPOINT, so a failing one is rolled back alone
+    and only its caller sees the error. Write functions must not commit themselves.
+
+    Threads start on first use; close() stops them."""
+
+    def __init__(self, pool: ConnectionPool, readers: int = READER_THREADS):
+        self.pool = pool
+        self.readers = readers
+        self.lock = threading.Lock()
+        self.reader_pool: Optional[ThreadPoolExecutor] = None
+        self.writes: "queue.Queue[Optional[Tuple[Callable, Future]]]" = queue.Queue()
+        self.writer: Optional[threading.Thread] = None
+
+    async def read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Await fn(conn) run on a reader thread"""
+        with self.lock:
+            if self.reader_pool is None:
+                self.reader_pool = ThreadPoolExecutor(max_workers=self.readers, thread_name_prefix="db-reader")
+        return await asyncio.get_running_loop().run_in_executor(self.reader_pool, lambda: fn(self.pool.get()))
+
+    async def write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Await fn(conn) run on the writer thread; resolves once its transaction has committed"""
+        return await asyncio.wrap_future(self.submit_write(fn))
+
+    def submit_write(self, fn: Callable[[sqlite3.Connection], Any]) -> Future:
+        """Queue a write from synchronous code; the Future resolves after commit"""
+        with self.lock:
+            if self.writer is None:
+                self.writer = threading.Thread(target=self._write_loop, name="db-writer", daemon=True)
+                self.writer.start()
+        future: Future = Future()
+        self.writes.put((fn, future))
+        return future
+
+    async def fetchall(self, sql: str, params: Tuple = ()) -> List[sqlite3.Row]:
+        return await self.read(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def execute(self, sql: str, params: Tuple = ()) -> int:
+        """Run one write statement; returns its rowcount"""
+        return await self.write(lambda conn: conn.execute(sql, params).rowcount)
+
+    def _write_loop(self) -> None:
+        conn = self.pool.get()
+        while True:
+            job = self.writes.get()
+            if job is None:
+                return
+            batch = [job]
+            while len(batch) < COALESCE_MAX_WRITES:
+                try:
+                    job = self.writes.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self.writes.put(None)  # finish this batch, then stop
+                    break
+                batch.append(job)
+            self._commit_batch(conn, batch)
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[Tuple[Callable, Future]]) -> None:
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, future in batch:
+                conn.execute("SAVEPOINT job")
+                try:
+                    results.append((future, fn(conn), None))
+                    conn.execute("RELEASE job")
+                except Exception as e:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                    results.append((future, None, e))
+            conn.commit()
+        except sqlite3.Error as e:
+            # BEGIN or COMMIT itself failed: nothing in the batch was written
+            if conn.in_transaction:
+                conn.rollback()
+            for fn, future in batch:
+                future.set_exception(e)
+            return
+        for future, result, error in results:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    def close(self) -> None:
+        """Finish queued writes and stop the threads"""
+        with self.lock:
+            writer, self.writer = self.writer, None
+            reader_pool, self.reader_pool = self.reader_pool, None
+        if writer is not None:
+            self.writes.put(None)
+            writer.join()
+        if reader_pool is not None:
+            reader_pool.shutdown(wait=True)
@@ -0,0 +1,129 @@
+"""Report queries over synthetic items: NumPy columns (analytics.ItemColumns)
+versus the plain Python loops over self.items they replace.
+
+    python bench_analytics.py [items]
+
+Defaults to 1,000,000 items in 50 groups. Each query's results are checked
+against the loop's before its timings are printed."""
+import math
+import random
+import sys
+import time
+
+from analytics import ItemColumns, merged_schema
+
+GROUP_COUNT = 50
+COLORS = ["red", "green", "blue", "black", "white", "grey", "yellow", "purple"]
+SCHEMA = {
+    "price": {"type": "number", "min": 0.0, "max": 1000.0},
+    "quantity": {"type": "number", "min": 0.0, "max": 500.0},
+    "color": {"type": "dropdown", "options": COLORS},
+    "notes": {"type": "text"},
+}
+
+
+def make_items(count: int):
+    rng = random.Random(42)
+    groups = {f"Group {g}": {"name": f"Group {g}", "characteristics": SCHEMA} for g in range(GROUP_COUNT)}
+    names = list(groups)
+    items = {}
+    for i in range(count):
+        characteristics = {"color": rng.choice(COLORS), "quantity": float(rng.randint(0, 500))}
+        if i % 10:  # every tenth item has no price
+            characteristics["price"] = round(rng.uniform(0, 1000), 2)
+        items[f"item{i}"] = {"name": f"Item {i}", "group": rng.choice(names), "characteristics": characteristics}
+    return groups, items
+
+
+# ----- the pure Python versions -----
+def loop_sum_by(items, column, by):
+    sums = {}
+    for item in items.values():
+        value = item["characteristics"].get(column)
+        if value is not None:
+            key = item["group"] if by == "group" else item["characteristics"].get(by)
+            sums[key] = sums.get(key, 0.0) + value
+    return sums
+
+
+def loop_count_by(items, by):
+    counts = {}
+    for item in items.values():
+        key = item["group"] if by == "group" else item["characteristics"].get(by)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def loop_histogram(items, column, bins, low, high):
+    counts = [0] * bins
+    width = (high - low) / bins
+    for item in items.values():
+        value = item["characteristics"].get(column)
+        if value is not None and low <= value <= high:
+            counts[min(int((value - low) / width), bins - 1)] += 1
+    return counts
+
+
+def loop_percentiles(items, column, qs, by=None):
+    """{key: {q: value}} per group, or under the key None over all items when by is None"""
+    runs = {}
+    for item in items.values():
+        value = item["characteristics"].get(column)
+        if value is not None:
+            runs.setdefault(item[by] if by else None, []).append(value)
+    result = {}
+    for key, values in runs.items():
+        values.sort()
+        result[key] = {}
+        for q in qs:
+            rank = (len(values) - 1) * q / 100.0
+            below = math.floor(rank)
+            above = min(below + 1, len(values) - 1)
+            result[key][q] = values[below] + (values[above] - values[below]) * (rank - below)
+    return result
+
+
+def close(a, b) -> bool:
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(close(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(close(x, y) for x, y in zip(a, b))
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+
+
+def timed(operation):
+    start = time.perf_counter()
+    result = operation()
+    return result, time.perf_counter() - start
+
+
+def compare(label: str, vectorized, loop) -> None:
+    fast, fast_time = timed(vectorized)
+    slow, slow_time = timed(loop)
+    if not close(fast, slow):
+        raise AssertionError(f"{label}: results differ")
+    print(f"    {label:<26} numpy {fast_time * 1000:9.1f} ms   loop {slow_time * 1000:9.1f} ms"
+          f"   {slow_time / fast_time:6.1f}x")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    groups, items = make_items(count)
+    print(f"{count:,} items in {len(groups)} groups")
+    columns, build_time = timed(lambda: ItemColumns.from_items(items, merged_schema(groups)))
+    print(f"    {'build columns':<26} {build_time * 1000:9.1f} ms (once per snapshot)")
+
+    compare("count by group", lambda: columns.count_by("group"), lambda: loop_count_by(items, "group"))
+    compare("sum price by group", lambda: columns.sum_by("price", "group"), lambda: loop_sum_by(items, "price", "group"))
+    compare("sum quantity by color", lambda: columns.sum_by("quantity", "color"),
+            lambda: loop_sum_by(items, "quantity", "color"))
+    compare("price histogram", lambda: list(columns.histogram("price", 20)[0]),
+            lambda: loop_histogram(items, "price", 20, 0.0, 1000.0))
+    compare("price p50/p90/p99", lambda: columns.percentiles("price"),
+            lambda: loop_percentiles(items, "price", (50, 90, 99))[None])
+    compare("price percentiles by group", lambda: columns.percentiles("price", by="group"),
+            lambda: loop_percentiles(items, "price", (50, 90, 99), "group"))
+
+
+if __name__ == "__main__":
+    main()
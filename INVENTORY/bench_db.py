@@ -0,0 +1,116 @@
+"""Ops/sec of the SQLite helpers as they were, with a fresh connection per
+operation (the old get_connection), versus the current pooled WAL versions.
+
+    python bench_db.py [operations]
+
+Runs against throwaway database files in a temp directory."""
+import importlib.machinery
+import importlib.util
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import TEST
+from sqlite_pool import ConnectionPool
+
+# CHATGPT_TEXT.PY has an upper-case suffix, so a plain import can't find it
+_loader = importlib.machinery.SourceFileLoader("chatgpt_text", os.path.join(os.path.dirname(__file__), "CHATGPT_TEXT.PY"))
+_spec = importlib.util.spec_from_loader("chatgpt_text", _loader)
+chatgpt_text = importlib.util.module_from_spec(_spec)
+_loader.exec_module(chatgpt_text)
+
+
+def fresh_connection(db_path: str) -> sqlite3.Connection:
+    """The get_connection both Database classes used before pooling"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+class OldParent:
+    """TEST.Parent's table helpers as they were before pooling, SqlBuilder and
+    typed columns, so the baseline runs none of the new code"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def table_creater(self, name, listofcolumns):
+        with fresh_connection(self.db_path) as conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY)")
+            for col in listofcolumns:
+                try:
+                    conn.execute(f"ALTER TABLE {name} ADD COLUMN {col} TEXT")
+                except sqlite3.Error:
+                    pass  # Column already exists
+
+    def table_reader(self, name, listofcolumns):
+        with fresh_connection(self.db_path) as conn:
+            return conn.execute(f"SELECT {', '.join(listofcolumns)} FROM {name}").fetchall()
+
+    def table_writer(self, name, data_dict):
+        with fresh_connection(self.db_path) as conn:
+            columns = list(data_dict)
+            conn.executemany(
+                f"INSERT INTO {name} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})",
+                list(zip(*data_dict.values()))
+            )
+
+
+class OldCategoryDatabase:
+    """CHATGPT_TEXT.Database.insert_category as it was before pooling"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with fresh_connection(db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS category (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    datatype TEXT NOT NULL,
+                    null_status INTEGER DEFAULT 0
+                )
+            """)
+
+    def insert_category(self, name: str, datatype: str, null_status: bool) -> bool:
+        try:
+            with fresh_connection(self.db_path) as conn:
+                conn.execute("INSERT INTO category (name, datatype, null_status) VALUES (?, ?, ?)",
+                             (name, datatype, int(null_status)))
+                return True
+        except sqlite3.IntegrityError:
+            return False
+
+
+def ops_per_second(operation, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        operation(i)
+    return count / (time.perf_counter() - start)
+
+
+def run(label: str, parent, category_db_class, db_dir: str, count: int) -> None:
+    parent.table_creater("bench", ["name", "datatype", "null_status"])
+
+    writer = ops_per_second(
+        lambda i: parent.table_writer("bench", {"name": [f"n{i}"], "datatype": ["text"], "null_status": [False]}),
+        count
+    )
+    reader = ops_per_second(lambda i: parent.table_reader("bench", ["name"]), max(count // 10, 1))
+    category_db = category_db_class(os.path.join(db_dir, f"{label}_inventory.db"))
+    insert = ops_per_second(lambda i: category_db.insert_category(f"c{i}", "text", False), count)
+
+    print(f"{label:>8}: table_writer {writer:10.0f}/s   table_reader {reader:10.0f}/s   insert_category {insert:10.0f}/s")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as db_dir:
+        run("fresh", OldParent(os.path.join(db_dir, "fresh.db")), OldCategoryDatabase, db_dir, count)
+        run("pooled", TEST.Parent(None, os.path.join(db_dir, "pooled.db")), chatgpt_text.Database, db_dir, count)
+        ConnectionPool.close_every_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Runs one catalog workload against each storage backend and prints ops/sec.
+
+    python bench_storage.py [items] [--firebase]
+
+The memory and SQLite backends always run (SQLite on a throwaway file);
+--firebase also runs it against the project in firebase_config.json,
+writing under the real inventory paths, so only use it on a test project."""
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from storage import MemoryRepository, Repository, SqliteRepository
+
+
+def timed(label: str, count: int, operation) -> None:
+    start = time.perf_counter()
+    operation()
+    elapsed = time.perf_counter() - start
+    print(f"    {label:<16} {count / elapsed:12.0f}/s   ({elapsed * 1000:.1f} ms)")
+
+
+def run(name: str, store: Repository, count: int) -> None:
+    print(f"{name}:")
+    base = datetime(2024, 1, 1)
+    ids = [uuid.uuid4().hex for _ in range(count)]
+    stamp = lambda i: (base + timedelta(seconds=i)).isoformat()
+    since = stamp(count)
+
+    store.put_group("Bench", {"name": "Bench", "characteristics": {}, "last_updated": stamp(0)})
+    timed("put_item", count, lambda: [
+        store.put_item(item_id, {"name": f"Item {i}", "group": "Bench", "characteristics": {"n": i},
+                                 "created_at": stamp(i), "last_updated": stamp(i)})
+        for i, item_id in enumerate(ids)
+    ])
+    updated = ids[::2]
+    timed("update_item", len(updated), lambda: [
+        store.update_item(item_id, {"name": "Renamed", "last_updated": stamp(count + i)})
+        for i, item_id in enumerate(updated)
+    ])
+    timed("get_item", count, lambda: [store.get_item(item_id) for item_id in ids])
+    timed("changes_since", len(updated), lambda: store.changes_since(since))
+    timed("load_all", count, store.load_all)
+    deleted = ids[::10]
+    timed("delete_item", len(deleted), lambda: [store.delete_item(item_id, stamp(2 * count)) for item_id in deleted])
+    store.close()
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    count = int(args[0]) if args else 2000
+    run("memory", MemoryRepository(), count)
+    with tempfile.TemporaryDirectory() as db_dir:
+        run("sqlite", SqliteRepository(os.path.join(db_dir, "bench.db")), count)
+    if "--firebase" in sys.argv:
+        import pyrebase
+        from storage import FirebaseRepository
+        with open("firebase_config.json") as f:
+            run("firebase", FirebaseRepository(pyrebase.initialize_app(json.load(f))), count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import contextlib
+import json
+import os
+import sqlite3
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from reports import Reports, apply_item_changes, create_summary_tables, rebuild_summaries
+from sqlite_pool import ConnectionPool
+
+# ========== CONSTANTS ==========
+CACHE_PATH = "catalog_cache.db"
+# Bump when the table layout changes; an older cache is dropped and rebuilt
+SCHEMA_VERSION = 2
+# Most ids looked up per IN (...) query, under SQLite's default parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+# ========== LOCAL CATALOG SNAPSHOT ==========
+class CatalogCache:
+    """On-disk copy of the Firebase catalog so the app can render before the
+    network answers. Records are stored as the same JSON dicts Firebase holds.
+    The cache is disposable: on a version mismatch or a corrupt file it is
+    rebuilt empty and the next sync repopulates it.
+
+    Every item write also updates the report summary tables (reports.py) in
+    the same transaction, so the Reports scenes read the catalog the app
+    actually writes."""
+
+    def __init__(self, db_path: str = CACHE_PATH):
+        self.db_path = db_path
+        # Set when a write failed: the records it carried are missing, so later
+        # writes must not move last_synced past them (until a full snapshot)
+        self.behind = False
+        try:
+            self._initialize_db()
+        except sqlite3.DatabaseError as e:
+            print(f"Catalog cache unreadable, rebuilding: {e}")
+            self._discard()
+            self._initialize_db()
+
+    def _initialize_db(self) -> None:
+        with self.connect() as conn:
+            if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+                raise sqlite3.DatabaseError("quick_check failed")
+
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.executescript("""
+                    DROP TABLE IF EXISTS meta;
+                    DROP TABLE IF EXISTS groups;
+                    DROP TABLE IF EXISTS items;
+                    DROP TABLE IF EXISTS report_groups;
+                    DROP TABLE IF EXISTS report_categories;
+                    DROP TABLE IF EXISTS report_low_stock;
+                """)
+            create_summary_tables(conn)
+            conn.executescript(f"""
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS groups (name TEXT PRIMARY KEY, data TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS items (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+                PRAGMA user_version = {SCHEMA_VERSION};
+            """)
+            conn.commit()
+
+    def _discard(self) -> None:
+        """Move a broken cache file aside so a fresh one can be created"""
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            path = self.db_path + suffix
+            if os.path.exists(path):
+                os.replace(path, path + ".corrupt")
+
+    def get_connection(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    @contextlib.contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection for one operation, committed (or rolled back) and closed
+        at the end, so _discard never moves a file that is still open"""
+        with contextlib.closing(self.get_connection()) as conn:
+            with conn:
+                yield conn
+
+    def load(self) -> Tuple[Dict[str, Dict], Dict[str, Dict], Dict[str, Dict], Optional[str]]:
+        """Return (groups, items, global_characteristics, last_synced).
+        last_synced is None when there is no usable snapshot."""
+        try:
+            with self.connect() as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta"))
+                if "last_synced" not in meta:
+                    return {}, {}, {}, None
+                groups = {name: json.loads(data) for name, data in conn.execute("SELECT name, data FROM groups")}
+                items = {item_id: json.loads(data) for item_id, data in conn.execute("SELECT id, data FROM items")}
+                global_chars = json.loads(meta.get("global_characteristics") or "{}")
+                return groups, items, global_chars, meta["last_synced"]
+        except (sqlite3.DatabaseError, ValueError) as e:
+            print(f"Catalog cache unreadable, starting empty: {e}")
+            self.clear()
+            return {}, {}, {}, None
+
+    def save_snapshot(self, groups: Dict[str, Dict], items: Dict[str, Dict],
+                      global_chars: Dict[str, Dict], last_synced: str) -> None:
+        """Replace the whole cache with a full snapshot"""
+        try:
+            with self.connect() as conn:
+                conn.execute("DELETE FROM groups")
+                conn.execute("DELETE FROM items")
+                self._write(conn, groups, items, global_chars, last_synced)
+                rebuild_summaries(conn, "items")
+            self.behind = False
+        except sqlite3.Error as e:
+            print(f"Catalog cache write failed: {e}")
+
+    def apply_changes(self, groups: Dict[str, Optional[Dict]], items: Dict[str, Optional[Dict]],
+                      global_chars: Optional[Dict[str, Dict]] = None,
+                      last_synced: Optional[str] = None) -> None:
+        """Upsert changed records; a value of None deletes that record.
+        Meta values passed as None are left as they are, and so is last_synced
+        while an earlier write is missing: the next start then fetches from the
+        old mark and gets those records again."""
+        if self.behind:
+            last_synced = None
+        try:
+            with self.connect() as conn:
+                old = self._stored_items(conn, list(items))
+                conn.executemany("DELETE FROM groups WHERE name = ?",
+                                 [(name,) for name, data in groups.items() if data is None])
+                conn.executemany("DELETE FROM items WHERE id = ?",
+                                 [(item_id,) for item_id, data in items.items() if data is None])
+                self._write(
+                    conn,
+                    {name: data for name, data in groups.items() if data is not None},
+                    {item_id: data for item_id, data in items.items() if data is not None},
+                    global_chars,
+                    last_synced
+                )
+                apply_item_changes(conn, [(item_id, old.get(item_id), data) for item_id, data in items.items()])
+        except sqlite3.Error as e:
+            print(f"Catalog cache write failed: {e}")
+            self.behind = True
+
+    @staticmethod
+    def _stored_items(conn: sqlite3.Connection, item_ids: List[str]) -> Dict[str, Dict]:
+        stored = {}
+        for start in range(0, len(item_ids), LOOKUP_CHUNK_SIZE):
+            chunk = item_ids[start:start + LOOKUP_CHUNK_SIZE]
+            stored.update((item_id, json.loads(data)) for item_id, data in conn.execute(
+                f"SELECT id, data FROM items WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+        return stored
+
+    def _write(self, conn: sqlite3.Connection, groups: Dict[str, Dict], items: Dict[str, Dict],
+               global_chars: Optional[Dict[str, Dict]], last_synced: Optional[str]) -> None:
+        conn.executemany("INSERT OR REPLACE INTO groups (name, data) VALUES (?, ?)",
+                         [(name, json.dumps(data)) for name, data in groups.items()])
+        conn.executemany("INSERT OR REPLACE INTO items (id, data) VALUES (?, ?)",
+                         [(item_id, json.dumps(data)) for item_id, data in items.items()])
+        if global_chars is not None:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('global_characteristics', ?)",
+                         (json.dumps(global_chars),))
+        if last_synced is not None:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_synced', ?)", (last_synced,))
+
+    def clear(self) -> None:
+        try:
+            with self.connect() as conn:
+                conn.executescript("""
+                    DELETE FROM meta; DELETE FROM groups; DELETE FROM items;
+                    DELETE FROM report_groups; DELETE FROM report_categories; DELETE FROM report_low_stock;
+                """)
+        except sqlite3.DatabaseError:
+            self._discard()
+            self._initialize_db()
+
+    def reports(self, price_categories: Callable[[], Iterable[str]]) -> Reports:
+        """Stock reports over the cached items. The cache holds no category types,
+        so price_categories (see Reports) comes from the category screens' database."""
+        return Reports(ConnectionPool.for_path(self.db_path).get, price_categories)
@@ -0,0 +1,126 @@
+import datetime
+import functools
+import re
+from typing import Any, Callable, Dict
+
+# ========== CONSTANTS ==========
+# Declared SQLite type for each category datatype; the keys are the choices
+# the category screens offer. DATE and BOOLEAN get NUMERIC affinity: ISO
+# dates stay text (which sorts in date order) and yes/no is stored as 0/1.
+DATA_TYPE_COLUMNS = {
+    "text": "TEXT",
+    "numbers": "NUMERIC",
+    "yes/no": "BOOLEAN",
+    "date": "DATE",
+    "percentage": "REAL",
+    "price": "REAL",
+}
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d.%m.%Y", "%d-%m-%Y"]
+TRUE_WORDS = {"yes", "y", "true", "1", "on"}
+FALSE_WORDS = {"no", "n", "false", "0", "off"}
+# Currency signs, % and spaces around a number
+_NUMBER_NOISE = re.compile(r"[\s$€£%]")
+# Commas are only read as thousands separators: 1,234 or 12,345,678.9 but
+# not 1,5 or 1.234,56, which would silently become a different number
+_THOUSANDS_GROUPED = re.compile(r"[+-]?\d{1,3}(,\d{3})+(\.\d*)?")
+
+
+def column_type(datatype: str) -> str:
+    """SQL column type for a category datatype; unknown datatypes are stored as TEXT"""
+    return DATA_TYPE_COLUMNS.get(datatype, "TEXT")
+
+
+# ========== VALUE CONVERSION ==========
+def _to_number(value: Any) -> float:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    text = _NUMBER_NOISE.sub("", str(value))
+    if "," in text:
+        if not _THOUSANDS_GROUPED.fullmatch(text):
+            raise ValueError(f"not a number: {value!r}")
+        text = text.replace(",", "")
+    number = float(text)
+    return int(number) if number.is_integer() and "." not in str(value) else number
+
+
+def _to_boolean(value: Any) -> int:
+    if isinstance(value, (bool, int)):
+        return int(bool(value))
+    word = str(value).strip().lower()
+    if word in TRUE_WORDS:
+        return 1
+    if word in FALSE_WORDS:
+        return 0
+    raise ValueError(f"not a yes/no value: {value!r}")
+
+
+def _to_date(value: Any) -> str:
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    text = str(value).strip()
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).date().isoformat()
+        except ValueError:
+            continue
+    raise ValueError(f"not a date: {value!r}")
+
+
+# Keyed by declared column type, so the schema alone says how to store a value
+CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "NUMERIC": _to_number,
+    "REAL": lambda value: float(_to_number(value)),
+    "INTEGER": lambda value: int(_to_number(value)),
+    "BOOLEAN": _to_boolean,
+    "DATE": _to_date,
+}
+
+
+def to_column_value(declared_type: str, value: Any) -> Any:
+    """Stored form of value for a column of declared_type. None and "" mean empty;
+    raises ValueError when the value can't be read as that type."""
+    if value is None or value == "":
+        return None
+    convert = CONVERTERS.get(declared_type)
+    if convert is None:
+        return value
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {declared_type.lower()} value: {value!r}")
+
+
+# ========== DISPLAY ==========
+def _format_number(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:g}"
+    return str(value)
+
+
+# Text shown for a stored value, keyed by declared column type like CONVERTERS
+FORMATTERS: Dict[str, Callable[[Any], str]] = {
+    "NUMERIC": _format_number,
+    "REAL": lambda value: f"{value:,.2f}",
+    "INTEGER": str,
+    "BOOLEAN": lambda value: "Yes" if value else "No",
+}
+
+
+@functools.lru_cache(maxsize=None)
+def cell_formatter(declared_type: str) -> Callable[[Any], str]:
+    """Function turning a stored value of declared_type into display text, None
+    into "". One function per type, shared by every column of that type."""
+    format_value = FORMATTERS.get(declared_type, str)
+
+    def format_cell(value: Any) -> str:
+        if value is None:
+            return ""
+        try:
+            return format_value(value)
+        except (TypeError, ValueError):
+            return str(value)  # e.g. text left in a typed column by an old schema
+    return format_cell
@@ -0,0 +1,131 @@
+import copy
+import importlib.machinery
+import importlib.util
+import os
+
+import pytest
+
+# Runs a Flet window on import
+collect_ignore = ["dialog_test.py"]
+
+
+# ========== FAKE PYREBASE ==========
+class FakeEntry:
+    def __init__(self, key, value):
+        self._key = key
+        self._value = value
+
+    def key(self):
+        return self._key
+
+    def val(self):
+        return self._value
+
+
+class FakeResponse:
+    def __init__(self, value, entries=None):
+        self.value = value
+        self.entries = entries
+
+    def val(self):
+        return self.value
+
+    def each(self):
+        return self.entries
+
+
+class FakeRef:
+    """The slice of pyrebase's Database that FirebaseRepository uses: child
+    paths, order_by_child / order_by_value with start_at (inclusive), get,
+    set, multi-path update and remove, over a plain dict tree."""
+
+    def __init__(self, firebase: "FakeFirebase", path=(), order=None, start=None):
+        self.firebase = firebase
+        self.path = path
+        self.order = order
+        self.start = start
+
+    def child(self, name):
+        return FakeRef(self.firebase, self.path + tuple(p for p in str(name).split("/") if p))
+
+    def order_by_child(self, key):
+        return FakeRef(self.firebase, self.path, ("child", key))
+
+    def order_by_value(self):
+        return FakeRef(self.firebase, self.path, ("value", None))
+
+    def start_at(self, value):
+        return FakeRef(self.firebase, self.path, self.order, value)
+
+    def get(self):
+        node = copy.deepcopy(self.firebase.read(self.path))
+        if self.order is None:
+            return FakeResponse(node)
+        by, key = self.order
+        entries = []
+        for child_key, value in (node or {}).items():
+            sort_value = value.get(key) if by == "child" and isinstance(value, dict) else value
+            if by == "value" or sort_value is not None:
+                if self.start is None or (sort_value is not None and sort_value >= self.start):
+                    entries.append(FakeEntry(child_key, value))
+        entries.sort(key=lambda entry: (entry.val().get(key) if by == "child" else entry.val(), entry.key()))
+        return FakeResponse({entry.key(): entry.val() for entry in entries} or None, entries)
+
+    def set(self, value):
+        self.firebase.write(self.path, copy.deepcopy(value))
+
+    def update(self, values):
+        for sub_path, value in values.items():
+            self.child(sub_path).set(value)
+
+    def remove(self):
+        self.firebase.write(self.path, None)
+
+
+class FakeFirebase:
+    """Stands in for a pyrebase app: database() hands out FakeRefs over one tree"""
+
+    def __init__(self):
+        self.tree = {}
+
+    def database(self):
+        return FakeRef(self)
+
+    def read(self, path):
+        node = self.tree
+        for part in path:
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def write(self, path, value):
+        if not path:
+            self.tree = value or {}
+            return
+        parents = [self.tree]
+        for part in path[:-1]:
+            parents.append(parents[-1].setdefault(part, {}))
+        if value is None:
+            parents[-1].pop(path[-1], None)
+            # Firebase has no empty nodes
+            for parent, part in reversed(list(zip(parents[:-1], path[:-1]))):
+                if parent[part]:
+                    break
+                del parent[part]
+        else:
+            parents[-1][path[-1]] = value
+
+
+@pytest.fixture
+def firebase():
+    return FakeFirebase()
+
+
+@pytest.fixture(scope="session")
+def chatgpt_text():
+    """The CHATGPT_TEXT.PY module; its upper-case suffix keeps a plain import from finding it"""
+    loader = importlib.machinery.SourceFileLoader("chatgpt_text", os.path.join(os.path.dirname(__file__), "CHATGPT_TEXT.PY"))
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader("chatgpt_text", loader))
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,245 @@
+"""Bulk item import from CSV or JSON Lines, checked against each group's
+characteristics with the same rules as the Add Item dialog.
+
+    python importer.py FILE [--rejects PATH] [--db PATH | --firebase]
+
+CSV files have name and group columns, an optional id column (rows with an id
+replace that item's name, group and characteristics, keeping when it was
+created and its photo) and one column per characteristic. JSON Lines files have one
+object per line with the same keys, or the characteristics nested under
+"characteristics". Files are streamed and written in batches, so memory stays
+flat however long they are. Rows that fail go to the rejects file (by default
+FILE_rejects.csv / .jsonl next to it) with the reason, for fixing and
+re-importing. Writes go to the SQLite catalog (--db, default inventory.db) or,
+with --firebase, to the project in firebase_config.json."""
+import csv
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from storage import Repository
+
+# ========== CONSTANTS ==========
+# Rows written per apply_batch: one multi-path update on Firebase, one transaction on SQLite
+IMPORT_BATCH_SIZE = 500
+# Row keys that aren't characteristics
+ITEM_FIELDS = ("id", "name", "group", "characteristics")
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+# Not allowed in Realtime Database keys, so not in item ids either
+FORBIDDEN_KEY_CHARACTERS = ".$#[]/"
+# Extra column (CSV) or key (JSON Lines) of the rejects file; dropped when reading,
+# so a fixed rejects file can be imported as it is
+ERROR_FIELD = "error"
+# Fields of a stored item that a row with its id doesn't replace
+KEPT_ON_REPLACE = ("created_at", "photo_url", "thumb_url")
+
+
+def _is_json_lines(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in JSON_LINES_EXTENSIONS
+
+
+def rejects_path_for(path: str) -> str:
+    base, extension = os.path.splitext(path)
+    return f"{base}_rejects{extension if _is_json_lines(path) else '.csv'}"
+
+
+# ========== READING ==========
+def read_rows(path: str) -> Iterator[Tuple[int, Dict, Optional[str]]]:
+    """(line number, row, error) for each row of a CSV or JSON Lines file,
+    one at a time; error is set for a line that couldn't be parsed"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        if _is_json_lines(path):
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as ex:
+                    yield line_number, {"line": line.rstrip("\r\n")}, f"Invalid JSON: {ex}"
+                    continue
+                if isinstance(row, dict):
+                    row.pop(ERROR_FIELD, None)
+                    yield line_number, row, None
+                else:
+                    yield line_number, {"line": line.rstrip("\r\n")}, "Not a JSON object"
+            return
+        reader = csv.DictReader(f)
+        for row in reader:
+            extra = row.pop(None, None)  # cells beyond the header
+            row.pop(ERROR_FIELD, None)
+            yield reader.line_num, row, "More values than columns" if extra else None
+
+
+# ========== VALIDATION ==========
+def _blank(value) -> bool:
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def validate_row(row: Dict, schemas: Dict[str, Dict[str, Dict]], now: str) -> Tuple[str, Dict]:
+    """(item_id, record) for a row, or ValueError saying why it can't be imported.
+    schemas maps group name -> its characteristics ({name: {type, min, max, options}})."""
+    name = "" if row.get("name") is None else str(row["name"]).strip()
+    group = "" if row.get("group") is None else str(row["group"]).strip()
+    if not name or not group:
+        raise ValueError("Name and group are required")
+    schema = schemas.get(group)
+    if schema is None:
+        raise ValueError(f"Unknown group: {group}")
+
+    values = row.get("characteristics")
+    if not isinstance(values, dict):
+        values = {key: value for key, value in row.items() if key not in ITEM_FIELDS}
+    unknown = sorted(key for key, value in values.items() if key not in schema and not _blank(value))
+    if unknown:
+        raise ValueError(f"Not a characteristic of {group}: {', '.join(unknown)}")
+
+    characteristics = {}
+    for char_name, char_data in schema.items():
+        value = values.get(char_name)
+        if char_data["type"] == "number":
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{char_name}: must be a number")
+            if char_data.get("min") is not None and value < char_data["min"]:
+                raise ValueError(f"{char_name}: must be ≥ {char_data['min']}")
+            if char_data.get("max") is not None and value > char_data["max"]:
+                raise ValueError(f"{char_name}: must be ≤ {char_data['max']}")
+        elif char_data["type"] == "dropdown":
+            value = None if _blank(value) else str(value).strip()
+            options = char_data.get("options")
+            if value is not None and options and value not in options:
+                raise ValueError(f"{char_name}: must be one of {', '.join(char_data['options'])}")
+        else:
+            value = "" if value is None else str(value)
+        characteristics[char_name] = value
+
+    item_id = "" if _blank(row.get("id")) else str(row["id"]).strip()
+    if any(char in item_id for char in FORBIDDEN_KEY_CHARACTERS):
+        raise ValueError(f"id can't contain any of {FORBIDDEN_KEY_CHARACTERS}")
+    # Same record as InventoryItem.to_dict
+    return item_id or uuid.uuid4().hex, {
+        "name": name,
+        "group": group,
+        "characteristics": characteristics,
+        "photo_url": None,
+        "thumb_url": None,
+        "created_at": now,
+        "last_updated": now,
+    }
+
+
+# ========== IMPORT ==========
+class RejectsWriter:
+    """Rejected rows in the input's format plus ERROR_FIELD; the file is only
+    created once there is something to write"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = None
+        self.writer = None
+        self.count = 0
+
+    def write(self, line_number: int, row: Dict, error: str) -> None:
+        if self.file is None:
+            self.file = open(self.path, "w", newline="", encoding="utf-8")
+        self.count += 1
+        if _is_json_lines(self.path):
+            self.file.write(json.dumps({**row, ERROR_FIELD: f"line {line_number}: {error}"}) + "\n")
+            return
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=[*row, ERROR_FIELD], extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerow({**row, ERROR_FIELD: f"line {line_number}: {error}"})
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+def import_items(path: str, store: Repository, schemas: Dict[str, Dict[str, Dict]],
+                 rejects_path: Optional[str] = None, batch_size: int = IMPORT_BATCH_SIZE,
+                 on_batch: Optional[Callable[[Dict[str, Dict]], None]] = None,
+                 stored_item: Optional[Callable[[str], Optional[Dict]]] = None) -> Tuple[int, int]:
+    """Validate and write every row of path; returns (imported, rejected).
+    Valid rows go to store.apply_batch batch_size at a time, and on_batch gets
+    each written {item_id: record} batch (e.g. to update the UI). Rows in the
+    same batch share a last_updated stamp. stored_item(item_id) returns the
+    current record of a row's id, or None, so a replacement keeps its
+    KEPT_ON_REPLACE fields; it defaults to store.get_item (a remote read per
+    such row on Firebase, so the app passes its local copy)."""
+    stored_item = stored_item or store.get_item
+    rejects = RejectsWriter(rejects_path or rejects_path_for(path))
+    imported = 0
+    batch: Dict[str, Dict] = {}
+
+    def write_batch():
+        store.apply_batch([("put_item", item_id, record) for item_id, record in batch.items()])
+        if on_batch is not None:
+            on_batch(batch)
+
+    try:
+        now = datetime.now().isoformat()
+        for line_number, row, error in read_rows(path):
+            if error is None:
+                try:
+                    item_id, record = validate_row(row, schemas, now)
+                except ValueError as ex:
+                    error = str(ex)
+            if error is not None:
+                rejects.write(line_number, row, error)
+                continue
+            if not _blank(row.get("id")):
+                stored = stored_item(item_id)
+                if stored:
+                    record.update((field, stored[field]) for field in KEPT_ON_REPLACE if stored.get(field))
+            # A repeated id in one batch would be two writes to one path; the last row wins anyway
+            batch[item_id] = record
+            if len(batch) >= batch_size:
+                write_batch()
+                imported += len(batch)
+                batch = {}
+                now = datetime.now().isoformat()
+        if batch:
+            write_batch()
+            imported += len(batch)
+    finally:
+        rejects.close()
+    return imported, rejects.count
+
+
+def main():
+    files, options = [], {}
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if arg in ("--rejects", "--db"):
+            options[arg] = next(args, None)
+        elif arg.startswith("--"):
+            options[arg] = True
+        else:
+            files.append(arg)
+    if len(files) != 1 or None in options.values():
+        sys.exit(__doc__)
+    if options.get("--firebase"):
+        import pyrebase
+        from storage import FirebaseRepository
+        with open("firebase_config.json") as f:
+            store = FirebaseRepository(pyrebase.initialize_app(json.load(f)))
+    else:
+        from storage import SqliteRepository
+        store = SqliteRepository(options.get("--db", "inventory.db"))
+
+    schemas = {name: group.get("characteristics") or {} for name, group in store.get_groups().items()}
+    rejects_path = options.get("--rejects") or rejects_path_for(files[0])
+    try:
+        imported, rejected = import_items(files[0], store, schemas, rejects_path)
+    finally:
+        store.close()
+    print(f"Imported {imported} items, rejected {rejected}" + (f" (see {rejects_path})" if rejected else ""))
+
+
+if __name__ == "__main__":
+    main()
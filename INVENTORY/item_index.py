@@ -0,0 +1,112 @@
+import math
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from item_search import SearchIndex
+
+
+def normalize_value(value: Any) -> str:
+    """Characteristic values are matched case-insensitively as text, and
+    numbers by value: save_item stores 5 as 5.0, so 5, 5.0, "5" and "5.0"
+    all hit the same index entry"""
+    number = value
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value.strip().casefold()
+    if isinstance(number, (int, float)) and not isinstance(number, bool) and math.isfinite(number):
+        return str(int(number)) if float(number).is_integer() else repr(float(number))
+    return str(value).strip().casefold()
+
+
+# ========== SECONDARY INDEXES ==========
+class ItemIndex:
+    """Lookup tables kept next to InventoryPro.items:
+    group -> ids, (characteristic, value) -> ids and a sorted name list for
+    prefix search, plus the full-text SearchIndex. Id sets are dicts so results
+    keep insertion order. Call add/remove on every change instead of rebuilding."""
+
+    def __init__(self):
+        self.by_group: Dict[str, Dict[str, None]] = {}
+        self.by_characteristic: Dict[Tuple[str, str], Dict[str, None]] = {}
+        self.names: List[Tuple[str, str]] = []  # sorted (casefolded name, item_id)
+        # What each id was indexed under, so remove() needs only the id
+        self.entries: Dict[str, Tuple[str, str, List[Tuple[str, str]]]] = {}
+        self.text = SearchIndex()
+
+    def rebuild(self, items: Dict[str, Any]) -> None:
+        self.__init__()
+        for item_id, item in items.items():
+            self._add_entry(item_id, item)
+        # One sort instead of an insort per item
+        self.names = sorted((entry[0], item_id) for item_id, entry in self.entries.items())
+        self.text.rebuild(items)
+
+    def add(self, item_id: str, item: Any) -> None:
+        """Index item (anything with name, group and characteristics); replaces any previous entry"""
+        if item_id in self.entries:
+            self.remove(item_id)
+        insort(self.names, (self._add_entry(item_id, item), item_id))
+        self.text.add(item_id, item)
+
+    def _add_entry(self, item_id: str, item: Any) -> str:
+        name_key = item.name.casefold()
+        char_keys = [
+            (char_name, normalize_value(value))
+            for char_name, value in (item.characteristics or {}).items()
+            if value is not None and value != ""
+        ]
+        self.entries[item_id] = (name_key, item.group, char_keys)
+
+        self.by_group.setdefault(item.group, {})[item_id] = None
+        for key in char_keys:
+            self.by_characteristic.setdefault(key, {})[item_id] = None
+        return name_key
+
+    def remove(self, item_id: str) -> None:
+        entry = self.entries.pop(item_id, None)
+        if entry is None:
+            return
+        name_key, group, char_keys = entry
+        self.text.remove(item_id)
+
+        self._discard(self.by_group, group, item_id)
+        for key in char_keys:
+            self._discard(self.by_characteristic, key, item_id)
+        position = bisect_left(self.names, (name_key, item_id))
+        if position < len(self.names) and self.names[position] == (name_key, item_id):
+            del self.names[position]
+
+    @staticmethod
+    def _discard(index: Dict, key: Any, item_id: str) -> None:
+        ids = index.get(key)
+        if ids is not None:
+            ids.pop(item_id, None)
+            if not ids:
+                del index[key]
+
+    def ids_in_group(self, group: str) -> Iterable[str]:
+        return self.by_group.get(group, {}).keys()
+
+    def ids_with(self, char_name: str, value: Any) -> Iterable[str]:
+        return self.by_characteristic.get((char_name, normalize_value(value)), {}).keys()
+
+    def ids_with_prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Ids whose name starts with prefix (case-insensitive), in name order"""
+        prefix = prefix.casefold()
+        position = bisect_left(self.names, (prefix, ""))
+        result = []
+        while position < len(self.names) and (limit is None or len(result) < limit):
+            name_key, item_id = self.names[position]
+            if not name_key.startswith(prefix):
+                break
+            result.append(item_id)
+            position += 1
+        return result
+
+    def search(self, query: str, limit: int = 50, group: Optional[str] = None) -> List[str]:
+        """Ranked full-text/fuzzy matches for query, optionally within one group"""
+        return self.text.search(query, limit, self.by_group.get(group, {}) if group else None)
+
+    def matches(self, item_id: str, query: str) -> bool:
+        return self.text.matches(item_id, query)
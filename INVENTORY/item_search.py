@@ -0,0 +1,200 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Any, Container, Dict, Iterator, List, Optional, Set, Tuple
+
+# ========== CONSTANTS ==========
+NAME_WEIGHT = 2.0           # a hit in the item name counts double a characteristic hit
+PREFIX_SIMILARITY = 0.8     # score factor for "scr" -> "screw" on the last typed word
+MIN_FUZZY_SIMILARITY = 0.4  # trigram Jaccard needed for a typo to count as a match
+MAX_EXPANSIONS = 50         # vocabulary terms tried per query word
+MAX_SCANNED_POSTINGS = 20000  # postings walked per search before settling for the best so far
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(str(text).casefold())
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_similarity(a: Set[str], b: Set[str]) -> float:
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared) if shared else 0.0
+
+
+# ========== FULL-TEXT / FUZZY SEARCH ==========
+class SearchIndex:
+    """Inverted index over item names and string characteristic values.
+    term -> {item_id: weight} postings, plus a trigram index over the
+    vocabulary (not over items) so typo lookups stay cheap.
+    Every query word must match; the last word also matches as a prefix."""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.vocabulary: List[str] = []  # sorted, for prefix expansion
+        self.term_trigrams: Dict[str, Set[str]] = {}
+        self.by_trigram: Dict[str, Set[str]] = {}
+        self.entries: Dict[str, Dict[str, float]] = {}  # item_id -> its terms
+
+    def rebuild(self, items: Dict[str, Any]) -> None:
+        self.__init__()
+        for item_id, item in items.items():
+            self._add_entry(item_id, item)
+        self.vocabulary = sorted(self.postings)
+
+    def add(self, item_id: str, item: Any) -> None:
+        if item_id in self.entries:
+            self.remove(item_id)
+        for term in self._add_entry(item_id, item):
+            insort(self.vocabulary, term)
+
+    def _add_entry(self, item_id: str, item: Any) -> List[str]:
+        """Index one item; returns the terms that are new to the vocabulary"""
+        terms: Dict[str, float] = {}
+        for value in (item.characteristics or {}).values():
+            if isinstance(value, str):
+                for term in tokenize(value):
+                    terms[term] = 1.0
+        for term in tokenize(item.name):
+            terms[term] = NAME_WEIGHT
+        self.entries[item_id] = terms
+
+        new_terms = []
+        for term, weight in terms.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self.term_trigrams[term] = trigrams(term)
+                for gram in self.term_trigrams[term]:
+                    self.by_trigram.setdefault(gram, set()).add(term)
+                new_terms.append(term)
+            self.postings[term][item_id] = weight
+        return new_terms
+
+    def remove(self, item_id: str) -> None:
+        for term in self.entries.pop(item_id, {}):
+            postings = self.postings[term]
+            postings.pop(item_id, None)
+            if postings:
+                continue
+            del self.postings[term]
+            for gram in self.term_trigrams.pop(term):
+                self.by_trigram[gram].discard(term)
+                if not self.by_trigram[gram]:
+                    del self.by_trigram[gram]
+            position = bisect_left(self.vocabulary, term)
+            if position < len(self.vocabulary) and self.vocabulary[position] == term:
+                del self.vocabulary[position]
+
+    def search(self, query: str, limit: int = 50, item_ids: Optional[Container[str]] = None) -> List[str]:
+        """Best-scoring ids for query, at most limit of them.
+        item_ids, if given, restricts results to that set (e.g. one group).
+
+        The word with the fewest postings drives the scan, its matching terms
+        best-first; each item found is scored in full from its own terms.
+        The scan stops once limit items score at least as much as any item
+        still unseen could, or after MAX_SCANNED_POSTINGS postings, so a
+        one-letter first keystroke costs about as much as a selective query."""
+        words = tokenize(query)
+        if not words:
+            return []
+        expansions = [dict(self._expand(word, prefix=position == len(words) - 1))
+                      for position, word in enumerate(words)]
+        if not all(expansions):
+            return []
+        lead = min(expansions, key=lambda terms: sum(len(self.postings[term]) for term in terms))
+        # Most the other words can add to any item's score
+        others_best = sum(max(terms.values()) * NAME_WEIGHT for terms in expansions if terms is not lead)
+
+        top: List[Tuple[float, int, str]] = []  # min-heap of (score, -arrival, item_id)
+        seen: Set[str] = set()
+        scanned = 0
+        for term, similarity in sorted(lead.items(), key=lambda pair: -pair[1]):
+            # Nothing from here on can beat a full heap of scores this high
+            bound = similarity * NAME_WEIGHT + others_best
+            if len(top) >= limit and top[0][0] >= bound:
+                break
+            for item_id in self.postings[term]:
+                scanned += 1
+                if item_id in seen or (item_ids is not None and item_id not in item_ids):
+                    continue
+                seen.add(item_id)
+                score = self._score(item_id, expansions)
+                if score:
+                    entry = (score, -len(seen), item_id)
+                    if len(top) < limit:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heapreplace(top, entry)
+                if scanned >= MAX_SCANNED_POSTINGS or (len(top) >= limit and top[0][0] >= bound):
+                    break
+            if scanned >= MAX_SCANNED_POSTINGS:
+                break
+        return [item_id for _, _, item_id in sorted(top, reverse=True)]
+
+    def _score(self, item_id: str, expansions: List[Dict[str, float]]) -> float:
+        """Sum over query words of the item's best term for that word; 0 if any word has none"""
+        terms = self.entries[item_id]
+        total = 0.0
+        for word_terms in expansions:
+            best = max((word_terms.get(term, 0.0) * weight for term, weight in terms.items()), default=0.0)
+            if not best:
+                return 0.0
+            total += best
+        return total
+
+    def matches(self, item_id: str, query: str) -> bool:
+        """Whether one indexed item satisfies query, without touching the postings"""
+        terms = self.entries.get(item_id, {})
+        words = tokenize(query)
+        for position, word in enumerate(words):
+            prefix = position == len(words) - 1
+            # Same rule as _expand: typos only count when the word isn't a known term
+            fuzzy = word not in self.postings and len(word) >= 3
+            word_grams = trigrams(word)
+            if not any(
+                term == word
+                or (prefix and term.startswith(word))
+                or (fuzzy and trigram_similarity(word_grams, self.term_trigrams[term]) >= MIN_FUZZY_SIMILARITY)
+                for term in terms
+            ):
+                return False
+        return True
+
+    def _expand(self, word: str, prefix: bool) -> Iterator[Tuple[str, float]]:
+        """Vocabulary terms that count as word: exact, then prefix, then typos"""
+        if word in self.postings:
+            yield word, 1.0
+        elif len(word) >= 3:
+            word_grams = trigrams(word)
+            # Similarity >= MIN_FUZZY_SIMILARITY needs at least that share of the word's
+            # trigrams in common, so a match is in one of the rarest len - needed + 1
+            # trigram lists; the common ones (e.g. "  s") are never walked
+            needed = max(1, math.ceil(MIN_FUZZY_SIMILARITY * len(word_grams)))
+            lists = sorted((self.by_trigram.get(gram, ()) for gram in word_grams), key=len)
+            candidates = []
+            for term in set().union(*lists[:len(lists) - needed + 1]):
+                term_grams = self.term_trigrams[term]
+                count = len(word_grams & term_grams)
+                similarity = count / (len(word_grams) + len(term_grams) - count)
+                if similarity >= MIN_FUZZY_SIMILARITY:
+                    candidates.append((similarity, term))
+            for similarity, term in heapq.nlargest(MAX_EXPANSIONS, candidates):
+                yield term, similarity
+
+        if prefix:
+            position = bisect_left(self.vocabulary, word)
+            expansions = 0
+            while position < len(self.vocabulary) and expansions < MAX_EXPANSIONS:
+                term = self.vocabulary[position]
+                if not term.startswith(word):
+                    break
+                if term != word:
+                    yield term, PREFIX_SIMILARITY
+                    expansions += 1
+                position += 1
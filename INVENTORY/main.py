@@ -1,9 +1,20 @@
 import flet as ft
 import pyrebase
+import csv
 import json
+import sys
 from datetime import datetime
 import uuid
+import threading
 from typing import Dict, List, Optional
+from catalog_cache import CatalogCache
+from item_index import ItemIndex
+from photo_uploads import PhotoUploader
+from thumbnails import ThumbnailCache
+from storage import FirebaseRepository
+from outbox import OutboxRepository
+from sync import fetch_changes, merge_changes, query_mark, snapshot_mark
+from importer import import_items, rejects_path_for
 
 # Firebase Configuration
 with open("firebase_config.json") as f:
@@ -12,22 +23,86 @@ with open("firebase_config.json") as f:
 firebase = pyrebase.initialize_app(firebase_config)
 db = firebase.database()
 auth = firebase.auth()
-storage = firebase.storage()
-db.persistence = True
+
+# Controls are only built for this many items at a time; more are added on scroll
+ITEMS_PAGE_SIZE = 60
+# Best-ranked matches shown for a search
+SEARCH_LIMIT = 200
+
+def intern_value(value):
+    """Group names, characteristic names and dropdown values repeat across
+    thousands of items; interning keeps one copy of each string"""
+    return sys.intern(value) if isinstance(value, str) else value
 
 class InventoryItem:
-    def __init__(self, name: str, group: str, characteristics: Dict, photo_url: Optional[str] = None):
+    # No per-instance __dict__: large catalogs hold one of these per item
+    __slots__ = ("name", "group", "characteristics", "photo_url", "thumb_url", "created_at", "last_updated")
+
+    def __init__(self, name: str, group: str, characteristics: Dict, photo_url: Optional[str] = None,
+                 created_at: Optional[str] = None, last_updated: Optional[str] = None,
+                 thumb_url: Optional[str] = None):
         self.name = name
-        self.group = group
-        self.characteristics = characteristics
+        self.group = intern_value(group)
+        self.characteristics = {
+            intern_value(char_name): intern_value(value) for char_name, value in characteristics.items()
+        }
         self.photo_url = photo_url
-        self.created_at = datetime.now().isoformat()
-        self.last_updated = datetime.now().isoformat()
+        self.thumb_url = thumb_url
+        now = datetime.now().isoformat() if not (created_at and last_updated) else None
+        self.created_at = created_at or now
+        self.last_updated = last_updated or now
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "InventoryItem":
+        """Build an item from a stored record, keeping its stored timestamps"""
+        return cls(
+            name=data["name"],
+            group=data["group"],
+            characteristics=data.get("characteristics") or {},
+            photo_url=data.get("photo_url"),
+            created_at=data.get("created_at"),
+            last_updated=data.get("last_updated"),
+            thumb_url=data.get("thumb_url")
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "group": self.group,
+            "characteristics": self.characteristics,
+            "photo_url": self.photo_url,
+            "thumb_url": self.thumb_url,
+            "created_at": self.created_at,
+            "last_updated": self.last_updated
+        }
 
 class InventoryGroup:
+    __slots__ = ("name", "characteristics")
+
     def __init__(self, name: str, characteristics: Dict[str, Dict]):
-        self.name = name
-        self.characteristics = characteristics
+        self.name = intern_value(name)
+        self.characteristics = {intern_value(char_name): spec for char_name, spec in characteristics.items()}
+
+def apply_stream_change(record, path: List[str], data, event: str):
+    """Return record with a stream put (replace) or patch (merge) applied at path"""
+    if not path:
+        if event == "patch" and isinstance(record, dict):
+            merged = dict(record)
+            for key, value in (data or {}).items():
+                if value is None:
+                    merged.pop(key, None)
+                else:
+                    merged[key] = value
+            return merged
+        return data
+    
+    record = dict(record) if isinstance(record, dict) else {}
+    child = apply_stream_change(record.get(path[0]), path[1:], data, event)
+    if child is None:
+        record.pop(path[0], None)
+    else:
+        record[path[0]] = child
+    return record or None
 
 class InventoryPro:
     def __init__(self, page: ft.Page):
@@ -48,14 +123,51 @@ class InventoryPro:
         self.current_user = None
         self.groups: Dict[str, InventoryGroup] = {}
         self.items: Dict[str, InventoryItem] = {}
+        # Secondary indexes over self.items; change items only through
+        # set_items/put_item/drop_item so the two never drift apart
+        self.index = ItemIndex()
         self.global_characteristics: Dict[str, Dict] = {}
+        # High-water mark of "last_updated" seen so far; None until the first full load
+        self.last_synced: Optional[str] = None
+        # Groups/items/global characteristics go through the storage interface;
+        # the realtime streams below still talk to pyrebase directly. Writes are
+        # queued in a local outbox and sent in the background, so saving never
+        # waits on the network and isn't lost while offline.
+        self.store = OutboxRepository(FirebaseRepository(firebase), on_conflict=self.write_conflicted)
+        self.cache = CatalogCache()
+        self.thumbnails = ThumbnailCache(on_ready=self.thumbnail_ready)
+        self.uploader = PhotoUploader(
+            firebase,
+            on_status=lambda item_id: self.refresh_item_controls([item_id]),
+            on_done=self.photo_uploaded,
+            thumbnails=self.thumbnails
+        )
+        
+        # Realtime streams (pyrebase runs each one on its own thread)
+        self.streams = []
+        # Held for every change to, and every read of, groups, items, the index and the
+        # view state (visible_ids, item_controls): the sync, stream, upload, outbox and
+        # import threads all change them while UI handlers read them. Re-entrant, as
+        # handlers that hold it call helpers that take it again.
+        self.catalog_lock = threading.RLock()
+        
+        # Ids matching the current filter, of which only the first rendered_count
+        # have controls. item_controls lets single items be patched in place.
+        self.filter_group: Optional[str] = None
+        self.visible_ids: List[str] = []
+        self.rendered_count = 0
+        self.table_page = 0
+        self.items_control: Optional[ft.Control] = None
+        self.item_controls: Dict[str, ft.Control] = {}
         
         self.file_picker = ft.FilePicker()
         self.page.overlay.append(self.file_picker)
         
         self.setup_ui()
         self.check_auth()
-        self.load_inventory_data()
+        # Render the last snapshot from disk, then reconcile with Firebase off the UI thread
+        self.load_cached_catalog()
+        threading.Thread(target=self.refresh_in_background, daemon=True).start()
 
     def setup_ui(self):
         self.page.bgcolor = ft.colors.BLACK
@@ -95,12 +207,20 @@ class InventoryPro:
             on_change=self.filter_items
         )
         
+        self.search_field = ft.TextField(
+            hint_text="Search items",
+            prefix_icon=ft.icons.SEARCH,
+            on_change=self.filter_items,
+            expand=True
+        )
+        
         self.inventory_content = ft.Column([
             ft.Row([
                 ft.ElevatedButton("Add Group", on_click=self.show_add_group_dialog),
                 ft.ElevatedButton("Add Item", on_click=self.show_add_item_dialog),
                 self.view_mode,
-                self.group_filter
+                self.group_filter,
+                self.search_field
             ]),
             ft.Column()  # Items will be displayed here
         ], expand=True)
@@ -145,6 +265,8 @@ class InventoryPro:
             actions=[
                 ft.IconButton(icon=ft.icons.DARK_MODE, on_click=self.toggle_theme),
                 ft.IconButton(icon=ft.icons.SYNC, on_click=self.sync_data),
+                ft.IconButton(icon=ft.icons.UPLOAD_FILE, tooltip="Import items", on_click=self.pick_import_file),
+                ft.IconButton(icon=ft.icons.WIFI_TETHERING, tooltip="Live sync", on_click=self.toggle_streaming),
                 ft.PopupMenuButton(
                     icon=ft.icons.MORE_VERT,
                     items=[ft.PopupMenuItem(text="Logout", on_click=self.logout)]
@@ -187,43 +309,157 @@ class InventoryPro:
         self.page.update()
 
     # ===== INVENTORY MANAGEMENT METHODS =====
-    def load_inventory_data(self):
-        # Load groups from Firebase
-        groups_data = db.child("inventory_groups").get().val() or {}
-        for group_name, group_data in groups_data.items():
-            self.groups[group_name] = InventoryGroup(
+    def load_cached_catalog(self):
+        groups_data, items_data, global_chars, last_synced = self.cache.load()
+        if last_synced is None:
+            return
+        
+        groups = {
+            group_name: InventoryGroup(
                 name=group_name,
                 characteristics=group_data.get("characteristics", {})
             )
+            for group_name, group_data in groups_data.items()
+        }
+        items = {
+            item_id: InventoryItem.from_dict(item_data)
+            for item_id, item_data in items_data.items()
+        }
+        with self.catalog_lock:
+            self.groups = groups
+            self.set_items(items)
+        self.global_characteristics = global_chars
+        self.last_synced = last_synced
+        self.update_group_filter()
+        self.display_items()
+
+    def refresh_in_background(self):
+        try:
+            if self.load_inventory_data():
+                self.display_items(self.filter_group)
+        except Exception as ex:
+            print(f"Background sync error: {ex}")
+
+    def load_inventory_data(self) -> bool:
+        """Full load on first call, then only records changed since the last sync.
+        Returns True if anything in groups or items changed."""
+        # Global characteristics are a single small node, always fetched whole
+        self.global_characteristics = self.store.get_global_characteristics()
+        
+        if self.last_synced is None:
+            changed = self.load_full_snapshot()
+        else:
+            changed = self.load_changes_since(self.last_synced)
+        
+        if changed:
+            self.update_group_filter()
+        return changed
+
+    def load_full_snapshot(self) -> bool:
+        groups_data, items_data, _ = self.store.load_all()
         
-        # Load global characteristics
-        self.global_characteristics = db.child("global_characteristics").get().val() or {}
-        
-        # Load items
-        items_data = db.child("inventory_items").get().val() or {}
-        for item_id, item_data in items_data.items():
-            self.items[item_id] = InventoryItem(
-                name=item_data["name"],
-                group=item_data["group"],
-                characteristics=item_data["characteristics"],
-                photo_url=item_data.get("photo_url")
+        groups = {
+            group_name: InventoryGroup(
+                name=group_name,
+                characteristics=group_data.get("characteristics", {})
             )
+            for group_name, group_data in groups_data.items()
+        }
+        items = {
+            item_id: InventoryItem.from_dict(item_data)
+            for item_id, item_data in items_data.items()
+        }
+        with self.catalog_lock:
+            self.groups = groups
+            self.set_items(items)
         
-        self.update_group_filter()
+        self.last_synced = snapshot_mark(groups_data, items_data)
+        self.cache.save_snapshot(groups_data, items_data, self.global_characteristics, self.last_synced)
+        return True
+
+    def load_changes_since(self, since: str) -> bool:
+        # Starts before the mark (see sync.SYNC_OVERLAP); records already held come back and are skipped
+        changes, self.last_synced = fetch_changes(self.store, since)
+        # Local writes still in the outbox win over older remote copies
+        pending_groups, pending_items = self.store.pending("group"), self.store.pending("item")
+        
+        with self.catalog_lock:
+            changed_groups, changed_items, removed_groups, removed_items = merge_changes(
+                changes, self.groups, self.items, pending_groups, pending_items,
+                make_group=lambda name, data: InventoryGroup(name=name, characteristics=data.get("characteristics", {})),
+                make_item=InventoryItem.from_dict,
+                put_item=self.put_item,
+                drop_item=self.drop_item
+            )
+        
+        self.cache.apply_changes(
+            {**changed_groups, **{name: None for name in removed_groups}},
+            {**changed_items, **{item_id: None for item_id in removed_items}},
+            self.global_characteristics,
+            self.last_synced
+        )
+        return bool(changed_groups or changed_items or removed_groups or removed_items)
+
+    def write_conflicted(self, kind: str, key: str):
+        """Runs on the outbox thread when a queued write was dropped because the
+        remote copy is newer: take the remote version instead"""
+        if kind != "item":
+            self.refresh_in_background()
+            return
+        item_data = self.store.get_item(key)
+        with self.catalog_lock:
+            if item_data is None:
+                self.drop_item(key)
+            else:
+                self.put_item(key, InventoryItem.from_dict(item_data))
+        self.cache.apply_changes({}, {key: item_data})
+        self.refresh_item_controls([key])
+
+    def set_items(self, items: Dict[str, InventoryItem]):
+        with self.catalog_lock:
+            self.items = items
+            self.index.rebuild(items)
+
+    def put_item(self, item_id: str, item: InventoryItem):
+        with self.catalog_lock:
+            self.items[item_id] = item
+            self.index.add(item_id, item)
+
+    def drop_item(self, item_id: str):
+        with self.catalog_lock:
+            self.items.pop(item_id, None)
+            self.index.remove(item_id)
 
     def update_group_filter(self):
+        with self.catalog_lock:
+            group_names = list(self.groups)
         self.group_filter.options = [
             ft.dropdown.Option("All Groups")
         ] + [
-            ft.dropdown.Option(group) for group in self.groups.keys()
+            ft.dropdown.Option(group) for group in group_names
         ]
         self.group_filter.update()
 
     def display_items(self, filter_group: Optional[str] = None):
+        with self.catalog_lock:
+            self.build_items_view(filter_group)
+        self.page.update()
+
+    def build_items_view(self, filter_group: Optional[str] = None):
         if len(self.inventory_content.controls) > 1:
             self.inventory_content.controls.pop()
         
-        items_view = ft.Column()
+        self.filter_group = filter_group
+        query = (self.search_field.value or "").strip()
+        if query:
+            self.visible_ids = self.index.search(query, SEARCH_LIMIT, filter_group)
+        else:
+            self.visible_ids = list(self.index.ids_in_group(filter_group) if filter_group else self.items)
+        self.rendered_count = 0
+        self.table_page = 0
+        self.items_control = None
+        self.item_controls = {}
+        items_view = ft.Column(expand=True)
         
         if self.view_mode.value == "icons":
             self.display_icon_view(items_view, filter_group)
@@ -233,7 +469,6 @@ class InventoryPro:
             self.display_table_view(items_view, filter_group)
         
         self.inventory_content.controls.append(items_view)
-        self.page.update()
 
     def display_icon_view(self, container: ft.Column, filter_group: Optional[str] = None):
         grid = ft.GridView(
@@ -243,27 +478,300 @@ class InventoryPro:
             child_aspect_ratio=1,
             spacing=10,
             run_spacing=10,
+            on_scroll_interval=100,
+            on_scroll=self.on_items_scroll
         )
+        self.items_control = grid
+        self.render_next_page()
+        container.controls.append(grid)
+
+    def display_list_view(self, container: ft.Column, filter_group: Optional[str] = None):
+        list_view = ft.ListView(
+            expand=True,
+            spacing=5,
+            on_scroll_interval=100,
+            on_scroll=self.on_items_scroll
+        )
+        self.items_control = list_view
+        self.render_next_page()
+        container.controls.append(list_view)
+
+    def display_table_view(self, container: ft.Column, filter_group: Optional[str] = None):
+        """DataTable can't grow lazily on scroll, so it shows one page at a time"""
+        self.items_control = ft.DataTable(
+            columns=[
+                ft.DataColumn(ft.Text("Name", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Group", weight=ft.FontWeight.BOLD)),
+                ft.DataColumn(ft.Text("Updated", weight=ft.FontWeight.BOLD)),
+            ]
+        )
+        self.table_page_label = ft.Text()
+        self.render_table_page()
         
-        for item_id, item in self.items.items():
-            if filter_group and item.group != filter_group:
-                continue
-                
-            card = ft.Card(
-                content=ft.Container(
-                    content=ft.Column([
-                        ft.Image(src=item.photo_url, width=150, height=100, fit=ft.ImageFit.CONTAIN) if item.photo_url else ft.Icon(ft.icons.IMAGE, size=50),
-                        ft.Text(item.name, weight=ft.FontWeight.BOLD),
-                        ft.Text(f"Group: {item.group}"),
-                        ft.FilledButton("Details", on_click=lambda e, i=item_id: self.show_item_details(i))
-                    ], alignment=ft.MainAxisAlignment.CENTER),
-                    padding=10,
-                    on_click=lambda e, i=item_id: self.show_item_details(i)
-                )
+        container.controls.extend([
+            ft.Column([self.items_control], scroll=ft.ScrollMode.AUTO, expand=True),
+            ft.Row([
+                ft.IconButton(icon=ft.icons.CHEVRON_LEFT, on_click=lambda e: self.change_table_page(-1)),
+                self.table_page_label,
+                ft.IconButton(icon=ft.icons.CHEVRON_RIGHT, on_click=lambda e: self.change_table_page(1)),
+            ], alignment=ft.MainAxisAlignment.CENTER)
+        ])
+
+    def render_next_page(self):
+        """Build controls for the next slice of visible_ids (icons/list views)"""
+        with self.catalog_lock:
+            end = min(self.rendered_count + ITEMS_PAGE_SIZE, len(self.visible_ids))
+            for item_id in self.visible_ids[self.rendered_count:end]:
+                control = self.build_item_control(item_id, self.items[item_id])
+                self.item_controls[item_id] = control
+                self.items_control.controls.append(control)
+            self.rendered_count = end
+
+    def on_items_scroll(self, e: ft.OnScrollEvent):
+        with self.catalog_lock:
+            if self.rendered_count >= len(self.visible_ids) or e.pixels < e.max_scroll_extent - 300:
+                return
+            self.render_next_page()
+        self.items_control.update()
+
+    def render_table_page(self):
+        with self.catalog_lock:
+            page_count = max(1, -(-len(self.visible_ids) // ITEMS_PAGE_SIZE))
+            self.table_page = min(max(self.table_page, 0), page_count - 1)
+            start = self.table_page * ITEMS_PAGE_SIZE
+            
+            self.item_controls = {}
+            for item_id in self.visible_ids[start:start + ITEMS_PAGE_SIZE]:
+                self.item_controls[item_id] = self.build_item_control(item_id, self.items[item_id])
+            self.items_control.rows = list(self.item_controls.values())
+            self.table_page_label.value = f"Page {self.table_page + 1} of {page_count}"
+
+    def change_table_page(self, step: int):
+        self.table_page += step
+        self.render_table_page()
+        self.page.update()
+
+    def build_item_control(self, item_id: str, item: InventoryItem) -> ft.Control:
+        upload_status = self.uploader.status.get(item_id)
+        # Tiles only ever show the locally cached thumbnail; full photos load in show_item_details
+        thumb_source = item.thumb_url or item.photo_url
+        thumb_path = self.thumbnails.get(thumb_source) if thumb_source and self.view_mode.value != "table" else None
+        if self.view_mode.value == "list":
+            return ft.ListTile(
+                leading=self.build_upload_badge(upload_status, 24) if upload_status
+                else ft.Image(src=thumb_path, width=40, height=40, fit=ft.ImageFit.COVER) if thumb_path else ft.Icon(ft.icons.IMAGE),
+                title=ft.Text(item.name, weight=ft.FontWeight.BOLD),
+                subtitle=ft.Text(f"Group: {item.group}"),
+                on_click=lambda e, i=item_id: self.show_item_details(i)
+            )
+        if self.view_mode.value == "table":
+            return ft.DataRow(
+                cells=[
+                    ft.DataCell(ft.Text(item.name)),
+                    ft.DataCell(ft.Text(item.group)),
+                    ft.DataCell(ft.Text(item.last_updated[:16])),
+                ],
+                on_select_changed=lambda e, i=item_id: self.show_item_details(i)
             )
-            grid.controls.append(card)
+        return ft.Card(
+            content=ft.Container(
+                content=ft.Column([
+                    ft.Column([self.build_upload_badge(upload_status, 40), ft.Text(upload_status, size=12)],
+                              horizontal_alignment=ft.CrossAxisAlignment.CENTER) if upload_status
+                    else ft.Image(src=thumb_path, width=150, height=100, fit=ft.ImageFit.CONTAIN) if thumb_path else ft.Icon(ft.icons.IMAGE, size=50),
+                    ft.Text(item.name, weight=ft.FontWeight.BOLD),
+                    ft.Text(f"Group: {item.group}"),
+                    ft.FilledButton("Details", on_click=lambda e, i=item_id: self.show_item_details(i))
+                ], alignment=ft.MainAxisAlignment.CENTER),
+                padding=10,
+                on_click=lambda e, i=item_id: self.show_item_details(i)
+            )
+        )
+
+    def build_upload_badge(self, upload_status: str, size: int) -> ft.Control:
+        if upload_status == "Upload failed":
+            return ft.Icon(ft.icons.BROKEN_IMAGE, color=ft.colors.RED, size=size, tooltip=upload_status)
+        return ft.ProgressRing(width=size, height=size, tooltip=upload_status)
+
+    def refresh_item_controls(self, item_ids):
+        """Add, patch or drop just these items' controls in the visible view.
+        Existing controls are patched in place so only they are sent to the client."""
+        with self.catalog_lock:
+            self.patch_item_controls(item_ids)
+
+    def patch_item_controls(self, item_ids):
+        if self.items_control is None or self.items_control.page is None:
+            return
         
-        container.controls.append(grid)
+        patched = []
+        structure_changed = False
+        for item_id in item_ids:
+            item = self.items.get(item_id)
+            old_control = self.item_controls.get(item_id)
+            visible = item is not None and self.is_item_visible(item_id, item)
+            
+            if visible and old_control is not None:
+                self.patch_item_control(old_control, self.build_item_control(item_id, item))
+                patched.append(old_control)
+            elif visible and item_id not in self.visible_ids:
+                self.visible_ids.append(item_id)
+                structure_changed = structure_changed or self.append_item_control(item_id, item)
+            elif not visible and item_id in self.visible_ids:
+                self.visible_ids.remove(item_id)
+                structure_changed = structure_changed or self.remove_item_control(item_id)
+        
+        if self.view_mode.value == "table" and structure_changed:
+            self.render_table_page()
+            self.table_page_label.update()
+        if structure_changed:
+            self.items_control.update()
+        else:
+            for control in patched:
+                control.update()
+
+    def is_item_visible(self, item_id: str, item: InventoryItem) -> bool:
+        """Whether item belongs in the current view (group filter and search box)"""
+        if self.filter_group and item.group != self.filter_group:
+            return False
+        query = (self.search_field.value or "").strip()
+        return not query or self.index.matches(item_id, query)
+
+    def append_item_control(self, item_id: str, item: InventoryItem) -> bool:
+        """Returns True if the rendered view changed"""
+        if self.view_mode.value == "table":
+            # Lands on the current page only if that page isn't full yet
+            return len(self.item_controls) < ITEMS_PAGE_SIZE
+        # Lazy views: only render it if everything before it already is
+        if self.rendered_count != len(self.visible_ids) - 1:
+            return False
+        control = self.build_item_control(item_id, item)
+        self.item_controls[item_id] = control
+        self.items_control.controls.append(control)
+        self.rendered_count += 1
+        return True
+
+    def remove_item_control(self, item_id: str) -> bool:
+        """Returns True if the rendered view changed"""
+        control = self.item_controls.pop(item_id, None)
+        if control is None:
+            return False
+        if self.view_mode.value != "table":
+            self.items_control.controls.remove(control)
+            self.rendered_count -= 1
+        return True
+
+    def patch_item_control(self, control: ft.Control, fresh: ft.Control):
+        """Move the content of a freshly built control into the one on screen"""
+        if isinstance(control, ft.DataRow):
+            control.cells = fresh.cells
+        elif isinstance(control, ft.ListTile):
+            control.leading = fresh.leading
+            control.title = fresh.title
+            control.subtitle = fresh.subtitle
+        else:
+            control.content = fresh.content
+
+    # ===== REALTIME STREAMING =====
+    def toggle_streaming(self, e):
+        if self.streams:
+            self.stop_streaming()
+            self.show_snackbar("Live sync off", ft.colors.ORANGE)
+        else:
+            self.start_streaming()
+            self.show_snackbar("Live sync on", ft.colors.GREEN)
+
+    def start_streaming(self):
+        """Listen for changes after the current high-water mark only (less
+        sync.SYNC_OVERLAP), so the initial put event carries the delta rather
+        than the whole tree"""
+        since = query_mark(self.last_synced or "")
+        for path in ("inventory_items", "inventory_groups", "deleted_items"):
+            query = db.child(path)
+            query = query.order_by_value() if path == "deleted_items" else query.order_by_child("last_updated")
+            self.streams.append(
+                query.start_at(since).stream(lambda message, p=path: self.handle_stream_event(p, message))
+            )
+
+    def stop_streaming(self):
+        for stream in self.streams:
+            stream.close()
+        self.streams = []
+
+    def handle_stream_event(self, path: str, message: Dict):
+        """Runs on a pyrebase stream thread. Turns a put/patch event into
+        {key: new record or None} and applies it to the in-memory catalog."""
+        if message.get("event") not in ("put", "patch"):
+            return
+        
+        event, data = message["event"], message["data"]
+        parts = [part for part in message["path"].split("/") if part]
+        
+        with self.catalog_lock:
+            if not parts and event == "put":
+                # Root put is the initial (query-filtered) snapshot of whole records
+                changes = dict(data or {})
+            elif not parts:
+                # Root patch: each key is a child path ("id" or "id/photo_url", as a
+                # multi-path update sends them) whose value replaces what is there
+                changes = {}
+                for sub_path, value in (data or {}).items():
+                    key, *rest = [part for part in sub_path.split("/") if part]
+                    record = changes[key] if key in changes else self.get_stream_record(path, key)
+                    changes[key] = apply_stream_change(record, rest, value, "put")
+            else:
+                key, rest = parts[0], parts[1:]
+                record = self.get_stream_record(path, key)
+                changes = {key: apply_stream_change(record, rest, data, event)}
+            
+            if path == "deleted_items":
+                # Tombstones: {item_id: deleted_at}; only act on non-null stamps
+                changes = {key: None for key, stamp in changes.items() if stamp and key in self.items}
+                path = "inventory_items"
+            
+            # Deletions, or whole records; a partial one (a patch to an item not held) is dropped
+            changes = {
+                key: record for key, record in changes.items()
+                if record is None or (isinstance(record, dict)
+                                      and (path == "inventory_groups" or ("name" in record and "group" in record)))
+            }
+            for key, record in changes.items():
+                if record and record.get("last_updated", "") > (self.last_synced or ""):
+                    self.last_synced = record["last_updated"]
+                
+                if path == "inventory_items":
+                    if record is None:
+                        self.drop_item(key)
+                    else:
+                        self.put_item(key, InventoryItem.from_dict(record))
+                else:
+                    if record is None:
+                        self.groups.pop(key, None)
+                    else:
+                        self.groups[key] = InventoryGroup(
+                            name=key,
+                            characteristics=record.get("characteristics", {})
+                        )
+        
+        if not changes:
+            return
+        self.cache.apply_changes(
+            changes if path == "inventory_groups" else {},
+            changes if path == "inventory_items" else {},
+            last_synced=self.last_synced
+        )
+        if path == "inventory_items":
+            self.refresh_item_controls(changes.keys())
+        else:
+            self.update_group_filter()
+
+    def get_stream_record(self, path: str, key: str) -> Optional[Dict]:
+        if path == "inventory_items":
+            item = self.items.get(key)
+            return item.to_dict() if item else None
+        if path == "inventory_groups":
+            group = self.groups.get(key)
+            return {"name": group.name, "characteristics": group.characteristics} if group else None
+        return None
 
     def show_add_group_dialog(self, e):
         group_name = ft.TextField(label="Group Name")
@@ -337,18 +845,22 @@ class InventoryPro:
                         group_chars[char_name] = self.global_characteristics[char_name]
             
             # Save to Firebase
-            db.child("inventory_groups").child(group_name.value).set({
+            group_record = {
                 "name": group_name.value,
-                "characteristics": group_chars
-            })
+                "characteristics": group_chars,
+                "last_updated": datetime.now().isoformat()
+            }
+            self.store.put_group(group_name.value, group_record)
             
             # Save global characteristics
-            db.child("global_characteristics").set(self.global_characteristics)
+            self.store.set_global_characteristics(self.global_characteristics)
+            self.cache.apply_changes({group_name.value: group_record}, {}, self.global_characteristics)
             
-            self.groups[group_name.value] = InventoryGroup(
-                name=group_name.value,
-                characteristics=group_chars
-            )
+            with self.catalog_lock:
+                self.groups[group_name.value] = InventoryGroup(
+                    name=group_name.value,
+                    characteristics=group_chars
+                )
             self.update_group_filter()
             self.page.dialog.open = False
             self.page.update()
@@ -449,36 +961,25 @@ class InventoryPro:
                 
                 characteristics[char_name] = value
             
-            # Upload photo if selected
-            photo_url = None
-            if photo_display.src and photo_display.visible:
-                try:
-                    storage_path = f"inventory_photos/{uuid.uuid4()}.{photo_display.src.split('.')[-1]}"
-                    storage.child(storage_path).put(photo_display.src)
-                    photo_url = storage.child(storage_path).get_url(None)
-                except Exception as ex:
-                    print(f"Photo upload error: {ex}")
-            
-            # Create and save item
+            # Create and save item; the photo uploads in the background and is patched in after
             item_id = uuid.uuid4().hex
             new_item = InventoryItem(
                 name=item_name.value,
                 group=group_dropdown.value,
-                characteristics=characteristics,
-                photo_url=photo_url
+                characteristics=characteristics
             )
+            photo_pending = bool(photo_display.src and photo_display.visible)
             
-            db.child("inventory_items").child(item_id).set({
-                "name": new_item.name,
-                "group": new_item.group,
-                "characteristics": new_item.characteristics,
-                "photo_url": new_item.photo_url,
-                "created_at": new_item.created_at,
-                "last_updated": new_item.last_updated
-            })
+            record = new_item.to_dict()
+            if photo_pending:
+                record["photo_status"] = "pending"
+            self.store.put_item(item_id, record)
+            self.cache.apply_changes({}, {item_id: new_item.to_dict()})
             
-            self.items[item_id] = new_item
-            self.display_items()
+            self.put_item(item_id, new_item)
+            if photo_pending:
+                self.uploader.submit(item_id, photo_display.src)
+            self.refresh_item_controls([item_id])
             self.close_dialog()
             self.show_snackbar("Item added!", ft.colors.GREEN)
         
@@ -605,33 +1106,34 @@ class InventoryPro:
                 
                 characteristics[char_name] = value
             
-            # Handle photo update
-            photo_url = item.photo_url
-            if photo_display.src and photo_display.src != item.photo_url:
-                try:
-                    storage_path = f"inventory_photos/{uuid.uuid4()}.{photo_display.src.split('.')[-1]}"
-                    storage.child(storage_path).put(photo_display.src)
-                    photo_url = storage.child(storage_path).get_url(None)
-                except Exception as ex:
-                    print(f"Photo upload error: {ex}")
+            # A new photo keeps the old url until the background upload finishes
+            photo_pending = bool(photo_display.src and photo_display.src != item.photo_url)
             
             # Update item
             updated_item = InventoryItem(
                 name=item_name.value,
                 group=item.group,
                 characteristics=characteristics,
-                photo_url=photo_url
+                photo_url=item.photo_url,
+                created_at=item.created_at,
+                thumb_url=item.thumb_url
             )
             
-            db.child("inventory_items").child(item_id).update({
+            changes = {
                 "name": updated_item.name,
                 "characteristics": updated_item.characteristics,
                 "photo_url": updated_item.photo_url,
                 "last_updated": updated_item.last_updated
-            })
+            }
+            if photo_pending:
+                changes["photo_status"] = "pending"
+            self.store.update_item(item_id, changes)
+            self.cache.apply_changes({}, {item_id: updated_item.to_dict()})
             
-            self.items[item_id] = updated_item
-            self.display_items()
+            self.put_item(item_id, updated_item)
+            if photo_pending:
+                self.uploader.submit(item_id, photo_display.src)
+            self.refresh_item_controls([item_id])
             self.close_dialog()
             self.show_snackbar("Item updated!", ft.colors.GREEN)
         
@@ -657,9 +1159,11 @@ class InventoryPro:
 
     def delete_item(self, item_id: str):
         def confirm_delete(e):
-            db.child("inventory_items").child(item_id).remove()
-            del self.items[item_id]
-            self.display_items()
+            # Leaves a tombstone so other terminals drop the item on their next delta sync
+            self.store.delete_item(item_id, datetime.now().isoformat())
+            self.cache.apply_changes({}, {item_id: None})
+            self.drop_item(item_id)
+            self.refresh_item_controls([item_id])
             self.close_dialog()
             self.show_snackbar("Item deleted", ft.colors.RED)
         
@@ -674,6 +1178,38 @@ class InventoryPro:
         )
         self.page.update()
 
+    def thumbnail_ready(self, url: str):
+        """Runs on a thumbnail thread once url is cached; redraw the rendered items using it"""
+        with self.catalog_lock:
+            self.refresh_item_controls([
+                item_id for item_id in self.item_controls
+                if item_id in self.items and (self.items[item_id].thumb_url or self.items[item_id].photo_url) == url
+            ])
+
+    def photo_uploaded(self, item_id: str, photo_url: Optional[str], thumb_url: Optional[str]):
+        """Runs on an upload thread once a queued photo is stored (or has failed)"""
+        with self.catalog_lock:
+            item = self.items.get(item_id)
+            if item is not None and photo_url is not None:
+                item.photo_url = photo_url
+                item.thumb_url = thumb_url
+                item.last_updated = datetime.now().isoformat()
+            record = item.to_dict() if item is not None else None
+        if item is None:
+            return  # deleted while uploading
+        
+        if photo_url is None:
+            self.store.update_item(item_id, {"photo_status": "failed"})
+        else:
+            self.store.update_item(item_id, {
+                "photo_url": photo_url,
+                "thumb_url": thumb_url,
+                "photo_status": None,
+                "last_updated": item.last_updated
+            })
+            self.cache.apply_changes({}, {item_id: record})
+        self.refresh_item_controls([item_id])
+
     def handle_photo_selection(self, e: ft.FilePickerResultEvent, photo_display: ft.Image):
         if e.files:
             photo_path = e.files[0].path
@@ -683,11 +1219,59 @@ class InventoryPro:
             photo_display.visible = False
         photo_display.update()
 
+    def pick_import_file(self, e):
+        self.file_picker.pick_files(
+            allowed_extensions=["csv", "jsonl", "ndjson"],
+            on_result=self.import_file_picked
+        )
+
+    def import_file_picked(self, e: ft.FilePickerResultEvent):
+        if not e.files:
+            return
+        path = e.files[0].path
+        self.show_snackbar(f"Importing {e.files[0].name}...", ft.colors.BLUE)
+        # Large files take a while to validate and write; keep the UI responsive
+        threading.Thread(target=self.import_items_file, args=(path,), daemon=True).start()
+
+    def import_items_file(self, path: str):
+        """Runs on its own thread: import a CSV / JSON Lines file through the
+        outbox, adding each written batch to the local items and cache"""
+        with self.catalog_lock:
+            schemas = {name: group.characteristics for name, group in self.groups.items()}
+
+        def stored_item(item_id: str) -> Optional[Dict]:
+            # The local copy, not a Firebase read per row with an id
+            with self.catalog_lock:
+                item = self.items.get(item_id)
+                return item.to_dict() if item else None
+
+        def batch_written(records: Dict[str, Dict]):
+            items = {item_id: InventoryItem.from_dict(record) for item_id, record in records.items()}
+            with self.catalog_lock:
+                for item_id, item in items.items():
+                    self.put_item(item_id, item)
+            self.cache.apply_changes({}, records)
+
+        try:
+            imported, rejected = import_items(path, self.store, schemas, on_batch=batch_written,
+                                              stored_item=stored_item)
+        except (OSError, UnicodeDecodeError, csv.Error) as ex:
+            self.show_snackbar(f"Import failed: {ex}", ft.colors.RED)
+            return
+        if imported:
+            self.display_items(self.filter_group)
+        if rejected:
+            self.show_snackbar(f"Imported {imported} items; {rejected} rejected, see {rejects_path_for(path)}",
+                               ft.colors.ORANGE)
+        else:
+            self.show_snackbar(f"Imported {imported} items!", ft.colors.GREEN)
+
     def change_view_mode(self, e):
         self.display_items(self.group_filter.value if self.group_filter.value != "All Groups" else None)
 
     def filter_items(self, e):
-        filter_group = e.control.value if e.control.value != "All Groups" else None
+        """Group dropdown and search box both re-run the same filtered display"""
+        filter_group = self.group_filter.value if self.group_filter.value != "All Groups" else None
         self.display_items(filter_group)
 
     def toggle_theme(self, e):
@@ -695,7 +1279,9 @@ class InventoryPro:
         self.page.update()
 
     def sync_data(self, e):
-        self.load_inventory_data()
+        self.store.flush_soon()
+        if self.load_inventory_data():
+            self.display_items(self.group_filter.value if self.group_filter.value != "All Groups" else None)
         self.show_snackbar("Data synced!", ft.colors.GREEN)
 
     def check_auth(self):
@@ -732,6 +1318,7 @@ class InventoryPro:
         )
 
     def logout(self, e):
+        self.stop_streaming()
         auth.sign_out()
         self.current_user = None
         self.show_login()
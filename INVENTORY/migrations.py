@@ -0,0 +1,136 @@
+import sqlite3
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from sql_builder import quote_identifier
+
+
+# (version, description, apply(conn)); append only, never renumber
+Migration = Tuple[int, str, Callable[[sqlite3.Connection], None]]
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> Dict[str, str]:
+    """Column name -> declared type, empty if the table doesn't exist"""
+    return {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({quote_identifier(table)})")}
+
+
+def add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> List[str]:
+    """ALTER in the columns (name -> SQL type) table doesn't have yet; returns the added names"""
+    existing = table_columns(conn, table)
+    added = [name for name in columns if name not in existing]
+    for name in added:
+        conn.execute(f"ALTER TABLE {quote_identifier(table)} ADD COLUMN {quote_identifier(name)} {columns[name]}")
+    return added
+
+
+def rebuild_table(conn: sqlite3.Connection, table: str, create_sql: str, columns: Dict[str, str]) -> int:
+    """Recreate table from create_sql (a CREATE TABLE for a temporary name passed
+    as {table}), copying the rows over with values cast to the new column types.
+    Rows that break the new constraints (NOT NULL, UNIQUE) can't be copied; they
+    are kept as they were in {table}__rejected. Returns how many were rejected."""
+    old = table_columns(conn, table)
+    new_name = f"{table}__new"
+    rejected_name = f"{table}__rejected"
+    conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(new_name)}")
+    conn.execute(create_sql.format(table=quote_identifier(new_name)))
+    rejected = []
+    if old:
+        copied = [name for name in columns if name in old]
+        selects = [
+            quote_identifier(name) if columns[name] == "TEXT"
+            else f"CAST(NULLIF({quote_identifier(name)}, '') AS {columns[name]})"
+            for name in copied
+        ]
+        insert = (f"INSERT INTO {quote_identifier(new_name)} ({', '.join(map(quote_identifier, copied))}) "
+                  f"VALUES ({', '.join('?' * len(copied))})")
+        rows = conn.execute(f"SELECT rowid, {', '.join(selects)} FROM {quote_identifier(table)} ORDER BY rowid")
+        for rowid, *values in rows.fetchall():
+            try:
+                conn.execute(insert, values)
+            except sqlite3.IntegrityError:
+                rejected.append((rowid,))
+        if rejected:
+            conn.execute("CREATE TEMP TABLE rebuild_rejected (rowid INTEGER PRIMARY KEY)")
+            conn.executemany("INSERT INTO rebuild_rejected VALUES (?)", rejected)
+            conn.execute(f"DROP TABLE IF EXISTS {quote_identifier(rejected_name)}")
+            conn.execute(f"CREATE TABLE {quote_identifier(rejected_name)} AS SELECT * FROM {quote_identifier(table)} "
+                         f"WHERE rowid IN (SELECT rowid FROM rebuild_rejected)")
+            conn.execute("DROP TABLE rebuild_rejected")
+            print(f"{len(rejected)} {table} rows break the new constraints; kept in {rejected_name}")
+        conn.execute(f"DROP TABLE {quote_identifier(table)}")
+    conn.execute(f"ALTER TABLE {quote_identifier(new_name)} RENAME TO {quote_identifier(table)}")
+    return len(rejected)
+
+
+def create_index(conn: sqlite3.Connection, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    name = quote_identifier(f"{'ux' if unique else 'ix'}_{table}_{'_'.join(columns)}")
+    conn.execute(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+        f"ON {quote_identifier(table)} ({', '.join(map(quote_identifier, columns))})"
+    )
+
+
+# ========== VERSIONING ==========
+def current_version(conn: sqlite3.Connection, component: str = "catalog") -> int:
+    try:
+        row = conn.execute("SELECT version FROM schema_version WHERE component = ?", (component,)).fetchone()
+    except sqlite3.OperationalError:
+        return 0  # No schema_version table yet
+    return row[0] if row else 0
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration], component: str = "catalog") -> int:
+    """Bring component's tables up to its newest migration and return that version.
+    Each component (set of tables) keeps its own number in schema_version, so
+    modules sharing a database file can add migrations independently.
+    An up-to-date database costs one SELECT. Pending migrations run together
+    in one transaction, so a failure leaves the schema as it was."""
+    latest = migrations[-1][0] if migrations else 0
+    if current_version(conn, component) >= latest:
+        return latest
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Re-read under the write lock: another connection may have just migrated
+        version = current_version(conn, component)
+        for number, description, apply in migrations:
+            if number > version:
+                print(f"Applying {component} schema migration {number}: {description}")
+                apply(conn)
+        if "component" not in table_columns(conn, "schema_version"):
+            conn.execute("DROP TABLE IF EXISTS schema_version")  # single-version layout of the first release
+        conn.execute("CREATE TABLE IF NOT EXISTS schema_version (component TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+        conn.execute("INSERT OR REPLACE INTO schema_version (component, version) VALUES (?, ?)", (component, latest))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return latest
+
+
+# ========== CATALOG SCHEMA ==========
+CATEGORY_TABLE = "category"
+CATEGORY_COLUMNS = {"id": "INTEGER", "name": "TEXT", "datatype": "TEXT", "null_status": "INTEGER"}
+CATEGORY_CREATE = """
+    CREATE TABLE {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT UNIQUE NOT NULL,
+        datatype TEXT NOT NULL,
+        null_status INTEGER DEFAULT 0
+    )
+"""
+
+
+def _typed_category_table(conn: sqlite3.Connection) -> None:
+    # Older databases got category from table_creater: every column TEXT, no
+    # constraints. Rebuild it typed; duplicate or unnamed rows go to category__rejected.
+    rebuild_table(conn, CATEGORY_TABLE, CATEGORY_CREATE, CATEGORY_COLUMNS)
+
+
+def _category_datatype_index(conn: sqlite3.Connection) -> None:
+    create_index(conn, CATEGORY_TABLE, ["datatype"])
+
+
+CATALOG_MIGRATIONS: List[Migration] = [
+    (1, "typed category table", _typed_category_table),
+    (2, "index category.datatype", _category_datatype_index),
+]
@@ -0,0 +1,291 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from migrations import Migration, create_index, migrate
+from sqlite_pool import ConnectionPool
+from storage import Repository, merge_changes
+
+# ========== CONSTANTS ==========
+# Queued mutations sent per multi-path update
+FLUSH_BATCH_SIZE = 200
+# Retry delay after a failed flush doubles from the first value up to the second
+RETRY_MIN_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+# Record kind each queued operation touches; conflicts are checked per (kind, key)
+OPERATION_KINDS = {
+    "put_item": "item",
+    "update_item": "item",
+    "delete_item": "item",
+    "put_group": "group",
+    "delete_group": "group",
+    "set_global_characteristics": "global",
+}
+
+# (operation, key, payload, stamp)
+Mutation = Tuple[str, str, object, str]
+
+
+def _outbox_table(conn: sqlite3.Connection) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS outbox (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            key TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            stamp TEXT NOT NULL
+        )
+    """)
+    create_index(conn, "outbox", ["kind", "key"])
+
+
+OUTBOX_MIGRATIONS: List[Migration] = [
+    (1, "outbox of queued remote writes", _outbox_table),
+]
+
+
+def coalesce(mutations: List[Mutation]) -> List[Mutation]:
+    """Fold queued mutations to at most one per record, in the order each
+    record was last touched. A multi-path update can't name a path and one
+    of its children, and later writes make most earlier ones redundant:
+    put + update is one put, update + update one update, anything + delete
+    one delete."""
+    folded: Dict[Tuple[str, str], Mutation] = {}
+    for operation, key, payload, stamp in mutations:
+        target = (OPERATION_KINDS[operation], key)
+        previous = folded.pop(target, None)
+        if operation == "update_item" and previous is not None:
+            previous_operation, _, previous_payload, _ = previous
+            if previous_operation == "update_item":
+                payload = {**previous_payload, **payload}
+            elif previous_operation == "put_item":
+                operation, payload = "put_item", merge_changes(previous_payload, payload)
+            else:
+                # Updating a deleted item leaves just the updated fields, as it would remotely
+                operation, payload = "put_item", merge_changes({}, payload)
+        folded[target] = (operation, key, payload, stamp)
+    return list(folded.values())
+
+
+class RemoteStamps:
+    """Newest remote last_updated / deleted_at per (kind, key) among the records
+    changed since `since`, fetched once and reused for every batch of a flush"""
+
+    def __init__(self):
+        self.since: Optional[str] = None
+        self.stamps: Dict[Tuple[str, str], str] = {}
+
+    def cover(self, remote: Repository, since: str) -> None:
+        """Make sure records changed since `since` are known; fetches only when that
+        reaches further back than what was fetched before"""
+        if self.since is not None and since >= self.since:
+            return
+        groups, items, deleted_groups, deleted_items = remote.changes_since(since)
+        for kind, records, tombstones in (("group", groups, deleted_groups), ("item", items, deleted_items)):
+            for key, record in records.items():
+                self.note(kind, key, record.get("last_updated") or "")
+            for key, deleted_at in tombstones.items():
+                self.note(kind, key, deleted_at)
+        self.since = since
+
+    def get(self, kind: str, key: str) -> str:
+        return self.stamps.get((kind, key), "")
+
+    def note(self, kind: str, key: str, stamp: str) -> None:
+        """Record a remote write, e.g. one this flush just sent"""
+        self.stamps[(kind, key)] = max(self.stamps.get((kind, key), ""), stamp)
+
+
+# ========== OUTBOX ==========
+class OutboxRepository(Repository):
+    """Offline-first front for a remote Repository (Firebase). Group, item and
+    global characteristic writes are committed to a local SQLite outbox and
+    return at once; a background thread sends them to the remote in batches,
+    one apply_batch (a single multi-path update on Firebase) per batch, and
+    keeps retrying with backoff while the remote can't be reached. Queued
+    writes survive a restart and are sent on the next start.
+
+    Conflicts are settled by last_updated: once per flush, the remote records
+    changed since the oldest queued write are fetched, and a queued write
+    older than the remote record (or its tombstone) is dropped, with
+    on_conflict(kind, key) called so the caller can re-read it.
+
+    Reads and category writes go straight to the remote."""
+
+    def __init__(self, remote: Repository, db_path: str = "outbox.db",
+                 on_conflict: Optional[Callable[[str, str], None]] = None):
+        self.remote = remote
+        self.on_conflict = on_conflict
+        self.pool = ConnectionPool.for_path(db_path)
+        migrate(self.pool.get(), OUTBOX_MIGRATIONS, "outbox")
+        self.flush_lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+        # Seconds until the next attempt while the remote is failing, else None
+        self.retry_delay: Optional[float] = None
+        self.flusher = threading.Thread(target=self._flush_loop, name="outbox-flush", daemon=True)
+        self.flusher.start()
+        if self.pending_count():
+            self.flush_soon()  # left over from the last run
+
+    # ----- queueing -----
+    @staticmethod
+    def _stamp(operation: str, payload) -> Optional[str]:
+        """When a write was made: the record's last_updated or the tombstone's deleted_at"""
+        if operation.startswith("delete_"):
+            return payload
+        if operation == "set_global_characteristics":
+            return None
+        return payload.get("last_updated")
+
+    def _enqueue(self, mutations: List[Tuple[str, str, object]]) -> None:
+        """Queue (operation, key, payload) writes in one transaction, so a batch costs one fsync"""
+        conn = self.pool.get()
+        # Full sync for this connection: a write the UI has shown as saved must survive a power cut
+        conn.execute("PRAGMA synchronous = FULL")
+        now = datetime.now().isoformat()
+        with conn:
+            conn.executemany(
+                "INSERT INTO outbox (kind, operation, key, payload, stamp) VALUES (?, ?, ?, ?, ?)",
+                [(OPERATION_KINDS[operation], operation, key, json.dumps(payload),
+                  self._stamp(operation, payload) or now)
+                 for operation, key, payload in mutations]
+            )
+        if self.retry_delay is None:
+            self.flush_soon()  # while offline the retry timer sends it
+
+    def put_group(self, name, record):
+        self._enqueue([("put_group", name, record)])
+
+    def delete_group(self, name, deleted_at):
+        self._enqueue([("delete_group", name, deleted_at)])
+
+    def put_item(self, item_id, record):
+        self._enqueue([("put_item", item_id, record)])
+
+    def update_item(self, item_id, changes):
+        self._enqueue([("update_item", item_id, changes)])
+
+    def delete_item(self, item_id, deleted_at):
+        self._enqueue([("delete_item", item_id, deleted_at)])
+
+    def set_global_characteristics(self, characteristics):
+        self._enqueue([("set_global_characteristics", "", characteristics)])
+
+    def apply_batch(self, mutations):
+        self._enqueue(mutations)
+
+    def pending_count(self) -> int:
+        return self.pool.get().execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def pending(self, kind: str) -> Dict[str, str]:
+        """{key: stamp of its newest queued write} for records of kind ("item", "group")
+        not yet sent, so a sync doesn't overwrite them with older remote copies"""
+        rows = self.pool.get().execute("SELECT key, MAX(stamp) FROM outbox WHERE kind = ? GROUP BY key", (kind,))
+        return {key: stamp for key, stamp in rows}
+
+    # ----- flushing -----
+    def flush_soon(self) -> None:
+        """Have the background thread try now instead of waiting out its retry delay"""
+        self.wake.set()
+
+    def flush(self) -> int:
+        """Send everything queued; returns the number of mutations sent.
+        Raises whatever the remote raises, leaving the unsent rest queued."""
+        sent = 0
+        # One fetch of the remote changes for the whole flush, not one per batch:
+        # per batch, a large import would re-download the same records every time
+        remote_stamps = RemoteStamps()
+        with self.flush_lock:
+            conn = self.pool.get()
+            oldest = conn.execute("SELECT MIN(stamp) FROM outbox WHERE kind != 'global'").fetchone()[0]
+            if oldest is not None:
+                remote_stamps.cover(self.remote, oldest)
+            while True:
+                rows = conn.execute(
+                    "SELECT seq, operation, key, payload, stamp FROM outbox ORDER BY seq LIMIT ?",
+                    (FLUSH_BATCH_SIZE,)
+                ).fetchall()
+                if not rows:
+                    return sent
+                batch = coalesce([(operation, key, json.loads(payload), stamp)
+                                  for _, operation, key, payload, stamp in rows])
+                accepted, rejected = self._resolve_conflicts(batch, remote_stamps)
+                if accepted:
+                    self.remote.apply_batch([(operation, key, payload) for operation, key, payload, _ in accepted])
+                    for operation, key, _, stamp in accepted:
+                        remote_stamps.note(OPERATION_KINDS[operation], key, stamp)
+                with conn:
+                    conn.execute("DELETE FROM outbox WHERE seq <= ?", (rows[-1][0],))
+                sent += len(accepted)
+                if self.on_conflict is not None:
+                    for operation, key, _, _ in rejected:
+                        self.on_conflict(OPERATION_KINDS[operation], key)
+
+    def _resolve_conflicts(self, batch: List[Mutation],
+                           remote_stamps: RemoteStamps) -> Tuple[List[Mutation], List[Mutation]]:
+        """Split batch into (writes to send, writes older than the remote copy)"""
+        stamps = [stamp for operation, _, _, stamp in batch if OPERATION_KINDS[operation] != "global"]
+        if not stamps:
+            return batch, []
+        # Only fetches again for a write queued during the flush with an older stamp
+        remote_stamps.cover(self.remote, min(stamps))
+        accepted, rejected = [], []
+        for mutation in batch:
+            operation, key, _, stamp = mutation
+            kind = OPERATION_KINDS[operation]
+            if kind != "global" and remote_stamps.get(kind, key) > stamp:
+                rejected.append(mutation)
+            else:
+                accepted.append(mutation)
+        return accepted, rejected
+
+    def _flush_loop(self) -> None:
+        while True:
+            self.wake.wait(self.retry_delay)
+            self.wake.clear()
+            if self.stopping:
+                return
+            try:
+                self.flush()
+                self.retry_delay = None
+            except Exception as ex:
+                self.retry_delay = min(RETRY_MAX_DELAY, self.retry_delay * 2 if self.retry_delay else RETRY_MIN_DELAY)
+                print(f"Outbox flush failed, retrying in {self.retry_delay:.0f}s: {ex}")
+
+    # ----- pass-through -----
+    def load_all(self):
+        return self.remote.load_all()
+
+    def changes_since(self, since):
+        return self.remote.changes_since(since)
+
+    def get_groups(self):
+        return self.remote.get_groups()
+
+    def get_item(self, item_id):
+        return self.remote.get_item(item_id)
+
+    def get_global_characteristics(self):
+        return self.remote.get_global_characteristics()
+
+    def get_categories(self):
+        return self.remote.get_categories()
+
+    def put_category(self, name, datatype, null_status):
+        self.remote.put_category(name, datatype, null_status)
+
+    def delete_category(self, name):
+        self.remote.delete_category(name)
+
+    def close(self) -> None:
+        """Stop the flush thread; anything still queued is sent on the next start"""
+        self.stopping = True
+        self.wake.set()
+        self.flusher.join()
+        self.pool.close_all()
+        self.remote.close()
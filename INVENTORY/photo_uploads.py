@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from thumbnails import ThumbnailCache, make_thumbnail
+
+# ========== CONSTANTS ==========
+UPLOAD_WORKERS = 4
+UPLOAD_ATTEMPTS = 4
+BACKOFF_SECONDS = 1.0  # doubles after every failed attempt
+
+
+# ========== BACKGROUND PHOTO UPLOADS ==========
+class PhotoUploader:
+    """Uploads item photos, plus a small thumbnail for the grid, to Firebase
+    Storage on a thread pool so click handlers return immediately. status holds
+    a short label per item that is still uploading (or failed) for the item
+    card to show.
+
+    on_status(item_id) fires whenever that label changes; on_done(item_id, url,
+    thumb_url) fires once per upload, with url None if every attempt failed and
+    thumb_url None if no thumbnail could be made."""
+
+    def __init__(self, firebase, on_status: Callable[[str], None],
+                 on_done: Callable[[str, Optional[str], Optional[str]], None],
+                 thumbnails: Optional[ThumbnailCache] = None, workers: int = UPLOAD_WORKERS):
+        self.firebase = firebase
+        self.on_status = on_status
+        self.on_done = on_done
+        self.thumbnails = thumbnails
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="photo-upload")
+        # Guards status and pending, shared by the UI thread and the workers
+        self.lock = threading.Lock()
+        self.status: Dict[str, str] = {}
+        # Latest storage path per item; an older upload for the same item is dropped
+        self.pending: Dict[str, str] = {}
+
+    def submit(self, item_id: str, local_path: str) -> None:
+        storage_path = f"inventory_photos/{uuid.uuid4()}.{local_path.split('.')[-1]}"
+        with self.lock:
+            self.pending[item_id] = storage_path
+            self.status[item_id] = "Queued"
+        self.on_status(item_id)
+        self.executor.submit(self._upload, item_id, local_path, storage_path)
+
+    def _upload(self, item_id: str, local_path: str, storage_path: str) -> None:
+        # Made inside the cache dir, so adopting it later is a same-filesystem rename
+        thumb_path = make_thumbnail(local_path, self.thumbnails.cache_dir if self.thumbnails else None)
+        thumb_storage_path = storage_path.replace("inventory_photos/", "inventory_thumbs/", 1).rsplit(".", 1)[0] + ".jpg"
+        try:
+            for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+                if not self._set_status(item_id, storage_path,
+                                        "Uploading..." if attempt == 1 else f"Retry {attempt}/{UPLOAD_ATTEMPTS}..."):
+                    return  # superseded by a newer photo for this item
+                try:
+                    # Own Storage object per upload: pyrebase keeps child() paths on the instance
+                    storage = self.firebase.storage()
+                    storage.child(storage_path).put(local_path)
+                    url = storage.child(storage_path).get_url(None)
+                    thumb_url = None
+                    if thumb_path:
+                        storage.child(thumb_storage_path).put(thumb_path)
+                        thumb_url = storage.child(thumb_storage_path).get_url(None)
+                except Exception as ex:
+                    print(f"Photo upload error (attempt {attempt}): {ex}")
+                    if attempt < UPLOAD_ATTEMPTS:
+                        time.sleep(BACKOFF_SECONDS * 2 ** (attempt - 1))
+                    continue
+
+                if self._finish(item_id, storage_path, None):
+                    if thumb_url and self.thumbnails:
+                        try:
+                            self.thumbnails.add_file(thumb_url, thumb_path)
+                            thumb_path = None
+                        except OSError as ex:
+                            # Only the local copy is lost; it is downloaded again when shown
+                            print(f"Thumbnail cache error: {ex}")
+                    self.on_done(item_id, url, thumb_url)
+                return
+
+            if self._finish(item_id, storage_path, "Upload failed"):
+                self.on_done(item_id, None, None)
+        finally:
+            if thumb_path and os.path.exists(thumb_path):
+                os.remove(thumb_path)
+
+    def _set_status(self, item_id: str, storage_path: str, label: str) -> bool:
+        """Show label for the upload of storage_path; False if it was superseded"""
+        with self.lock:
+            if self.pending.get(item_id) != storage_path:
+                return False
+            self.status[item_id] = label
+        self.on_status(item_id)
+        return True
+
+    def _finish(self, item_id: str, storage_path: str, label: Optional[str]) -> bool:
+        """End the upload of storage_path, leaving label (or no label) on the item;
+        False if a newer upload for the item has taken over"""
+        with self.lock:
+            if self.pending.get(item_id) != storage_path:
+                return False
+            del self.pending[item_id]
+            if label is None:
+                self.status.pop(item_id, None)
+            else:
+                self.status[item_id] = label
+        return True
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
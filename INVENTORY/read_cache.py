@@ -0,0 +1,64 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+_MISSING = object()
+
+
+# ========== READ-THROUGH CACHE ==========
+class ReadCache:
+    """In-process results of reads from small, hot tables (the category list),
+    keyed by (table, query key). Every write path in the Database layer calls
+    invalidate(table) after it commits, so until something changes a screen
+    can re-read the table without touching SQLite.
+
+    Each table has a generation number bumped on invalidate; a load that
+    started before an invalidate is returned to its caller but not stored,
+    so a slow read can't put stale rows back into the cache.
+
+    for_path() shares one cache per database file, so a write through any
+    layer (Database, SqliteRepository) invalidates what the others cached."""
+
+    _caches: Dict[str, "ReadCache"] = {}
+    _caches_lock = threading.Lock()
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, Hashable], Any] = {}
+        self.generations: Dict[str, int] = {}
+        self.epoch = 0  # bumped by invalidate() of every table
+
+    @classmethod
+    def for_path(cls, db_path: str) -> "ReadCache":
+        with cls._caches_lock:
+            if db_path not in cls._caches:
+                cls._caches[db_path] = cls()
+            return cls._caches[db_path]
+
+    def peek(self, table: str, key: Hashable) -> Optional[Any]:
+        """Cached value or None, without loading"""
+        with self.lock:
+            value = self.entries.get((table, key), _MISSING)
+        return None if value is _MISSING else value
+
+    def get(self, table: str, key: Hashable, load: Callable[[], Any]) -> Any:
+        with self.lock:
+            value = self.entries.get((table, key), _MISSING)
+            generation = (self.epoch, self.generations.get(table, 0))
+        if value is not _MISSING:
+            return value
+        value = load()
+        with self.lock:
+            if (self.epoch, self.generations.get(table, 0)) == generation:
+                self.entries[(table, key)] = value
+        return value
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """Drop cached reads of table (all tables if None)"""
+        with self.lock:
+            if table is None:
+                self.epoch += 1
+                self.entries.clear()
+                return
+            self.generations[table] = self.generations.get(table, 0) + 1
+            for key in [key for key in self.entries if key[0] == table]:
+                del self.entries[key]
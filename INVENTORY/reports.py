@@ -0,0 +1,275 @@
+import csv
+import json
+import os
+import sqlite3
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from column_types import CONVERTERS, cell_formatter
+from migrations import CATEGORY_TABLE, Migration, create_index, table_columns
+
+# ========== CONSTANTS ==========
+# Number characteristic holding the units in stock; an item without it counts as one unit
+STOCK_CHARACTERISTIC = "quantity"
+# Items whose stock is at or below this are listed as low stock
+LOW_STOCK_THRESHOLD = 5
+# Category datatype whose characteristics are summed into price totals
+PRICE_DATATYPE = "price"
+# Columns of each report, in export order
+REPORT_COLUMNS = {
+    "group_stock": ("group_name", "item_count", "units"),
+    "category_stock": ("category", "item_count", "units"),
+    "price_totals": ("group_name", "category", "item_count", "total", "stock_value"),
+    "low_stock": ("item_id", "group_name", "name", "units"),
+}
+# Shown with two decimals; other numbers as stored
+MONEY_COLUMNS = {"total", "stock_value"}
+
+
+# ========== SUMMARY TABLES ==========
+def create_summary_tables(conn: sqlite3.Connection) -> None:
+    """Create the (empty) summary tables if missing. Doesn't commit."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS report_groups (
+            group_name TEXT PRIMARY KEY, item_count INTEGER NOT NULL, units REAL NOT NULL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS report_categories (
+            group_name TEXT NOT NULL, category TEXT NOT NULL,
+            item_count INTEGER NOT NULL, units REAL NOT NULL, total REAL NOT NULL, stock_value REAL NOT NULL,
+            PRIMARY KEY (group_name, category)
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS report_low_stock (
+            item_id TEXT PRIMARY KEY, group_name TEXT, name TEXT, units REAL NOT NULL
+        )
+    """)
+    create_index(conn, "report_low_stock", ["units"])
+
+
+def _summary_tables(conn: sqlite3.Connection) -> None:
+    create_summary_tables(conn)
+    rebuild_summaries(conn)
+
+
+REPORT_MIGRATIONS: List[Migration] = [
+    (1, "report summary tables", _summary_tables),
+]
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return CONVERTERS["REAL"](value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _contribution(record: Optional[Dict]) -> Optional[Tuple[str, float, Dict[str, Optional[float]]]]:
+    """(group, units, {characteristic: numeric value or None}) an item adds to the summaries"""
+    if not record:
+        return None
+    characteristics = record.get("characteristics") or {}
+    units = _number(characteristics.get(STOCK_CHARACTERISTIC))
+    return (
+        record.get("group") or "",
+        1.0 if units is None else units,
+        {name: _number(value) for name, value in characteristics.items()},
+    )
+
+
+def _low_stock_units(record: Optional[Dict]) -> Optional[float]:
+    if not record:
+        return None
+    units = _number((record.get("characteristics") or {}).get(STOCK_CHARACTERISTIC))
+    return units if units is not None and units <= LOW_STOCK_THRESHOLD else None
+
+
+def apply_item_change(conn: sqlite3.Connection, item_id: str, old: Optional[Dict], new: Optional[Dict]) -> None:
+    """Move the summaries from counting old (None if the item is new) to counting
+    new (None if deleted). Run it in the transaction that writes the item, so
+    the summaries always match the items table."""
+    apply_item_changes(conn, [(item_id, old, new)])
+
+
+def apply_item_changes(conn: sqlite3.Connection,
+                       changes: Iterable[Tuple[str, Optional[Dict], Optional[Dict]]]) -> None:
+    """apply_item_change for many (item_id, old, new) at once: the deltas are
+    summed per group and category first, so a batch of items costs one
+    upsert per summary row it touches rather than one per item"""
+    group_deltas = defaultdict(lambda: [0, 0.0])
+    category_deltas = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    low_stock, not_low_stock = [], []
+    for item_id, old, new in changes:
+        before, after = _contribution(old), _contribution(new)
+        if before == after and (old or {}).get("name") == (new or {}).get("name"):
+            continue  # e.g. only photo fields changed
+        for sign, contribution in ((-1, before), (1, after)):
+            if contribution is None:
+                continue
+            group, units, values = contribution
+            group_delta = group_deltas[group]
+            group_delta[0] += sign
+            group_delta[1] += sign * units
+            for category, value in values.items():
+                value = value or 0.0
+                category_delta = category_deltas[(group, category)]
+                category_delta[0] += sign
+                category_delta[1] += sign * units
+                category_delta[2] += sign * value
+                category_delta[3] += sign * value * units
+        low_units = _low_stock_units(new)
+        if low_units is None:
+            not_low_stock.append((item_id,))
+        else:
+            low_stock.append((item_id, new.get("group"), new.get("name"), low_units))
+
+    conn.executemany(
+        "INSERT INTO report_groups (group_name, item_count, units) VALUES (?, ?, ?) "
+        "ON CONFLICT (group_name) DO UPDATE SET "
+        "item_count = item_count + excluded.item_count, units = units + excluded.units",
+        [(group, *delta) for group, delta in group_deltas.items()]
+    )
+    conn.executemany(
+        "INSERT INTO report_categories (group_name, category, item_count, units, total, stock_value) "
+        "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (group_name, category) DO UPDATE SET "
+        "item_count = item_count + excluded.item_count, units = units + excluded.units, "
+        "total = total + excluded.total, stock_value = stock_value + excluded.stock_value",
+        [(*key, *delta) for key, delta in category_deltas.items()]
+    )
+    groups = [(group,) for group in group_deltas]
+    conn.executemany("DELETE FROM report_groups WHERE group_name = ? AND item_count <= 0", groups)
+    conn.executemany("DELETE FROM report_categories WHERE group_name = ? AND item_count <= 0", groups)
+
+    conn.executemany("DELETE FROM report_low_stock WHERE item_id = ?", not_low_stock)
+    conn.executemany(
+        "INSERT OR REPLACE INTO report_low_stock (item_id, group_name, name, units) VALUES (?, ?, ?, ?)",
+        low_stock
+    )
+
+
+def rebuild_summaries(conn: sqlite3.Connection, items_table: str = "inventory_items") -> None:
+    """Recompute every summary from items_table, an (id, data JSON) table such as
+    SqliteRepository's inventory_items or CatalogCache's items: for a new
+    summary schema, a full snapshot, or to clear float drift after very many
+    updates. Doesn't commit."""
+    for table in ("report_groups", "report_categories", "report_low_stock"):
+        conn.execute(f"DELETE FROM {table}")
+    if not table_columns(conn, items_table):
+        return
+    groups = defaultdict(lambda: [0, 0.0])
+    categories = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    low_stock = []
+    for item_id, data in conn.execute(f"SELECT id, data FROM {items_table}"):
+        record = json.loads(data)
+        contribution = _contribution(record)
+        if contribution is None:
+            continue
+        group, units, values = contribution
+        groups[group][0] += 1
+        groups[group][1] += units
+        for category, value in values.items():
+            sums = categories[(group, category)]
+            sums[0] += 1
+            sums[1] += units
+            sums[2] += value or 0.0
+            sums[3] += (value or 0.0) * units
+        low_units = _low_stock_units(record)
+        if low_units is not None:
+            low_stock.append((item_id, record.get("group"), record.get("name"), low_units))
+    conn.executemany("INSERT INTO report_groups VALUES (?, ?, ?)", [(g, *sums) for g, sums in groups.items()])
+    conn.executemany("INSERT INTO report_categories VALUES (?, ?, ?, ?, ?, ?)",
+                     [(*key, *sums) for key, sums in categories.items()])
+    conn.executemany("INSERT INTO report_low_stock VALUES (?, ?, ?, ?)", low_stock)
+
+
+# ========== READING AND EXPORT ==========
+def report_cells(name: str, row: Dict) -> List[str]:
+    """Display text of a report row, in REPORT_COLUMNS order"""
+    return [
+        cell_formatter("REAL" if column in MONEY_COLUMNS else "NUMERIC")(row[column])
+        for column in REPORT_COLUMNS[name]
+    ]
+
+
+def price_category_names(conn: sqlite3.Connection) -> List[str]:
+    """Names of the price-typed categories in conn's category table"""
+    rows = conn.execute(f"SELECT name FROM {CATEGORY_TABLE} WHERE datatype = ?", (PRICE_DATATYPE,))
+    return [name for name, in rows]
+
+
+class Reports:
+    """Stock reports read from the summary tables that whoever writes the items
+    keeps up to date on every write (CatalogCache for the app's catalog,
+    SqliteRepository for a local one), so opening them costs O(groups) whatever
+    the number of items. get_connection is a pooled-connection getter like
+    Database.get_connection, on the database holding those tables.
+    price_categories returns the names of price-typed categories; by default
+    they are read from the category table of that same database."""
+
+    def __init__(self, get_connection: Callable[[], sqlite3.Connection],
+                 price_categories: Optional[Callable[[], Iterable[str]]] = None):
+        self.get_connection = get_connection
+        self.price_categories = price_categories or (lambda: price_category_names(get_connection()))
+
+    def _rows(self, sql: str, params: Tuple = ()) -> List[Dict]:
+        cursor = self.get_connection().execute(sql, params)
+        names = [column[0] for column in cursor.description]
+        return [dict(zip(names, row)) for row in cursor]
+
+    def group_stock(self) -> List[Dict]:
+        """[{group_name, item_count, units}] per group"""
+        return self._rows("SELECT group_name, item_count, units FROM report_groups ORDER BY group_name")
+
+    def category_stock(self) -> List[Dict]:
+        """[{category, item_count, units}]: items (and their units) that have each category set"""
+        return self._rows(
+            "SELECT category, SUM(item_count) AS item_count, SUM(units) AS units "
+            "FROM report_categories GROUP BY category ORDER BY category"
+        )
+
+    def price_totals(self) -> List[Dict]:
+        """[{group_name, category, item_count, total, stock_value}] for price categories;
+        stock_value weighs each price by the item's units"""
+        names = sorted(set(self.price_categories()))
+        if not names:
+            return []
+        return self._rows(
+            "SELECT group_name, category, item_count, total, stock_value FROM report_categories "
+            f"WHERE category IN ({', '.join('?' * len(names))}) ORDER BY group_name, category",
+            tuple(names)
+        )
+
+    def low_stock(self, limit: Optional[int] = 100) -> List[Dict]:
+        """[{item_id, group_name, name, units}], lowest stock first; limit None for all"""
+        return self._rows(
+            "SELECT item_id, group_name, name, units FROM report_low_stock ORDER BY units, name LIMIT ?",
+            (-1 if limit is None else limit,)
+        )
+
+    def all(self, low_stock_limit: Optional[int] = 100) -> Dict[str, List[Dict]]:
+        """Every report by name"""
+        reports = {name: getattr(self, name)() for name in REPORT_COLUMNS if name != "low_stock"}
+        reports["low_stock"] = self.low_stock(low_stock_limit)
+        return reports
+
+    def export(self, path: str) -> List[str]:
+        """Write every report; returns the files written. A .json path gets one
+        document keyed by report name, anything else one CSV per report
+        named <path without extension>_<report>.csv. Low stock is exported in full."""
+        reports = self.all(low_stock_limit=None)
+        base, extension = os.path.splitext(path)
+        if extension.lower() == ".json":
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(reports, f, indent=2)
+            return [path]
+        written = []
+        for name, rows in reports.items():
+            csv_path = f"{base}_{name}.csv"
+            with open(csv_path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(REPORT_COLUMNS[name])
+                writer.writerows([row[column] for column in REPORT_COLUMNS[name]] for row in rows)
+            written.append(csv_path)
+        return written
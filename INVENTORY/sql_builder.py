@@ -0,0 +1,169 @@
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a table/column name for SQL. Embedded quotes are doubled, so the
+    name can never end the identifier early and inject SQL."""
+    if not isinstance(name, str) or not name or "\x00" in name:
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return '"' + name.replace('"', '""') + '"'
+
+
+# ========== QUERY BUILDER ==========
+class SqlBuilder:
+    """SQL text for the Parent.table_* helpers, checked against the live
+    schema and cached per (operation, table, columns) shape. Reusing the exact
+    same string for a shape is what lets sqlite3's per-connection statement
+    cache skip re-preparing it. Call invalidate(table) after any DDL."""
+
+    def __init__(self, get_connection: Callable[[], sqlite3.Connection]):
+        self.get_connection = get_connection
+        self.lock = threading.Lock()
+        # table -> {column: declared type}, in table order
+        self.schemas: Dict[str, Dict[str, str]] = {}
+        self.statements: Dict[Tuple, str] = {}
+
+    def types(self, table: str) -> Dict[str, str]:
+        """Declared type of each column of table; raises ValueError if it doesn't exist"""
+        schema = self.schemas.get(table)
+        if schema is None:
+            rows = self.get_connection().execute(f"PRAGMA table_info({quote_identifier(table)})").fetchall()
+            if not rows:
+                raise ValueError(f"No such table: {table}")
+            schema = {row[1]: row[2].upper() for row in rows}
+            with self.lock:
+                self.schemas[table] = schema
+        return schema
+
+    def columns(self, table: str) -> Tuple[str, ...]:
+        """Column names of table; raises ValueError if it doesn't exist"""
+        return tuple(self.types(table))
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        with self.lock:
+            if table is None:
+                self.schemas.clear()
+                self.statements.clear()
+                return
+            self.schemas.pop(table, None)
+            for key in [key for key in self.statements if key[1] == table]:
+                del self.statements[key]
+
+    def _cached(self, key: Tuple, table: str, columns: Iterable[str], build: Callable[[], str]) -> str:
+        sql = self.statements.get(key)
+        if sql is None:
+            known = self.types(table)
+            for column in columns:
+                if column not in known:
+                    raise ValueError(f"No such column: {table}.{column}")
+            sql = build()
+            with self.lock:
+                self.statements[key] = sql
+        return sql
+
+    def select(self, table: str, columns: Optional[Sequence[str]] = None) -> str:
+        columns = tuple(columns or ())
+        return self._cached(
+            ("select", table, columns), table, columns,
+            lambda: f"SELECT {', '.join(map(quote_identifier, columns)) or '*'} FROM {quote_identifier(table)}"
+        )
+
+    def select_range(self, table: str, column: str, columns: Optional[Sequence[str]] = None,
+                     low: bool = True, high: bool = True) -> str:
+        """SELECT ... WHERE low <= column <= high ORDER BY column; either bound may be left off
+        (low/high False), which keeps the query usable by an index on column"""
+        columns = tuple(columns or ())
+
+        def build() -> str:
+            bounds = [f"{quote_identifier(column)} {op} ?" for op, wanted in ((">=", low), ("<=", high)) if wanted]
+            where = " AND ".join(bounds) or f"{quote_identifier(column)} IS NOT NULL"
+            return (f"SELECT {', '.join(map(quote_identifier, columns)) or '*'} FROM {quote_identifier(table)} "
+                    f"WHERE {where} ORDER BY {quote_identifier(column)}")
+
+        return self._cached(("range", table, column, columns, low, high), table, columns + (column,), build)
+
+    def select_page(self, table: str, columns: Optional[Sequence[str]] = None, key: str = "id",
+                    first: bool = False) -> str:
+        """Keyset page: SELECT ... WHERE key > ? ORDER BY key LIMIT ?, without the
+        WHERE (and its parameter) for the first page. key is always selected,
+        since the last row's key is where the next page starts."""
+        columns = tuple(columns or ())
+        if columns and key not in columns:
+            columns = (key,) + columns
+        where = "" if first else f"WHERE {quote_identifier(key)} > ? "
+        return self._cached(
+            ("page", table, columns, key, first), table, columns + (key,),
+            lambda: f"SELECT {', '.join(map(quote_identifier, columns)) or '*'} FROM {quote_identifier(table)} "
+                    f"{where}ORDER BY {quote_identifier(key)} LIMIT ?"
+        )
+
+    @staticmethod
+    def _where(filters: Tuple[Tuple[str, str], ...]) -> str:
+        # filters are (column, op) pairs, op "like" (with \ as escape) or "="; one parameter each
+        conditions = [
+            f"{quote_identifier(column)} LIKE ? ESCAPE '\\'" if op == "like" else f"{quote_identifier(column)} = ?"
+            for column, op in filters
+        ]
+        return f"WHERE {' AND '.join(conditions)} " if conditions else ""
+
+    def select_sorted(self, table: str, columns: Optional[Sequence[str]] = None, order_by: str = "id",
+                      descending: bool = False, filters: Sequence[Tuple[str, str]] = ()) -> str:
+        """One page of a sorted, filtered view: SELECT ... WHERE filters ORDER BY order_by
+        LIMIT ? OFFSET ?, parameters being the filter values then limit and offset.
+        rowid breaks ties, so pages don't overlap when order_by has repeated values."""
+        columns, filters = tuple(columns or ()), tuple(filters)
+        direction = "DESC" if descending else "ASC"
+        return self._cached(
+            ("sorted", table, columns, order_by, descending, filters), table,
+            columns + (order_by,) + tuple(column for column, _ in filters),
+            lambda: f"SELECT {', '.join(map(quote_identifier, columns)) or '*'} FROM {quote_identifier(table)} "
+                    f"{self._where(filters)}ORDER BY {quote_identifier(order_by)} {direction}, rowid {direction} "
+                    f"LIMIT ? OFFSET ?"
+        )
+
+    def count(self, table: str, filters: Sequence[Tuple[str, str]] = ()) -> str:
+        filters = tuple(filters)
+        return self._cached(
+            ("count", table, filters), table, tuple(column for column, _ in filters),
+            lambda: f"SELECT COUNT(*) FROM {quote_identifier(table)} {self._where(filters)}".rstrip()
+        )
+
+    def insert(self, table: str, columns: Sequence[str]) -> str:
+        columns = tuple(columns)
+        return self._cached(
+            ("insert", table, columns), table, columns,
+            lambda: f"INSERT INTO {quote_identifier(table)} ({', '.join(map(quote_identifier, columns))}) "
+                    f"VALUES ({', '.join('?' * len(columns))})"
+        )
+
+    def upsert(self, table: str, columns: Sequence[str], key_columns: Sequence[str]) -> str:
+        """INSERT that updates the non-key columns when key_columns already match a row.
+        key_columns needs a PRIMARY KEY or UNIQUE index for ON CONFLICT to target."""
+        columns, key_columns = tuple(columns), tuple(key_columns)
+        updates = [c for c in columns if c not in key_columns]
+
+        def build() -> str:
+            sql = (f"INSERT INTO {quote_identifier(table)} ({', '.join(map(quote_identifier, columns))}) "
+                   f"VALUES ({', '.join('?' * len(columns))}) "
+                   f"ON CONFLICT ({', '.join(map(quote_identifier, key_columns))}) ")
+            if not updates:
+                return sql + "DO NOTHING"
+            return sql + "DO UPDATE SET " + ", ".join(f"{quote_identifier(c)} = excluded.{quote_identifier(c)}" for c in updates)
+
+        return self._cached(("upsert", table, columns, key_columns), table, columns + key_columns, build)
+
+    def update(self, table: str, columns: Sequence[str], condition_column: str) -> str:
+        columns = tuple(columns)
+        return self._cached(
+            ("update", table, columns, condition_column), table, columns + (condition_column,),
+            lambda: f"UPDATE {quote_identifier(table)} SET {', '.join(f'{quote_identifier(c)} = ?' for c in columns)} "
+                    f"WHERE {quote_identifier(condition_column)} = ?"
+        )
+
+    def delete(self, table: str, condition_column: str) -> str:
+        return self._cached(
+            ("delete", table, condition_column), table, (condition_column,),
+            lambda: f"DELETE FROM {quote_identifier(table)} WHERE {quote_identifier(condition_column)} = ?"
+        )
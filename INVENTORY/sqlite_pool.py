@@ -0,0 +1,107 @@
+import atexit
+import sqlite3
+import threading
+from typing import Dict, List
+
+# ========== CONSTANTS ==========
+# Negative cache_size is in KiB: 20 MB page cache per connection
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA temp_store = MEMORY",
+]
+BUSY_TIMEOUT_SECONDS = 5.0
+# Prepared statements kept per connection, keyed by exact SQL text
+CACHED_STATEMENTS = 256
+
+
+# ========== CONNECTION POOL ==========
+class _ThreadConnection:
+    """Holds a thread's connection in the pool's threading.local; Python drops it
+    when the thread ends, which hands the connection back to be closed"""
+
+    def __init__(self, pool: "ConnectionPool", conn: sqlite3.Connection):
+        self.pool = pool
+        self.conn = conn
+
+    def __del__(self):
+        self.pool._release(self.conn)
+
+
+class ConnectionPool:
+    """One long-lived sqlite3 connection per (thread, database file).
+    Opening a connection and re-reading the schema on every operation was the
+    main cost of the old get_connection; WAL lets readers run while a write
+    is in progress. A connection is closed when its thread ends, so short-lived
+    threads don't leak file handles, and all pools are closed at interpreter exit."""
+
+    _pools: Dict[str, "ConnectionPool"] = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.local = threading.local()
+        # Reentrant: a _ThreadConnection may be released while this thread holds it
+        self.lock = threading.RLock()
+        self.connections: List[sqlite3.Connection] = []
+
+    @classmethod
+    def for_path(cls, db_path: str) -> "ConnectionPool":
+        """Shared pool per database file, so every Database on it reuses connections"""
+        with cls._pools_lock:
+            if db_path not in cls._pools:
+                cls._pools[db_path] = cls(db_path)
+            return cls._pools[db_path]
+
+    def get(self) -> sqlite3.Connection:
+        holder = getattr(self.local, "conn", None)
+        if holder is None:
+            # check_same_thread=False only so close_all() and _release() may close it from
+            # another thread; each connection is still used by the thread that opened it
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=BUSY_TIMEOUT_SECONDS,
+                check_same_thread=False,
+                cached_statements=CACHED_STATEMENTS
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            with self.lock:
+                self.connections.append(conn)
+            holder = self.local.conn = _ThreadConnection(self, conn)
+        return holder.conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """Close the connection of a thread that has ended"""
+        with self.lock:
+            if conn not in self.connections:
+                return  # already closed by close_all
+            self.connections.remove(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def close_all(self) -> None:
+        with self.lock:
+            connections, self.connections = self.connections, []
+        for conn in connections:
+            try:
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self.local = threading.local()
+
+    @classmethod
+    def close_every_pool(cls) -> None:
+        with cls._pools_lock:
+            pools = list(cls._pools.values())
+        for pool in pools:
+            pool.close_all()
+
+
+atexit.register(ConnectionPool.close_every_pool)
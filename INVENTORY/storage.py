@@ -0,0 +1,432 @@
+import copy
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from migrations import CATALOG_MIGRATIONS, CATEGORY_TABLE, Migration, create_index, migrate
+from read_cache import ReadCache
+from reports import REPORT_MIGRATIONS, apply_item_change, apply_item_changes
+from sqlite_pool import ConnectionPool
+
+# Delta returned by changes_since: (groups, items, deleted_groups, deleted_items);
+# records are the stored dicts, deletions are {key: deleted_at}
+Changes = Tuple[Dict[str, Dict], Dict[str, Dict], Dict[str, str], Dict[str, str]]
+
+# Host parameters per statement in the oldest SQLite builds still shipped with Python
+SQLITE_MAX_PARAMETERS = 999
+
+
+def merge_changes(record: Dict, changes: Dict) -> Dict:
+    """Firebase update() semantics: set the given keys, a None value removes the key"""
+    merged = dict(record)
+    for key, value in changes.items():
+        if value is None:
+            merged.pop(key, None)
+        else:
+            merged[key] = value
+    return merged
+
+
+# ========== REPOSITORY INTERFACE ==========
+class Repository:
+    """Where groups, categories and items live. Records are the plain dicts
+    the app already stores in Firebase (see InventoryItem.to_dict); groups and
+    items carry a last_updated ISO stamp and deletions leave a tombstone
+    ({key: deleted_at}) so delta syncs (changes_since) can see them.
+
+    Implementations: MemoryRepository (tests, benchmarks), SqliteRepository
+    (local file, LAN speed), FirebaseRepository (the shared cloud copy).
+    Methods may be called from any thread."""
+
+    # ----- groups and items -----
+    def load_all(self) -> Tuple[Dict[str, Dict], Dict[str, Dict], Dict[str, Dict]]:
+        """(groups, items, global_characteristics)"""
+        raise NotImplementedError
+
+    def changes_since(self, since: str) -> Changes:
+        """Records with last_updated >= since and tombstones with deleted_at >= since"""
+        raise NotImplementedError
+
+    def get_groups(self) -> Dict[str, Dict]:
+        """Just the groups, without loading every item"""
+        raise NotImplementedError
+
+    def get_item(self, item_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def put_group(self, name: str, record: Dict) -> None:
+        raise NotImplementedError
+
+    def delete_group(self, name: str, deleted_at: str) -> None:
+        raise NotImplementedError
+
+    def put_item(self, item_id: str, record: Dict) -> None:
+        raise NotImplementedError
+
+    def update_item(self, item_id: str, changes: Dict) -> None:
+        """Merge changes into the item; None values remove keys"""
+        raise NotImplementedError
+
+    def delete_item(self, item_id: str, deleted_at: str) -> None:
+        raise NotImplementedError
+
+    def get_global_characteristics(self) -> Dict[str, Dict]:
+        raise NotImplementedError
+
+    def set_global_characteristics(self, characteristics: Dict[str, Dict]) -> None:
+        raise NotImplementedError
+
+    def apply_batch(self, mutations: List[Tuple[str, str, Any]]) -> None:
+        """Apply (operation, key, payload) writes in order, where operation names
+        one of the write methods above and payload is its second argument
+        (unused by set_global_characteristics). Backends that can write several
+        paths at once override this to do it in one round trip."""
+        for operation, key, payload in mutations:
+            if operation == "set_global_characteristics":
+                self.set_global_characteristics(payload)
+            else:
+                getattr(self, operation)(key, payload)
+
+    # ----- categories -----
+    def get_categories(self) -> List[Dict]:
+        """[{name, datatype, null_status}] ordered by name"""
+        raise NotImplementedError
+
+    def put_category(self, name: str, datatype: str, null_status: bool) -> None:
+        raise NotImplementedError
+
+    def delete_category(self, name: str) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+# ========== IN-MEMORY ==========
+class MemoryRepository(Repository):
+    """Dicts behind a lock. Records are copied in and out, so callers can't
+    change stored data by mutating what they passed or got back."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.groups: Dict[str, Dict] = {}
+        self.items: Dict[str, Dict] = {}
+        self.deleted_groups: Dict[str, str] = {}
+        self.deleted_items: Dict[str, str] = {}
+        self.global_characteristics: Dict[str, Dict] = {}
+        self.categories: Dict[str, Dict] = {}
+
+    def load_all(self):
+        with self.lock:
+            return copy.deepcopy((self.groups, self.items, self.global_characteristics))
+
+    def changes_since(self, since):
+        with self.lock:
+            return copy.deepcopy((
+                {k: v for k, v in self.groups.items() if (v.get("last_updated") or "") >= since},
+                {k: v for k, v in self.items.items() if (v.get("last_updated") or "") >= since},
+                {k: v for k, v in self.deleted_groups.items() if v >= since},
+                {k: v for k, v in self.deleted_items.items() if v >= since},
+            ))
+
+    def get_groups(self):
+        with self.lock:
+            return copy.deepcopy(self.groups)
+
+    def get_item(self, item_id):
+        with self.lock:
+            return copy.deepcopy(self.items.get(item_id))
+
+    def put_group(self, name, record):
+        with self.lock:
+            self.groups[name] = copy.deepcopy(record)
+
+    def delete_group(self, name, deleted_at):
+        with self.lock:
+            self.groups.pop(name, None)
+            self.deleted_groups[name] = deleted_at
+
+    def put_item(self, item_id, record):
+        with self.lock:
+            self.items[item_id] = copy.deepcopy(record)
+
+    def update_item(self, item_id, changes):
+        with self.lock:
+            self.items[item_id] = merge_changes(self.items.get(item_id, {}), copy.deepcopy(changes))
+
+    def delete_item(self, item_id, deleted_at):
+        with self.lock:
+            self.items.pop(item_id, None)
+            self.deleted_items[item_id] = deleted_at
+
+    def get_global_characteristics(self):
+        with self.lock:
+            return copy.deepcopy(self.global_characteristics)
+
+    def set_global_characteristics(self, characteristics):
+        with self.lock:
+            self.global_characteristics = copy.deepcopy(characteristics)
+
+    def get_categories(self):
+        with self.lock:
+            return [dict(self.categories[name]) for name in sorted(self.categories)]
+
+    def put_category(self, name, datatype, null_status):
+        with self.lock:
+            self.categories[name] = {"name": name, "datatype": datatype, "null_status": int(null_status)}
+
+    def delete_category(self, name):
+        with self.lock:
+            self.categories.pop(name, None)
+
+
+# ========== SQLITE ==========
+def _catalog_tables(conn: sqlite3.Connection) -> None:
+    # execute, not executescript: executescript commits, which would split the migration transaction
+    conn.execute("CREATE TABLE IF NOT EXISTS inventory_groups (name TEXT PRIMARY KEY, data TEXT NOT NULL, last_updated TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS inventory_items (id TEXT PRIMARY KEY, data TEXT NOT NULL, last_updated TEXT)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS tombstones (
+            kind TEXT NOT NULL, key TEXT NOT NULL, deleted_at TEXT NOT NULL, PRIMARY KEY (kind, key)
+        )
+    """)
+    conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    create_index(conn, "inventory_groups", ["last_updated"])
+    create_index(conn, "inventory_items", ["last_updated"])
+    create_index(conn, "tombstones", ["kind", "deleted_at"])
+
+
+REPOSITORY_MIGRATIONS: List[Migration] = [
+    (1, "groups, items and tombstones", _catalog_tables),
+]
+
+
+class SqliteRepository(Repository):
+    """The whole catalog in a local SQLite file: records as JSON next to an
+    indexed last_updated column, so changes_since is an index range scan.
+    Item writes also update the report summary tables (reports.py) in the
+    same transaction. Uses the pooled per-thread WAL connections of sqlite_pool."""
+
+    def __init__(self, db_path: str = "inventory.db"):
+        self.pool = ConnectionPool.for_path(db_path)
+        # The category screens' cache of this file; category writes invalidate it
+        self.cache = ReadCache.for_path(db_path)
+        # Same category table as the category screens (CHATGPT_TEXT.PY) use
+        migrate(self.pool.get(), CATALOG_MIGRATIONS)
+        migrate(self.pool.get(), REPOSITORY_MIGRATIONS, "repository")
+        migrate(self.pool.get(), REPORT_MIGRATIONS, "reports")
+
+    def load_all(self):
+        conn = self.pool.get()
+        groups = {name: json.loads(data) for name, data in conn.execute("SELECT name, data FROM inventory_groups")}
+        items = {item_id: json.loads(data) for item_id, data in conn.execute("SELECT id, data FROM inventory_items")}
+        return groups, items, self.get_global_characteristics()
+
+    def changes_since(self, since):
+        conn = self.pool.get()
+        groups = {name: json.loads(data) for name, data in conn.execute(
+            "SELECT name, data FROM inventory_groups WHERE last_updated >= ?", (since,))}
+        items = {item_id: json.loads(data) for item_id, data in conn.execute(
+            "SELECT id, data FROM inventory_items WHERE last_updated >= ?", (since,))}
+        deleted = {"group": {}, "item": {}}
+        for kind, key, deleted_at in conn.execute(
+                "SELECT kind, key, deleted_at FROM tombstones WHERE deleted_at >= ?", (since,)):
+            deleted[kind][key] = deleted_at
+        return groups, items, deleted["group"], deleted["item"]
+
+    def get_groups(self):
+        rows = self.pool.get().execute("SELECT name, data FROM inventory_groups")
+        return {name: json.loads(data) for name, data in rows}
+
+    def get_item(self, item_id):
+        row = self.pool.get().execute("SELECT data FROM inventory_items WHERE id = ?", (item_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_group(self, name, record):
+        with self.pool.get() as conn:
+            conn.execute("INSERT OR REPLACE INTO inventory_groups (name, data, last_updated) VALUES (?, ?, ?)",
+                         (name, json.dumps(record), record.get("last_updated")))
+
+    def delete_group(self, name, deleted_at):
+        with self.pool.get() as conn:
+            conn.execute("DELETE FROM inventory_groups WHERE name = ?", (name,))
+            conn.execute("INSERT OR REPLACE INTO tombstones (kind, key, deleted_at) VALUES ('group', ?, ?)",
+                         (name, deleted_at))
+
+    @staticmethod
+    def _stored_item(conn: sqlite3.Connection, item_id: str) -> Optional[Dict]:
+        row = conn.execute("SELECT data FROM inventory_items WHERE id = ?", (item_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_item(self, item_id, record):
+        with self.pool.get() as conn:
+            old = self._stored_item(conn, item_id)
+            conn.execute("INSERT OR REPLACE INTO inventory_items (id, data, last_updated) VALUES (?, ?, ?)",
+                         (item_id, json.dumps(record), record.get("last_updated")))
+            apply_item_change(conn, item_id, old, record)
+
+    def update_item(self, item_id, changes):
+        with self.pool.get() as conn:
+            old = self._stored_item(conn, item_id)
+            record = merge_changes(old or {}, changes)
+            conn.execute("INSERT OR REPLACE INTO inventory_items (id, data, last_updated) VALUES (?, ?, ?)",
+                         (item_id, json.dumps(record), record.get("last_updated")))
+            apply_item_change(conn, item_id, old, record)
+
+    def delete_item(self, item_id, deleted_at):
+        with self.pool.get() as conn:
+            apply_item_change(conn, item_id, self._stored_item(conn, item_id), None)
+            conn.execute("DELETE FROM inventory_items WHERE id = ?", (item_id,))
+            conn.execute("INSERT OR REPLACE INTO tombstones (kind, key, deleted_at) VALUES ('item', ?, ?)",
+                         (item_id, deleted_at))
+
+    def apply_batch(self, mutations):
+        if any(operation != "put_item" for operation, _, _ in mutations):
+            super().apply_batch(mutations)
+            return
+        # All puts (a bulk import): one transaction, one executemany for the
+        # rows and one summed update of the report summaries
+        records = {item_id: record for _, item_id, record in mutations}
+        with self.pool.get() as conn:
+            old = {}
+            ids = list(records)
+            for start in range(0, len(ids), SQLITE_MAX_PARAMETERS):
+                chunk = ids[start:start + SQLITE_MAX_PARAMETERS]
+                old.update((item_id, json.loads(data)) for item_id, data in conn.execute(
+                    f"SELECT id, data FROM inventory_items WHERE id IN ({', '.join('?' * len(chunk))})", chunk))
+            conn.executemany(
+                "INSERT OR REPLACE INTO inventory_items (id, data, last_updated) VALUES (?, ?, ?)",
+                [(item_id, json.dumps(record), record.get("last_updated")) for item_id, record in records.items()]
+            )
+            apply_item_changes(conn, [(item_id, old.get(item_id), record) for item_id, record in records.items()])
+
+    def get_global_characteristics(self):
+        row = self.pool.get().execute("SELECT value FROM settings WHERE key = 'global_characteristics'").fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def set_global_characteristics(self, characteristics):
+        with self.pool.get() as conn:
+            conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('global_characteristics', ?)",
+                         (json.dumps(characteristics),))
+
+    def get_categories(self):
+        rows = self.pool.get().execute(f"SELECT name, datatype, null_status FROM {CATEGORY_TABLE} ORDER BY name")
+        return [dict(row) for row in rows]
+
+    def put_category(self, name, datatype, null_status):
+        with self.pool.get() as conn:
+            conn.execute(
+                f"INSERT INTO {CATEGORY_TABLE} (name, datatype, null_status) VALUES (?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET datatype = excluded.datatype, null_status = excluded.null_status",
+                (name, datatype, int(null_status))
+            )
+        self.cache.invalidate(CATEGORY_TABLE)
+
+    def delete_category(self, name):
+        with self.pool.get() as conn:
+            conn.execute(f"DELETE FROM {CATEGORY_TABLE} WHERE name = ?", (name,))
+        self.cache.invalidate(CATEGORY_TABLE)
+
+    def close(self):
+        self.pool.close_all()
+
+
+# ========== FIREBASE ==========
+class FirebaseRepository(Repository):
+    """The Realtime Database layout main.py has always used: inventory_groups/,
+    inventory_items/, deleted_groups/ and deleted_items/ tombstones,
+    global_characteristics and categories/.
+
+    Every call takes its own Database object: pyrebase keeps child() paths on
+    the instance, so sharing one across threads mixes up paths. changes_since
+    needs ".indexOn": "last_updated" on both record paths in the rules."""
+
+    def __init__(self, firebase):
+        self.firebase = firebase
+
+    def _ref(self, *path: str):
+        ref = self.firebase.database()
+        for part in path:
+            ref = ref.child(part)
+        return ref
+
+    def load_all(self):
+        return (
+            self._ref("inventory_groups").get().val() or {},
+            self._ref("inventory_items").get().val() or {},
+            self._ref("global_characteristics").get().val() or {},
+        )
+
+    def changes_since(self, since):
+        return (
+            self._query(self._ref("inventory_groups").order_by_child("last_updated").start_at(since)),
+            self._query(self._ref("inventory_items").order_by_child("last_updated").start_at(since)),
+            self._query(self._ref("deleted_groups").order_by_value().start_at(since)),
+            self._query(self._ref("deleted_items").order_by_value().start_at(since)),
+        )
+
+    @staticmethod
+    def _query(query) -> Dict:
+        # each() instead of val(): pyrebase's val() fails on an empty query result
+        return {entry.key(): entry.val() for entry in (query.get().each() or [])}
+
+    def get_groups(self):
+        return self._ref("inventory_groups").get().val() or {}
+
+    def get_item(self, item_id):
+        return self._ref("inventory_items", item_id).get().val()
+
+    def put_group(self, name, record):
+        self._ref("inventory_groups", name).set(record)
+
+    def delete_group(self, name, deleted_at):
+        self._ref().update({f"inventory_groups/{name}": None, f"deleted_groups/{name}": deleted_at})
+
+    def put_item(self, item_id, record):
+        self._ref("inventory_items", item_id).set(record)
+
+    def update_item(self, item_id, changes):
+        self._ref("inventory_items", item_id).update(changes)
+
+    def delete_item(self, item_id, deleted_at):
+        # One multi-path update, so the record and its tombstone change together
+        self._ref().update({f"inventory_items/{item_id}": None, f"deleted_items/{item_id}": deleted_at})
+
+    def get_global_characteristics(self):
+        return self._ref("global_characteristics").get().val() or {}
+
+    def set_global_characteristics(self, characteristics):
+        self._ref("global_characteristics").set(characteristics)
+
+    def apply_batch(self, mutations):
+        # One multi-path update for the whole batch; paths must not overlap,
+        # so callers send at most one mutation per record (see outbox.coalesce)
+        paths = {}
+        for operation, key, payload in mutations:
+            if operation == "put_item":
+                paths[f"inventory_items/{key}"] = payload
+            elif operation == "update_item":
+                paths.update({f"inventory_items/{key}/{field}": value for field, value in payload.items()})
+            elif operation == "delete_item":
+                paths.update({f"inventory_items/{key}": None, f"deleted_items/{key}": payload})
+            elif operation == "put_group":
+                paths[f"inventory_groups/{key}"] = payload
+            elif operation == "delete_group":
+                paths.update({f"inventory_groups/{key}": None, f"deleted_groups/{key}": payload})
+            elif operation == "set_global_characteristics":
+                paths["global_characteristics"] = payload
+            else:
+                raise ValueError(f"Unknown operation: {operation}")
+        if paths:
+            self._ref().update(paths)
+
+    def get_categories(self):
+        categories = self._ref("categories").get().val() or {}
+        return [categories[name] for name in sorted(categories)]
+
+    def put_category(self, name, datatype, null_status):
+        self._ref("categories", name).set({"name": name, "datatype": datatype, "null_status": int(null_status)})
+
+    def delete_category(self, name):
+        self._ref("categories", name).remove()
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Mapping, MutableMapping, Optional, Set, Tuple
+
+from storage import Changes, Repository
+
+# ========== CONSTANTS ==========
+# last_updated stamps are naive local times written by each terminal's own
+# clock, so a terminal running behind writes stamps below another terminal's
+# high-water mark. Every delta query starts this far before the mark so those
+# writes are still picked up; records seen again are skipped as unchanged.
+SYNC_OVERLAP = timedelta(minutes=15)
+
+
+def query_mark(last_synced: str) -> str:
+    """Where the next delta query (or stream) starts: the high-water mark moved
+    back by SYNC_OVERLAP. An empty mark (empty catalog) stays empty."""
+    try:
+        return (datetime.fromisoformat(last_synced) - SYNC_OVERLAP).isoformat()
+    except ValueError:
+        return last_synced
+
+
+def high_water_mark(changes: Changes, since: str) -> str:
+    """Newest stamp in a delta, never below the previous mark"""
+    groups, items, deleted_groups, deleted_items = changes
+    stamps = [data.get("last_updated") for data in groups.values()]
+    stamps += [data.get("last_updated") for data in items.values()]
+    stamps += list(deleted_groups.values()) + list(deleted_items.values())
+    return max([since, *(stamp for stamp in stamps if stamp)])
+
+
+def snapshot_mark(groups: Mapping[str, Dict], items: Mapping[str, Dict]) -> str:
+    """High-water mark after a full load ("" for an empty catalog)"""
+    return high_water_mark((groups, items, {}, {}), "")
+
+
+def fetch_changes(store: Repository, last_synced: str) -> Tuple[Changes, str]:
+    """(delta, new high-water mark) for a catalog synced up to last_synced.
+    The query starts SYNC_OVERLAP early, so records already held come back too;
+    merge_changes skips them."""
+    changes = store.changes_since(query_mark(last_synced))
+    return changes, high_water_mark(changes, last_synced)
+
+
+def select_changes(changes: Changes, groups: Mapping[str, Any], items: Mapping[str, Any],
+                   pending_groups: Mapping[str, str], pending_items: Mapping[str, str]
+                   ) -> Tuple[Dict[str, Dict], Dict[str, Dict], Set[str], Set[str]]:
+    """Split a changes_since delta into what the local catalog must apply:
+    (groups to store, items to store, group names to remove, item ids to remove).
+
+    groups and items are the local InventoryGroup / InventoryItem maps.
+    Records already held unchanged are skipped (the query start is inclusive
+    and overlaps the last one), and so is anything older than a local write
+    still pending in the outbox. A tombstone only removes a record written at
+    or before it; a record re-created after its deletion stays."""
+    fetched_groups, fetched_items, deleted_groups, deleted_items = changes
+    changed_groups = {
+        name: data for name, data in fetched_groups.items()
+        if (name not in groups or groups[name].characteristics != data.get("characteristics", {}))
+        and (data.get("last_updated") or "") >= pending_groups.get(name, "")
+    }
+    changed_items = {
+        item_id: data for item_id, data in fetched_items.items()
+        if (item_id not in items or items[item_id].last_updated != data.get("last_updated"))
+        and (data.get("last_updated") or "") >= pending_items.get(item_id, "")
+    }
+
+    removed_groups = {
+        name for name, deleted_at in deleted_groups.items()
+        if (name in groups or name in changed_groups)
+        and deleted_at >= pending_groups.get(name, "")
+        and (fetched_groups.get(name, {}).get("last_updated") or "") <= deleted_at
+    }
+    removed_items = set()
+    for item_id, deleted_at in deleted_items.items():
+        if item_id not in items and item_id not in changed_items:
+            continue
+        if deleted_at < pending_items.get(item_id, ""):
+            continue
+        written = max(fetched_items.get(item_id, {}).get("last_updated") or "",
+                      items[item_id].last_updated or "" if item_id in items else "")
+        if written <= deleted_at:
+            removed_items.add(item_id)
+
+    for name in removed_groups:
+        changed_groups.pop(name, None)
+    for item_id in removed_items:
+        changed_items.pop(item_id, None)
+    return changed_groups, changed_items, removed_groups, removed_items
+
+
+def merge_changes(changes: Changes, groups: MutableMapping[str, Any], items: MutableMapping[str, Any],
+                  pending_groups: Mapping[str, str], pending_items: Mapping[str, str],
+                  make_group: Callable[[str, Dict], Any], make_item: Callable[[Dict], Any],
+                  put_item: Optional[Callable[[str, Any], None]] = None,
+                  drop_item: Optional[Callable[[str], None]] = None
+                  ) -> Tuple[Dict[str, Dict], Dict[str, Dict], Set[str], Set[str]]:
+    """Apply a delta to the local catalog as select_changes splits it, and return
+    that split. make_group(name, data) / make_item(data) build the local objects;
+    put_item / drop_item replace plain dict writes to items (e.g. to keep an
+    index in step). Callers hold their catalog lock around this."""
+    selected = select_changes(changes, groups, items, pending_groups, pending_items)
+    changed_groups, changed_items, removed_groups, removed_items = selected
+    put_item = put_item or items.__setitem__
+    drop_item = drop_item or (lambda item_id: items.pop(item_id, None))
+    for name, data in changed_groups.items():
+        groups[name] = make_group(name, data)
+    for item_id, data in changed_items.items():
+        put_item(item_id, make_item(data))
+    for name in removed_groups:
+        groups.pop(name, None)
+    for item_id in removed_items:
+        drop_item(item_id)
+    return selected
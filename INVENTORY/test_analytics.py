@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+import pytest
+
+from analytics import MISSING_CODE, ItemColumns, merged_schema
+
+SCHEMA = {
+    "price": {"type": "number", "min": 0.0, "max": 100.0},
+    "color": {"type": "dropdown", "options": ["red", "blue"]},
+}
+ITEMS = {
+    "a": {"group": "Tools", "characteristics": {"price": 10, "color": "red"}},
+    "b": {"group": "Tools", "characteristics": {"price": "1,000.50", "color": "green"}},
+    "c": {"group": "Paint", "characteristics": {"price": "n/a"}},
+    "d": {"group": "Paint", "characteristics": {"price": 30.0, "color": "red"}},
+    "e": {"group": None, "characteristics": {"price": 5}},
+}
+
+
+@pytest.fixture
+def columns():
+    return ItemColumns.from_items(ITEMS, SCHEMA)
+
+
+def test_merged_schema_prefers_number_type():
+    groups = {
+        "Tools": {"characteristics": {"size": {"type": "text"}}},
+        "Paint": {"characteristics": {"size": {"type": "number"}, "color": {"type": "dropdown"}}},
+    }
+    schema = merged_schema(groups, {"sku": {"type": "text"}})
+    assert schema == {"sku": {"type": "text"}, "size": {"type": "number"}, "color": {"type": "dropdown"}}
+
+
+def test_columns_layout(columns):
+    assert len(columns) == 5
+    # Unparseable numbers are NaN; strings go through the column_types converter
+    price = columns.numbers["price"]
+    assert price[[0, 1, 3, 4]].tolist() == [10.0, 1000.5, 30.0, 5.0]
+    assert math.isnan(price[2])
+    # Dropdown options come first, unseen values are appended
+    assert columns.labels["color"] == ["red", "blue", "green"]
+    assert columns.codes["color"].tolist() == [0, 2, MISSING_CODE, 0, MISSING_CODE]
+    assert columns.codes["group"].tolist() == [0, 0, 1, 1, MISSING_CODE]
+
+
+def test_group_bys(columns):
+    assert columns.count_by() == {"Tools": 2, "Paint": 2}
+    assert columns.count_by("color") == {"red": 2, "green": 1}
+    assert columns.sum_by("price") == {"Tools": 1010.5, "Paint": 30.0}
+    assert columns.mean_by("price", "color") == {"red": 20.0, "green": 1000.5}
+    with pytest.raises(ValueError):
+        columns.sum_by("color")
+    with pytest.raises(ValueError):
+        columns.count_by("price")
+
+
+def test_histogram_uses_schema_range(columns):
+    counts, edges = columns.histogram("price", bins=4)
+    assert edges.tolist() == [0.0, 25.0, 50.0, 75.0, 100.0]
+    assert counts.tolist() == [2, 1, 0, 0]  # 1000.5 is outside the schema range
+
+
+def test_percentiles_match_numpy():
+    rng = np.random.default_rng(1)
+    items = {f"i{n}": {"group": f"g{n % 3}", "characteristics": {"price": float(rng.uniform(0, 100))}}
+             for n in range(300)}
+    many = ItemColumns.from_items(items, SCHEMA)
+    by_group = many.percentiles("price", (10, 50, 90), by="group")
+    for group in ("g0", "g1", "g2"):
+        values = [item["characteristics"]["price"] for item in items.values() if item["group"] == group]
+        assert by_group[group] == pytest.approx(dict(zip((10, 50, 90), np.percentile(values, (10, 50, 90)))))
+    assert many.percentiles("price", (50,)) == {50: pytest.approx(float(np.median(many.numbers["price"])))}
+    # No values at all
+    empty = ItemColumns.from_items({"x": {"group": "g", "characteristics": {}}}, SCHEMA)
+    assert empty.percentiles("price") == {}
+    assert empty.percentiles("price", by="group") == {}
@@ -0,0 +1,77 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from async_db import AsyncDatabase
+from sqlite_pool import ConnectionPool
+from TEST import Parent
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "a.db"))
+    with pool.get() as conn:
+        conn.execute("CREATE TABLE t (name TEXT UNIQUE)")
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture
+def aio(pool):
+    aio = AsyncDatabase(pool)
+    yield aio
+    aio.close()
+
+
+def test_write_then_read(aio):
+    async def scenario():
+        assert await aio.execute("INSERT INTO t VALUES (?)", ("a",)) == 1
+        return await aio.fetchall("SELECT name FROM t")
+    assert [tuple(row) for row in asyncio.run(scenario())] == [("a",)]
+
+
+def test_failing_write_only_fails_its_caller(aio):
+    async def scenario():
+        return await asyncio.gather(
+            aio.execute("INSERT INTO t VALUES ('a')"),
+            aio.execute("INSERT INTO t VALUES ('a')"),
+            aio.execute("INSERT INTO t VALUES ('b')"),
+            return_exceptions=True
+        )
+    first, duplicate, third = asyncio.run(scenario())
+    assert (first, third) == (1, 1)
+    assert isinstance(duplicate, sqlite3.IntegrityError)
+    rows = asyncio.run(aio.fetchall("SELECT name FROM t ORDER BY name"))
+    assert [row[0] for row in rows] == ["a", "b"]
+
+
+def test_burst_is_committed_together(aio, pool, monkeypatch):
+    batches = []
+    commit_batch = aio._commit_batch
+    monkeypatch.setattr(aio, "_commit_batch", lambda conn, batch: (batches.append(len(batch)), commit_batch(conn, batch)))
+    started, release = threading.Event(), threading.Event()
+    first = aio.submit_write(lambda conn: (started.set(), release.wait(5)))  # holds the writer while the burst queues
+    started.wait(5)
+    burst = [aio.submit_write(lambda conn, i=i: conn.execute("INSERT INTO t VALUES (?)", (str(i),)).rowcount)
+             for i in range(50)]
+    release.set()
+    first.result(5)
+    assert [future.result(5) for future in burst] == [1] * 50
+    assert batches == [1, 50]
+    assert pool.get().execute("SELECT COUNT(*) FROM t").fetchone()[0] == 50
+
+
+def test_duplicate_category_raises_integrity_error(tmp_path):
+    parent = Parent(None, str(tmp_path / "mydb.db"))
+    row = {"name": ["size"], "datatype": ["numbers"], "null_status": [False]}
+
+    async def scenario():
+        await parent.table_writer_async("category", row)
+        await parent.table_writer_async("category", row)
+    try:
+        with pytest.raises(sqlite3.IntegrityError):
+            asyncio.run(scenario())
+    finally:
+        parent.db.close()
@@ -0,0 +1,62 @@
+import sqlite3
+
+from catalog_cache import CatalogCache
+
+
+class QuickCache(CatalogCache):
+    """Gives up at once on a locked file and remembers every connection it opened"""
+
+    def __init__(self, db_path):
+        self.opened = []
+        super().__init__(db_path)
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, timeout=0)
+        self.opened.append(conn)
+        return conn
+
+
+def is_closed(conn):
+    try:
+        conn.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_round_trip_and_connections_closed(tmp_path):
+    cache = QuickCache(str(tmp_path / "cache.db"))
+    cache.save_snapshot({"Tools": {"name": "Tools"}}, {"a": {"name": "Hammer"}}, {}, "T1")
+    cache.apply_changes({}, {"a": None, "b": {"name": "Saw"}}, None, "T2")
+    assert cache.load() == ({"Tools": {"name": "Tools"}}, {"b": {"name": "Saw"}}, {}, "T2")
+    assert all(is_closed(conn) for conn in cache.opened)
+
+
+def test_failed_write_holds_the_mark(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cache = QuickCache(path)
+    cache.save_snapshot({}, {"a": {"name": "Hammer"}}, {}, "T1")
+
+    other = sqlite3.connect(path)
+    other.execute("BEGIN EXCLUSIVE")
+    cache.apply_changes({}, {"b": {"name": "Saw"}}, None, "T2")  # database is locked
+    other.rollback()
+    other.close()
+    assert cache.behind
+
+    cache.apply_changes({}, {"c": {"name": "Drill"}}, None, "T3")
+    _, items, _, last_synced = cache.load()
+    assert set(items) == {"a", "c"}
+    assert last_synced == "T1"  # the next start fetches "b" again
+
+    cache.save_snapshot({}, {"a": {}, "b": {}, "c": {}}, {}, "T3")
+    assert not cache.behind
+    assert cache.load()[3] == "T3"
+
+
+def test_corrupt_file_is_moved_aside(tmp_path):
+    path = tmp_path / "cache.db"
+    path.write_bytes(b"not a database" * 100)
+    cache = QuickCache(str(path))
+    assert (tmp_path / "cache.db.corrupt").exists()
+    assert cache.load() == ({}, {}, {}, None)
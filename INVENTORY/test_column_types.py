@@ -0,0 +1,52 @@
+import pytest
+
+from column_types import cell_formatter, column_type, to_column_value
+
+
+def test_column_type_defaults_to_text():
+    assert column_type("price") == "REAL"
+    assert column_type("colour") == "TEXT"
+
+
+@pytest.mark.parametrize("value, stored", [
+    ("42", 42),
+    ("2.5", 2.5),
+    ("2.0", 2.0),
+    ("$1,234", 1234),
+    ("12,345,678.9", 12345678.9),
+    ("-1,000", -1000),
+    (" 15 % ", 15),
+    (True, 1),
+])
+def test_numbers(value, stored):
+    result = to_column_value("NUMERIC", value)
+    assert result == stored and type(result) is type(stored)
+
+
+@pytest.mark.parametrize("value", ["1,5", "1.234,56", "12,3456", "1,23", ",123", "abc"])
+def test_commas_outside_thousands_groups_are_rejected(value):
+    with pytest.raises(ValueError):
+        to_column_value("NUMERIC", value)
+
+
+def test_real_round_trips_through_its_display_text():
+    stored = to_column_value("REAL", "1234.5")
+    assert cell_formatter("REAL")(stored) == "1,234.50"
+    assert to_column_value("REAL", cell_formatter("REAL")(stored)) == 1234.5
+
+
+def test_booleans_and_dates():
+    assert to_column_value("BOOLEAN", "Yes") == 1
+    assert to_column_value("BOOLEAN", "off") == 0
+    assert to_column_value("DATE", "31/12/2025") == "2025-12-31"
+    with pytest.raises(ValueError):
+        to_column_value("BOOLEAN", "maybe")
+    with pytest.raises(ValueError):
+        to_column_value("DATE", "soon")
+
+
+def test_empty_and_untyped_values():
+    assert to_column_value("NUMERIC", "") is None
+    assert to_column_value("TEXT", "1,5") == "1,5"
+    assert cell_formatter("NUMERIC")(None) == ""
+    assert cell_formatter("REAL")("left over") == "left over"
@@ -0,0 +1,139 @@
+import csv
+import json
+
+import pytest
+
+from importer import ERROR_FIELD, import_items, rejects_path_for, validate_row
+from storage import MemoryRepository
+
+SCHEMAS = {
+    "Tools": {
+        "quantity": {"type": "number", "min": 0.0, "max": None},
+        "color": {"type": "dropdown", "options": ["red", "blue"]},
+        "notes": {"type": "text"},
+    },
+}
+NOW = "2026-01-01T00:00:00"
+
+
+class CountingRepository(MemoryRepository):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def apply_batch(self, mutations):
+        self.batches.append(len(mutations))
+        super().apply_batch(mutations)
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+
+def test_validate_row_builds_the_record():
+    item_id, record = validate_row(
+        {"id": " i1 ", "name": " Hammer ", "group": "Tools", "quantity": "3", "color": "red", "notes": ""},
+        SCHEMAS, NOW
+    )
+    assert item_id == "i1"
+    assert record == {
+        "name": "Hammer", "group": "Tools",
+        "characteristics": {"quantity": 3.0, "color": "red", "notes": ""},
+        "photo_url": None, "thumb_url": None, "created_at": NOW, "last_updated": NOW,
+    }
+    # Nested characteristics, generated id, blank dropdown
+    item_id, record = validate_row(
+        {"name": "Saw", "group": "Tools", "characteristics": {"quantity": 1, "color": " "}}, SCHEMAS, NOW
+    )
+    assert len(item_id) == 32
+    assert record["characteristics"] == {"quantity": 1.0, "color": None, "notes": ""}
+
+
+@pytest.mark.parametrize("row, message", [
+    ({"name": "", "group": "Tools"}, "Name and group are required"),
+    ({"name": "x", "group": "Paint"}, "Unknown group: Paint"),
+    ({"name": "x", "group": "Tools", "quantity": "1", "weight": "2"}, "Not a characteristic of Tools: weight"),
+    ({"name": "x", "group": "Tools", "quantity": "lots"}, "quantity: must be a number"),
+    ({"name": "x", "group": "Tools", "quantity": "-1"}, "quantity: must be ≥ 0.0"),
+    ({"name": "x", "group": "Tools", "quantity": "1", "color": "green"}, "color: must be one of red, blue"),
+    ({"name": "x", "group": "Tools", "quantity": "1", "id": "a/b"}, "id can't contain"),
+])
+def test_validate_row_rejects(row, message):
+    with pytest.raises(ValueError, match=message):
+        validate_row(row, SCHEMAS, NOW)
+
+
+def test_import_batches_and_rejects(tmp_path):
+    rows = [["name", "group", "quantity", "color"]]
+    rows += [[f"Item {n}", "Tools", str(n), "red"] for n in range(25)]
+    rows += [["Bad", "Tools", "-5", "red"], ["Extra", "Tools", "1", "red", "surplus"]]
+    path = write_csv(tmp_path / "items.csv", rows)
+    store = CountingRepository()
+    written = []
+
+    assert import_items(path, store, SCHEMAS, batch_size=10, on_batch=written.append) == (25, 2)
+    assert store.batches == [10, 10, 5]
+    assert sum(map(len, written)) == 25
+    assert len(store.load_all()[1]) == 25
+    with open(rejects_path_for(path), newline="", encoding="utf-8") as f:
+        rejects = list(csv.DictReader(f))
+    assert [row[ERROR_FIELD] for row in rejects] == [
+        "line 27: quantity: must be ≥ 0.0", "line 28: More values than columns",
+    ]
+
+
+@pytest.mark.parametrize("extension", [".csv", ".jsonl"])
+def test_fixed_rejects_file_imports(tmp_path, extension):
+    path = str(tmp_path / f"items{extension}")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        if extension == ".csv":
+            f.write("name,group,quantity\nHammer,Tools,-1\n")
+        else:
+            f.write(json.dumps({"name": "Hammer", "group": "Tools", "quantity": -1}) + "\n")
+    store = MemoryRepository()
+    assert import_items(path, store, SCHEMAS) == (0, 1)
+
+    rejects = rejects_path_for(path)
+    with open(rejects, encoding="utf-8") as f:
+        fixed = f.read().replace("-1", "4")
+    assert ERROR_FIELD in fixed
+    with open(rejects, "w", encoding="utf-8") as f:
+        f.write(fixed)
+    # The error column/key is ignored rather than taken for a characteristic
+    assert import_items(rejects, store, SCHEMAS) == (1, 0)
+    (record,) = store.load_all()[1].values()
+    assert record["characteristics"]["quantity"] == 4.0
+
+
+def test_replacing_an_item_keeps_created_at_and_photo(tmp_path):
+    store = MemoryRepository()
+    store.put_item("i1", {
+        "name": "Old", "group": "Tools", "characteristics": {"quantity": 1.0},
+        "photo_url": "photo", "thumb_url": "thumb", "created_at": "2020-01-01", "last_updated": "2020-01-01",
+    })
+    path = write_csv(tmp_path / "items.csv", [["id", "name", "group", "quantity"], ["i1", "New", "Tools", "2"],
+                                              ["i2", "Fresh", "Tools", "3"]])
+    assert import_items(path, store, SCHEMAS) == (2, 0)
+
+    items = store.load_all()[1]
+    assert items["i1"]["name"] == "New"
+    assert items["i1"]["characteristics"]["quantity"] == 2.0
+    assert (items["i1"]["created_at"], items["i1"]["photo_url"], items["i1"]["thumb_url"]) == \
+        ("2020-01-01", "photo", "thumb")
+    assert items["i1"]["last_updated"] > "2020-01-01"
+    assert items["i2"]["created_at"] == items["i2"]["last_updated"]
+    assert items["i2"]["photo_url"] is None
+
+
+def test_stored_item_lookup_is_used_instead_of_the_store(tmp_path):
+    class NoReads(MemoryRepository):
+        def get_item(self, item_id):
+            raise AssertionError("read from the store")
+
+    path = write_csv(tmp_path / "items.csv", [["id", "name", "group", "quantity"], ["i1", "New", "Tools", "2"]])
+    store = NoReads()
+    local = {"i1": {"created_at": "2020-01-01"}}
+    assert import_items(path, store, SCHEMAS, stored_item=local.get) == (1, 0)
+    assert store.load_all()[1]["i1"]["created_at"] == "2020-01-01"
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+from item_index import ItemIndex, normalize_value
+
+
+def item(name, **characteristics):
+    return SimpleNamespace(name=name, group="Tools", characteristics=characteristics)
+
+
+def test_numbers_match_by_value():
+    assert normalize_value(5) == normalize_value(5.0) == normalize_value("5") == normalize_value(" 5.0 ")
+    assert normalize_value(2.5) == normalize_value("2.50")
+    assert normalize_value(5) != normalize_value(5.5)
+
+
+def test_text_matches_case_insensitively():
+    assert normalize_value(" Red ") == normalize_value("RED")
+    assert normalize_value(True) == "true"
+    assert normalize_value("nan") == "nan"
+
+
+def test_ids_with_finds_numbers_saved_as_float():
+    index = ItemIndex()
+    index.rebuild({"a": item("Hammer", qty=5.0, color="Red"), "b": item("Saw", qty=2.5)})
+    assert list(index.ids_with("qty", 5)) == ["a"]
+    assert list(index.ids_with("qty", "5")) == ["a"]
+    assert list(index.ids_with("qty", "2.5")) == ["b"]
+    assert list(index.ids_with("color", "red")) == ["a"]
+    index.remove("a")
+    assert list(index.ids_with("qty", 5)) == []
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from item_search import SearchIndex
+
+
+def item(name, **characteristics):
+    return SimpleNamespace(name=name, group="Tools", characteristics=characteristics)
+
+
+def build(items):
+    index = SearchIndex()
+    index.rebuild(items)
+    return index
+
+
+def test_name_hits_rank_above_characteristic_hits():
+    index = build({"a": item("Hammer", color="steel"), "b": item("Steel saw"), "c": item("Drill")})
+    assert index.search("steel") == ["b", "a"]
+
+
+def test_every_word_must_match_and_last_is_a_prefix():
+    index = build({"a": item("Red screwdriver"), "b": item("Red saw"), "c": item("Blue screw")})
+    assert index.search("red scr") == ["a"]
+    assert index.search("red") == ["a", "b"]
+
+
+def test_typos():
+    index = build({"a": item("Hammer"), "b": item("Saw")})
+    assert index.search("hamer") == ["a"]
+
+
+def test_broad_prefix_stops_at_limit_with_best_scores():
+    items = {f"c{i}": item(f"Tool {i}", color="silver") for i in range(500)}
+    items.update({f"n{i}": item(f"Saw {i}") for i in range(20)})
+    index = build(items)
+    results = index.search("s", limit=10)
+    assert len(results) == 10
+    assert all(item_id.startswith("n") for item_id in results)  # name hits outrank "silver"
+
+
+def test_restricted_to_item_ids():
+    index = build({"a": item("Saw"), "b": item("Saw"), "c": item("Saw")})
+    assert index.search("saw", item_ids={"b": None}) == ["b"]
@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+from migrations import (CATALOG_MIGRATIONS, CATEGORY_TABLE, add_missing_columns, current_version, migrate,
+                        rebuild_table, table_columns)
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:", isolation_level=None)
+    yield conn
+    conn.close()
+
+
+def test_versions_are_kept_per_component(conn):
+    applied = []
+    migrations = [(1, "one", lambda c: applied.append(1)), (2, "two", lambda c: applied.append(2))]
+    assert migrate(conn, migrations[:1], "a") == 1
+    assert migrate(conn, migrations, "a") == 2
+    assert migrate(conn, migrations, "a") == 2  # up to date: nothing runs
+    assert applied == [1, 2]
+    assert migrate(conn, migrations, "b") == 2
+    assert applied == [1, 2, 1, 2]
+    assert (current_version(conn, "a"), current_version(conn, "c")) == (2, 0)
+
+
+def test_failed_migration_leaves_schema_as_it_was(conn):
+    def broken(c):
+        c.execute("CREATE TABLE half (x)")
+        raise RuntimeError("boom")
+
+    migrate(conn, [(1, "one", lambda c: None)])
+    with pytest.raises(RuntimeError):
+        migrate(conn, [(1, "one", lambda c: None), (2, "broken", broken)])
+    assert current_version(conn) == 1
+    assert table_columns(conn, "half") == {}
+
+
+def test_add_missing_columns(conn):
+    conn.execute("CREATE TABLE t (a TEXT)")
+    assert add_missing_columns(conn, "t", {"a": "TEXT", "b": "REAL"}) == ["b"]
+    assert table_columns(conn, "t") == {"a": "TEXT", "b": "REAL"}
+
+
+def test_category_rebuild_keeps_rejected_rows(conn):
+    # The untyped table older versions created with table_creater
+    conn.execute("CREATE TABLE category (id INTEGER PRIMARY KEY, name TEXT, datatype TEXT, null_status TEXT)")
+    conn.executemany("INSERT INTO category (name, datatype, null_status) VALUES (?, ?, ?)", [
+        ("size", "numbers", "1"), ("size", "text", "0"), (None, "text", "0"), ("colour", "text", ""),
+    ])
+    migrate(conn, CATALOG_MIGRATIONS)
+    assert conn.execute(f"SELECT id, name, datatype, null_status FROM {CATEGORY_TABLE} ORDER BY id").fetchall() == [
+        (1, "size", "numbers", 1), (4, "colour", "text", None),
+    ]
+    assert conn.execute("SELECT id, name FROM category__rejected ORDER BY id").fetchall() == [(2, "size"), (3, None)]
+
+
+def test_rebuild_without_rejects_makes_no_side_table(conn):
+    conn.execute("CREATE TABLE t (a TEXT)")
+    conn.execute("INSERT INTO t VALUES ('1')")
+    assert rebuild_table(conn, "t", "CREATE TABLE {table} (a INTEGER NOT NULL)", {"a": "INTEGER"}) == 0
+    assert conn.execute("SELECT a FROM t").fetchall() == [(1,)]
+    assert table_columns(conn, "t__rejected") == {}
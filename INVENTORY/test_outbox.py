@@ -0,0 +1,142 @@
+import time
+
+import pytest
+
+import outbox
+from outbox import OutboxRepository, coalesce
+from storage import FirebaseRepository
+
+T0 = "2026-01-01T10:00:00"
+T1 = "2026-01-01T10:05:00"
+T2 = "2026-01-01T10:10:00"
+
+
+def item(name, stamp):
+    return {"name": name, "group": "Tools", "characteristics": {}, "last_updated": stamp}
+
+
+class FlakyRemote(FirebaseRepository):
+    """Fake Firebase whose first `failures` batches fail, counting delta queries"""
+
+    def __init__(self, firebase, failures=0):
+        super().__init__(firebase)
+        self.failures = failures
+        self.queries = 0
+
+    def apply_batch(self, mutations):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("offline")
+        super().apply_batch(mutations)
+
+    def changes_since(self, since):
+        self.queries += 1
+        return super().changes_since(since)
+
+
+def open_outbox(path, remote, on_conflict=None, background=False):
+    box = OutboxRepository(remote, str(path), on_conflict)
+    if not background:
+        # Stop the flush thread, so the test decides when flush() runs
+        box.stopping = True
+        box.wake.set()
+        box.flusher.join()
+    return box
+
+
+@pytest.fixture
+def remote(firebase):
+    return FlakyRemote(firebase)
+
+
+def test_coalesce_folds_to_one_write_per_record():
+    folded = coalesce([
+        ("put_item", "a", item("Hammer", T0), T0),
+        ("update_item", "b", {"name": "Saw"}, T0),
+        ("update_item", "a", {"name": "Mallet", "last_updated": T1}, T1),
+        ("update_item", "b", {"colour": "red"}, T1),
+        ("put_item", "c", item("Drill", T0), T0),
+        ("delete_item", "c", T1, T1),
+        ("delete_item", "d", T0, T0),
+        ("update_item", "d", {"name": "Back"}, T1),
+        ("put_group", "a", {"name": "a"}, T0),
+    ])
+    assert folded == [
+        ("put_item", "a", item("Mallet", T1), T1),
+        ("update_item", "b", {"name": "Saw", "colour": "red"}, T1),
+        ("delete_item", "c", T1, T1),
+        ("put_item", "d", {"name": "Back"}, T1),
+        ("put_group", "a", {"name": "a"}, T0),  # a group, not item "a"
+    ]
+
+
+def test_flush_sends_queued_writes(tmp_path, remote):
+    box = open_outbox(tmp_path / "outbox.db", remote)
+    box.put_item("a", item("Hammer", T0))
+    box.update_item("a", {"name": "Mallet", "last_updated": T1})
+    box.delete_item("b", T1)
+    assert box.pending("item") == {"a": T1, "b": T1}
+    assert box.flush() == 2
+    assert box.pending_count() == 0
+    assert remote.get_item("a") == item("Mallet", T1)
+    assert remote.changes_since(T1)[3] == {"b": T1}
+    box.close()
+
+
+def test_stale_writes_are_dropped(tmp_path, remote):
+    remote.put_item("newer", item("Remote", T2))
+    remote.put_item("older", item("Remote", T0))
+    remote.delete_item("deleted", T2)
+    conflicts = []
+    box = open_outbox(tmp_path / "outbox.db", remote, lambda kind, key: conflicts.append((kind, key)))
+    box.apply_batch([
+        ("put_item", "newer", item("Local", T1)),
+        ("put_item", "older", item("Local", T1)),
+        ("update_item", "deleted", {"name": "Local", "last_updated": T1}),
+    ])
+    assert box.flush() == 1
+    assert sorted(conflicts) == [("item", "deleted"), ("item", "newer")]
+    assert remote.get_item("newer")["name"] == "Remote"
+    assert remote.get_item("older")["name"] == "Local"
+    assert remote.get_item("deleted") is None
+    box.close()
+
+
+def test_queued_writes_survive_a_restart(tmp_path, remote):
+    box = open_outbox(tmp_path / "outbox.db", remote)
+    box.put_item("a", item("Hammer", T0))
+    box.close()
+    assert remote.get_item("a") is None
+
+    box = open_outbox(tmp_path / "outbox.db", remote)
+    assert box.pending_count() == 1
+    box.flush()
+    assert remote.get_item("a") == item("Hammer", T0)
+    box.close()
+
+
+def test_failed_flush_keeps_writes_and_retries(tmp_path, firebase, monkeypatch):
+    monkeypatch.setattr(outbox, "RETRY_MIN_DELAY", 0.05)
+    remote = FlakyRemote(firebase, failures=2)
+    box = open_outbox(tmp_path / "outbox.db", remote, background=True)
+    box.put_item("a", item("Hammer", T0))
+    deadline = time.time() + 5
+    while box.pending_count() and time.time() < deadline:
+        time.sleep(0.02)
+    assert box.pending_count() == 0
+    assert remote.failures == 0
+    assert remote.get_item("a") == item("Hammer", T0)
+    box.close()
+
+
+def test_remote_changes_fetched_once_per_flush(tmp_path, remote, monkeypatch):
+    monkeypatch.setattr(outbox, "FLUSH_BATCH_SIZE", 10)
+    box = open_outbox(tmp_path / "outbox.db", remote)
+    box.apply_batch([("put_item", f"i{n:03}", item(f"Item {n}", T0)) for n in range(95)])
+    # A newer write to a record an earlier batch of this flush sent still goes out
+    box.put_item("i005", item("Newest", T1))
+    assert box.flush() == 96
+    assert remote.queries == 1
+    assert len(remote.load_all()[1]) == 95
+    assert remote.get_item("i005")["name"] == "Newest"
+    box.close()
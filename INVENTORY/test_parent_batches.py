@@ -0,0 +1,31 @@
+import pytest
+
+from TEST import Parent
+
+
+@pytest.fixture
+def parent(tmp_path):
+    parent = Parent(None, str(tmp_path / "mydb.db"))
+    parent.table_creater("parts", {"name": "text", "qty": "numbers"})
+    yield parent
+    parent.db.close()
+
+
+def test_upsert_modify_delete(parent):
+    assert parent.upsert_many("parts", ["name", "qty"], [("bolt", "1,000"), ("nut", "5")], ["name"]) == 2
+    parent.upsert_many("parts", ["name", "qty"], [("bolt", "7")], ["name"])
+    assert parent.modify_many("parts", ["qty"], [("8",)], "name", ["nut"]) == 1
+    assert [tuple(row) for row in parent.table_reader("parts", ["name", "qty"])] == [("bolt", 7), ("nut", 8)]
+    assert parent.delete_many("parts", "name", ["bolt", "missing"]) == 1
+
+
+@pytest.mark.parametrize("values, conditions", [
+    ([("1",), ("2",)], ["bolt"]),
+    ([("1",)], ["bolt", "nut"]),
+])
+def test_modify_many_rejects_length_mismatch(parent, values, conditions):
+    parent.upsert_many("parts", ["name", "qty"], [("bolt", "5"), ("nut", "5")], ["name"])
+    with pytest.raises(ValueError):
+        parent.modify_many("parts", ["qty"], values, "name", conditions)
+    # Nothing was written: the whole batch is rolled back
+    assert [row["qty"] for row in parent.table_reader("parts", ["qty"])] == [5, 5]
@@ -0,0 +1,68 @@
+from photo_uploads import PhotoUploader
+
+
+class HeldExecutor:
+    """Keeps submitted uploads so the test decides when each one runs"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, fn, *args):
+        self.jobs.append((fn, args))
+
+
+class FakeStorage:
+    def __init__(self, uploaded):
+        self.uploaded = uploaded
+        self.path = None
+
+    def child(self, path):
+        self.path = path
+        return self
+
+    def put(self, local_path):
+        self.uploaded.append(self.path)
+
+    def get_url(self, token):
+        return f"https://storage/{self.path}"
+
+
+class FakeApp:
+    def __init__(self):
+        self.uploaded = []
+
+    def storage(self):
+        return FakeStorage(self.uploaded)
+
+
+def make_uploader():
+    done = []
+    uploader = PhotoUploader(FakeApp(), on_status=lambda item_id: None,
+                             on_done=lambda *args: done.append(args))
+    uploader.executor = HeldExecutor()
+    return uploader, done
+
+
+def test_older_upload_does_not_drop_newer_one(tmp_path):
+    uploader, done = make_uploader()
+    photo = str(tmp_path / "missing.png")  # no thumbnail can be made; the photo still uploads
+    uploader.submit("a", photo)
+    uploader.submit("a", photo)
+    (old, old_args), (new, new_args) = uploader.executor.jobs
+
+    old(*old_args)
+    assert done == []  # superseded before it started
+    assert uploader.pending["a"] == new_args[2]
+    assert uploader.status["a"] == "Queued"
+
+    new(*new_args)
+    assert done == [("a", f"https://storage/{new_args[2]}", None)]
+    assert "a" not in uploader.pending and "a" not in uploader.status
+
+
+def test_finish_only_ends_its_own_upload():
+    uploader, _ = make_uploader()
+    uploader.pending["a"] = "inventory_photos/new.png"
+    assert not uploader._finish("a", "inventory_photos/old.png", "Upload failed")
+    assert uploader.pending == {"a": "inventory_photos/new.png"}
+    assert "a" not in uploader.status
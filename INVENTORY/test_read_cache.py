@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+from read_cache import ReadCache
+
+
+def test_get_loads_once_until_invalidated():
+    cache, loads = ReadCache(), []
+    load = lambda: loads.append(1) or len(loads)
+    assert cache.get("category", "all", load) == 1
+    assert cache.get("category", "all", load) == 1
+    assert cache.peek("category", "all") == 1
+    cache.invalidate("category")
+    assert cache.peek("category", "all") is None
+    assert cache.get("category", "all", load) == 2
+
+
+def test_load_overtaken_by_invalidate_is_not_stored():
+    cache = ReadCache()
+
+    def slow_load():
+        cache.invalidate("category")  # a write commits while the read is running
+        return "stale"
+
+    assert cache.get("category", "all", slow_load) == "stale"
+    assert cache.peek("category", "all") is None
+    cache.get("other", "all", lambda: "kept")
+    cache.invalidate()
+    assert cache.peek("other", "all") is None
+
+
+@pytest.fixture
+def db(tmp_path, chatgpt_text):
+    db = chatgpt_text.Database(str(tmp_path / "inventory.db"))
+    yield db
+    db.close()
+
+
+def test_category_list_is_cached_and_invalidated(db):
+    assert db.insert_category("size", "numbers", False)
+    assert [c["name"] for c in db.get_all_categories()] == ["size"]
+    assert not db.insert_category("size", "text", False)  # duplicate
+    assert db.insert_category("colour", "text", True)
+    assert [c["name"] for c in db.get_all_categories()] == ["colour", "size"]
+
+
+def test_failed_read_is_not_cached(db, chatgpt_text, monkeypatch):
+    count = chatgpt_text.CATEGORY_PAGE_SIZE + 50
+    with db.get_connection() as conn:
+        conn.executemany("INSERT INTO category (name, datatype) VALUES (?, 'text')",
+                         [(f"c{i:04}",) for i in range(count)])
+    read_page = db.get_categories_page
+
+    def failing_second_page(after=None, limit=chatgpt_text.CATEGORY_PAGE_SIZE):
+        if after is not None:
+            raise sqlite3.OperationalError("disk I/O error")
+        return read_page(after, limit)
+
+    monkeypatch.setattr(db, "get_categories_page", failing_second_page)
+    assert db.get_all_categories() == []  # not a truncated first page
+    assert db.cache.peek(chatgpt_text.CATEGORY_TABLE, "all") is None
+    monkeypatch.undo()
+    assert len(db.get_all_categories()) == count
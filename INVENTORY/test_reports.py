@@ -0,0 +1,145 @@
+import json
+import sqlite3
+
+import pytest
+
+from catalog_cache import CatalogCache
+from migrations import CATEGORY_TABLE
+from reports import Reports, rebuild_summaries
+from storage import SqliteRepository
+from TEST import Database as ParentDatabase
+
+SUMMARY_TABLES = ("report_groups", "report_categories", "report_low_stock")
+
+
+def item(group, name, stamp="T1", **characteristics):
+    return {"name": name, "group": group, "characteristics": characteristics, "last_updated": stamp}
+
+
+def summaries(conn):
+    return {table: sorted(map(tuple, conn.execute(f"SELECT * FROM {table}"))) for table in SUMMARY_TABLES}
+
+
+def assert_matches_rebuild(conn, items_table):
+    """The incrementally kept summaries equal ones recomputed from the items"""
+    kept = summaries(conn)
+    rebuild_summaries(conn, items_table)
+    assert summaries(conn) == kept
+    conn.rollback()
+
+
+def add_price_category(db_path, name):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"INSERT INTO {CATEGORY_TABLE} (name, datatype, null_status) VALUES (?, 'price', 0)", (name,))
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CatalogCache(str(tmp_path / "catalog_cache.db"))
+    cache.save_snapshot({}, {
+        "a": item("Tools", "Hammer", quantity="3", cost="10"),
+        "b": item("Tools", "Saw", quantity="20", cost="25.5"),
+        "c": item("Paint", "Blue", colour="blue"),
+    }, {}, "T1")
+    return cache
+
+
+def test_cache_snapshot_fills_summaries(cache):
+    reports = cache.reports(lambda: ["cost"])
+    assert reports.group_stock() == [
+        {"group_name": "Paint", "item_count": 1, "units": 1.0},
+        {"group_name": "Tools", "item_count": 2, "units": 23.0},
+    ]
+    assert reports.price_totals() == [
+        {"group_name": "Tools", "category": "cost", "item_count": 2, "total": 35.5, "stock_value": 540.0},
+    ]
+    assert [row["item_id"] for row in reports.low_stock()] == ["a"]
+
+
+def test_cache_changes_update_summaries(cache):
+    # An edit, a new item, a delete and a photo-only change, as main.py writes them
+    cache.apply_changes({}, {
+        "a": item("Tools", "Hammer", "T2", quantity="30", cost="10"),
+        "d": item("Paint", "Red", "T2", quantity="2", colour="red"),
+        "c": None,
+    }, None, "T2")
+    cache.apply_changes({}, {"b": {**item("Tools", "Saw", quantity="20", cost="25.5"), "photo_url": "x"}})
+
+    reports = cache.reports(lambda: [])
+    assert reports.group_stock() == [
+        {"group_name": "Paint", "item_count": 1, "units": 2.0},
+        {"group_name": "Tools", "item_count": 2, "units": 50.0},
+    ]
+    assert [row["item_id"] for row in reports.low_stock()] == ["d"]
+    assert reports.price_totals() == []
+    with cache.connect() as conn:
+        assert_matches_rebuild(conn, "items")
+
+
+def test_cache_clear_and_old_schema_drop_summaries(tmp_path, cache):
+    cache.clear()
+    assert cache.reports(lambda: []).group_stock() == []
+
+    path = str(tmp_path / "old.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript("""
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE items (id TEXT PRIMARY KEY, data TEXT NOT NULL);
+            INSERT INTO meta VALUES ('last_synced', 'T1');
+            PRAGMA user_version = 1;
+        """)
+        conn.execute("INSERT INTO items VALUES ('a', ?)", (json.dumps(item("Tools", "Hammer")),))
+    old = CatalogCache(path)
+    # Dropped with the rest of the version 1 cache, so the next start loads a full snapshot
+    assert old.load() == ({}, {}, {}, None)
+    assert old.reports(lambda: []).group_stock() == []
+
+
+def test_repository_writes_update_summaries(tmp_path):
+    path = str(tmp_path / "inventory.db")
+    repository = SqliteRepository(path)
+    add_price_category(path, "cost")
+    repository.apply_batch([("put_item", f"i{n}", item("Tools", f"Item {n}", quantity=str(n), cost="2"))
+                            for n in range(10)])
+    repository.update_item("i1", {"characteristics": {"quantity": "40", "cost": "2"}})
+    repository.put_item("p", item("Paint", "Blue"))
+    repository.delete_item("i2", "T2")
+
+    reports = Reports(repository.pool.get)
+    assert reports.group_stock() == [
+        {"group_name": "Paint", "item_count": 1, "units": 1.0},
+        {"group_name": "Tools", "item_count": 9, "units": 40.0 + sum(range(10)) - 1 - 2},
+    ]
+    assert reports.price_totals()[0]["total"] == 18.0
+    assert_matches_rebuild(repository.pool.get(), "inventory_items")
+    repository.close()
+
+
+@pytest.mark.parametrize("app", ["test", "chatgpt_text"])
+def test_ui_reports_read_the_app_catalog(tmp_path, cache, app, request):
+    db_path = str(tmp_path / "categories.db")
+    if app == "test":
+        database = ParentDatabase(db_path, cache.db_path)
+    else:
+        database = request.getfixturevalue("chatgpt_text").Database(db_path, cache.db_path)
+    add_price_category(db_path, "cost")
+
+    assert [row["group_name"] for row in database.reports.group_stock()] == ["Paint", "Tools"]
+    assert [row["category"] for row in database.reports.price_totals()] == ["cost"]
+    # Later writes by the app show up on the next read
+    cache.apply_changes({}, {"e": item("Garden", "Rake")})
+    assert [row["group_name"] for row in database.reports.group_stock()] == ["Garden", "Paint", "Tools"]
+    database.close()
+
+
+def test_export(tmp_path, cache):
+    reports = cache.reports(lambda: ["cost"])
+    written = reports.export(str(tmp_path / "out.csv"))
+    assert sorted(written) == sorted(str(tmp_path / f"out_{name}.csv")
+                                     for name in ("group_stock", "category_stock", "price_totals", "low_stock"))
+    with open(tmp_path / "out_group_stock.csv", encoding="utf-8") as f:
+        assert f.read().splitlines() == ["group_name,item_count,units", "Paint,1,1.0", "Tools,2,23.0"]
+
+    (path,) = reports.export(str(tmp_path / "out.json"))
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["low_stock"] == [{"item_id": "a", "group_name": "Tools", "name": "Hammer", "units": 3.0}]
@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from sql_builder import SqlBuilder, quote_identifier
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute('CREATE TABLE parts (id INTEGER PRIMARY KEY, name TEXT UNIQUE, qty NUMERIC, "odd ""col" TEXT)')
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def sql(conn):
+    return SqlBuilder(lambda: conn)
+
+
+def test_quote_identifier():
+    assert quote_identifier('odd "col') == '"odd ""col"'
+    for bad in ("", None, "a\x00b"):
+        with pytest.raises(ValueError):
+            quote_identifier(bad)
+
+
+def test_unknown_table_or_column_is_rejected(sql):
+    with pytest.raises(ValueError, match="No such table"):
+        sql.select("nope")
+    with pytest.raises(ValueError, match="No such column"):
+        sql.insert("parts", ["name", "name; DROP TABLE parts"])
+
+
+def test_statements_are_cached_per_shape(sql):
+    assert sql.select("parts", ["name"]) is sql.select("parts", ["name"])
+    assert sql.types("parts") == {"id": "INTEGER", "name": "TEXT", "qty": "NUMERIC", 'odd "col': "TEXT"}
+
+
+def test_invalidate_sees_new_columns(sql, conn):
+    sql.columns("parts")
+    conn.execute("ALTER TABLE parts ADD COLUMN colour TEXT")
+    with pytest.raises(ValueError):
+        sql.select("parts", ["colour"])
+    sql.invalidate("parts")
+    assert "colour" in sql.columns("parts")
+    sql.select("parts", ["colour"])
+
+
+def test_generated_sql_runs(sql, conn):
+    conn.executemany(sql.insert("parts", ["name", "qty", 'odd "col']), [("bolt", 5, "x"), ("nut", 9, "y")])
+    conn.execute(sql.upsert("parts", ["name", "qty"], ["name"]), ("bolt", 7))
+    conn.execute(sql.update("parts", ["qty"], "name"), (1, "nut"))
+    assert conn.execute(sql.select_range("parts", "qty", ["name"]), (0, 10)).fetchall() == [("nut",), ("bolt",)]
+    assert conn.execute(sql.select_range("parts", "qty", ["name"], high=False), (5,)).fetchall() == [("bolt",)]
+
+    first = conn.execute(sql.select_page("parts", ["name"], first=True), (1,)).fetchall()
+    assert first == [(1, "bolt")]
+    assert conn.execute(sql.select_page("parts", ["name"]), (first[-1][0], 1)).fetchall() == [(2, "nut")]
+
+    assert conn.execute(sql.select_sorted("parts", ["name"], "qty", True, [("name", "like")]),
+                        ("%o%", 10, 0)).fetchall() == [("bolt",)]
+    assert conn.execute(sql.count("parts", [("qty", "=")]), (1,)).fetchone() == (1,)
+    conn.execute(sql.delete("parts", "name"), ("bolt",))
+    assert conn.execute(sql.count("parts")).fetchone() == (1,)
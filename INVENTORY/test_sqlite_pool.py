@@ -0,0 +1,33 @@
+import sqlite3
+import threading
+
+import pytest
+
+from sqlite_pool import ConnectionPool
+
+
+def test_connection_is_reused_within_a_thread(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "a.db"))
+    assert pool.get() is pool.get()
+    pool.close_all()
+
+
+def test_connection_closes_when_its_thread_ends(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "a.db"))
+    opened = []
+    thread = threading.Thread(target=lambda: opened.append(pool.get()))
+    thread.start()
+    thread.join()
+    assert pool.connections == []
+    with pytest.raises(sqlite3.ProgrammingError):
+        opened[0].execute("SELECT 1")
+
+
+def test_close_all_closes_every_thread(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "a.db"))
+    conn = pool.get()
+    pool.close_all()
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert pool.get() is not conn  # a fresh one after closing
+    pool.close_all()
@@ -0,0 +1,88 @@
+import pytest
+
+from storage import FirebaseRepository, MemoryRepository, SqliteRepository
+
+T0 = "2026-01-01T10:00:00"
+T1 = "2026-01-01T10:05:00"
+
+
+@pytest.fixture(params=["memory", "sqlite", "firebase"])
+def store(request, tmp_path, firebase):
+    if request.param == "memory":
+        store = MemoryRepository()
+    elif request.param == "sqlite":
+        store = SqliteRepository(str(tmp_path / "inventory.db"))
+    else:
+        store = FirebaseRepository(firebase)
+    yield store
+    store.close()
+
+
+def item(name, stamp, **characteristics):
+    return {"name": name, "group": "Tools", "characteristics": characteristics, "last_updated": stamp}
+
+
+def test_items_round_trip(store):
+    store.put_group("Tools", {"name": "Tools", "characteristics": {}, "last_updated": T0})
+    store.put_item("a", item("Hammer", T0, weight=1.5))
+    store.update_item("a", {"name": "Mallet", "last_updated": T1})
+    assert store.get_item("a") == item("Mallet", T1, weight=1.5)
+    assert store.get_item("missing") is None
+    groups, items, _ = store.load_all()
+    assert set(groups) == {"Tools"} and set(items) == {"a"}
+    assert set(store.get_groups()) == {"Tools"}
+
+
+def test_changes_since_and_tombstones(store):
+    store.put_item("old", item("Old", T0))
+    store.put_item("new", item("New", T1))
+    store.put_item("a", item("Hammer", T0))
+    store.delete_item("a", T1)
+    groups, items, deleted_groups, deleted_items = store.changes_since(T1)
+    assert (groups, set(items), deleted_groups, deleted_items) == ({}, {"new"}, {}, {"a": T1})
+    assert store.get_item("a") is None
+
+
+def test_apply_batch(store):
+    store.apply_batch([
+        ("put_item", "a", item("Hammer", T0)),
+        ("put_item", "b", item("Saw", T0)),
+        ("set_global_characteristics", None, {"colour": {"type": "text"}}),
+    ])
+    store.apply_batch([("update_item", "a", {"name": "Mallet"}), ("delete_item", "b", T1)])
+    _, items, global_chars = store.load_all()
+    assert {item_id: record["name"] for item_id, record in items.items()} == {"a": "Mallet"}
+    assert global_chars == {"colour": {"type": "text"}}
+
+
+def test_categories(store):
+    store.put_category("size", "numbers", False)
+    store.put_category("colour", "text", True)
+    store.put_category("size", "text", True)
+    assert store.get_categories() == [
+        {"name": "colour", "datatype": "text", "null_status": 1},
+        {"name": "size", "datatype": "text", "null_status": 1},
+    ]
+    store.delete_category("colour")
+    assert [category["name"] for category in store.get_categories()] == ["size"]
+
+
+def test_memory_record_without_stamp():
+    store = MemoryRepository()
+    store.put_item("a", {"name": "Hammer", "last_updated": None})
+    assert store.changes_since(T0) == ({}, {}, {}, {})
+    assert set(store.changes_since("")[1]) == {"a"}
+
+
+def test_sqlite_category_writes_invalidate_the_screens_cache(tmp_path, chatgpt_text):
+    path = str(tmp_path / "inventory.db")
+    screens, store = chatgpt_text.Database(path), SqliteRepository(path)
+    try:
+        assert screens.get_all_categories() == []
+        store.put_category("size", "numbers", False)
+        assert [category["name"] for category in screens.get_all_categories()] == ["size"]
+        store.delete_category("size")
+        assert screens.get_all_categories() == []
+    finally:
+        store.close()
+        screens.close()
@@ -0,0 +1,155 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from storage import FirebaseRepository
+from sync import (SYNC_OVERLAP, fetch_changes, high_water_mark, merge_changes, query_mark, select_changes,
+                  snapshot_mark)
+
+T0 = "2026-01-01T10:00:00"
+T1 = "2026-01-01T10:05:00"
+T2 = "2026-01-01T10:10:00"
+T3 = "2026-01-01T10:15:00"
+
+
+def item(name, stamp, group="Tools"):
+    return {"name": name, "group": group, "characteristics": {}, "last_updated": stamp}
+
+
+def group(stamp, characteristics=None):
+    return {"name": "Tools", "characteristics": characteristics or {}, "last_updated": stamp}
+
+
+def make_group(name, data):
+    return SimpleNamespace(characteristics=data.get("characteristics", {}))
+
+
+def make_item(data):
+    return SimpleNamespace(**data)
+
+
+class Catalog:
+    """The local maps main.InventoryPro keeps; sync() follows load_inventory_data,
+    all merging done by the sync module"""
+
+    def __init__(self, store):
+        self.store = store
+        self.groups, self.items = {}, {}
+        self.last_synced = None
+        self.pending_items = {}
+
+    def sync(self):
+        if self.last_synced is None:
+            groups, items, _ = self.store.load_all()
+            self.groups = {name: make_group(name, data) for name, data in groups.items()}
+            self.items = {item_id: make_item(data) for item_id, data in items.items()}
+            self.last_synced = snapshot_mark(groups, items)
+            return set(items)
+        changes, self.last_synced = fetch_changes(self.store, self.last_synced)
+        _, changed_items, _, removed_items = merge_changes(
+            changes, self.groups, self.items, {}, self.pending_items, make_group, make_item
+        )
+        return set(changed_items) | removed_items
+
+
+@pytest.fixture
+def remote(firebase):
+    return FirebaseRepository(firebase)
+
+
+def test_full_load_then_delta(remote):
+    remote.put_group("Tools", group(T0))
+    remote.put_item("a", item("Hammer", T0))
+    remote.put_item("b", item("Saw", T1))
+    catalog = Catalog(remote)
+    assert catalog.sync() == {"a", "b"}
+    assert catalog.last_synced == T1
+
+    assert catalog.sync() == set()  # nothing new: records seen again are skipped
+
+    remote.put_item("c", item("Drill", T2))
+    remote.update_item("a", {"name": "Mallet", "last_updated": T2})
+    assert catalog.sync() == {"a", "c"}
+    assert catalog.items["a"].name == "Mallet"
+    assert catalog.last_synced == T2
+
+
+def test_delta_query_skips_old_records(remote):
+    remote.put_item("old", item("Old", "2025-01-01T00:00:00"))
+    remote.put_item("new", item("New", T1))
+    _, items, _, _ = remote.changes_since(query_mark(T1))
+    assert set(items) == {"new"}
+
+
+def test_start_at_is_inclusive(remote):
+    remote.put_item("a", item("Hammer", T1))
+    changes = remote.changes_since(T1)
+    assert set(changes[1]) == {"a"}
+    held = {"a": SimpleNamespace(last_updated=T1)}
+    assert select_changes(changes, {}, held, {}, {}) == ({}, {}, set(), set())
+
+
+def test_write_from_slow_clock_is_seen(remote):
+    remote.put_item("a", item("Hammer", T2))
+    catalog = Catalog(remote)
+    catalog.sync()
+    # Another terminal, its clock five minutes behind, writes after this sync
+    remote.put_item("b", item("Saw", T1))
+    assert catalog.sync() == {"b"}
+    assert catalog.last_synced == T2
+
+
+def test_overlap_window():
+    assert query_mark(T3) == (datetime.fromisoformat(T3) - SYNC_OVERLAP).isoformat()
+    assert query_mark("") == ""
+
+
+def test_tombstone_removes_older_record(remote):
+    remote.put_item("a", item("Hammer", T0))
+    catalog = Catalog(remote)
+    catalog.sync()
+    remote.delete_item("a", T1)
+    assert catalog.sync() == {"a"}
+    assert "a" not in catalog.items
+
+
+def test_record_newer_than_tombstone_stays(remote):
+    remote.put_group("Tools", group(T0))
+    catalog = Catalog(remote)
+    catalog.sync()
+    # Deleted, then re-created under the same name, both since the last sync
+    remote.delete_group("Tools", T1)
+    remote.put_group("Tools", group(T2))
+    catalog.sync()
+    assert "Tools" in catalog.groups
+
+
+def test_tombstone_newer_than_fetched_record_wins():
+    changes = ({}, {"a": item("Hammer", T1)}, {}, {"a": T2})
+    assert select_changes(changes, {}, {}, {}, {}) == ({}, {}, set(), {"a"})
+    changes = ({}, {"a": item("Hammer", T2)}, {}, {"a": T1})
+    assert select_changes(changes, {}, {}, {}, {}) == ({}, {"a": item("Hammer", T2)}, set(), set())
+
+
+def test_pending_local_write_beats_older_remote_changes():
+    held = {"a": SimpleNamespace(last_updated=T3)}
+    changes = ({}, {"a": item("Remote", T1)}, {}, {"a": T2})
+    assert select_changes(changes, {}, held, {}, {"a": T3}) == ({}, {}, set(), set())
+
+
+def test_high_water_mark_never_moves_back():
+    changes = ({}, {"a": item("Hammer", T1), "b": item("Saw", None)}, {}, {"c": T2})
+    assert high_water_mark(changes, T0) == T2
+    assert high_water_mark(({}, {}, {}, {}), T3) == T3
+    assert snapshot_mark({}, {}) == ""
+
+
+def test_merge_uses_the_given_item_hooks():
+    items = {"a": make_item(item("Hammer", T0)), "b": make_item(item("Saw", T0))}
+    calls = []
+    changes = ({}, {"a": item("Mallet", T1)}, {}, {"b": T1})
+    merge_changes(changes, {}, items, {}, {}, make_group, make_item,
+                  put_item=lambda item_id, value: calls.append(("put", item_id, value.name)),
+                  drop_item=lambda item_id: calls.append(("drop", item_id)))
+    assert calls == [("put", "a", "Mallet"), ("drop", "b")]
@@ -0,0 +1,44 @@
+import thumbnails
+from thumbnails import ThumbnailCache
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+def test_failed_download_backs_off(tmp_path, monkeypatch):
+    attempts = []
+
+    def urlopen(url, timeout):
+        attempts.append(url)
+        raise OSError("unreachable")
+
+    monkeypatch.setattr(thumbnails.urllib.request, "urlopen", urlopen)
+    cache = ThumbnailCache(on_ready=lambda url: None, cache_dir=str(tmp_path))
+    cache.executor = InlineExecutor()
+    url = "http://dead/a.jpg"
+    name = cache._filename(url)
+
+    for _ in range(5):
+        assert cache.get(url) is None
+    assert len(attempts) == 1  # renders before the retry time don't refetch
+    assert cache.failed[name][1] == thumbnails.RETRY_SECONDS
+
+    cache.failed[name] = (0.0, cache.failed[name][1])  # retry time reached
+    cache.get(url)
+    assert len(attempts) == 2
+    assert cache.failed[name][1] == 2 * thumbnails.RETRY_SECONDS
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_add_file_moves_thumbnail_in(tmp_path):
+    source = tmp_path / "elsewhere" / "thumb.jpg"
+    source.parent.mkdir()
+    source.write_bytes(b"x" * 10)
+    cache = ThumbnailCache(on_ready=lambda url: None, cache_dir=str(tmp_path / "cache"))
+    url = "http://host/thumb.jpg"
+    cache.add_file(url, str(source))
+    assert not source.exists()
+    assert cache.get(url) == str(tmp_path / "cache" / cache._filename(url))
+    assert cache.total_bytes == 10
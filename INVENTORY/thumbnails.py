@@ -0,0 +1,141 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from PIL import Image
+
+# ========== CONSTANTS ==========
+THUMB_SIZE = (300, 200)  # 2x the 150x100 grid tile
+THUMB_QUALITY = 80
+THUMB_CACHE_DIR = "thumb_cache"
+THUMB_CACHE_BYTES = 50 * 1024 * 1024
+# A url whose download failed isn't tried again for this long; doubles on every failure
+RETRY_SECONDS = 30.0
+MAX_RETRY_SECONDS = 3600.0
+
+
+def write_thumbnail(source, dest_path: str) -> None:
+    """Shrink an image (path or file object) to THUMB_SIZE and save it as JPEG"""
+    with Image.open(source) as image:
+        image.thumbnail(THUMB_SIZE)
+        image.convert("RGB").save(dest_path, "JPEG", quality=THUMB_QUALITY)
+
+
+def make_thumbnail(photo_path: str, dest_dir: Optional[str] = None) -> Optional[str]:
+    """Thumbnail of a local photo in a temp file (in dest_dir if given), or None
+    if it can't be read"""
+    fd, thumb_path = tempfile.mkstemp(suffix=".jpg", dir=dest_dir)
+    os.close(fd)
+    try:
+        write_thumbnail(photo_path, thumb_path)
+        return thumb_path
+    except (OSError, ValueError) as ex:
+        print(f"Thumbnail error: {ex}")
+        os.remove(thumb_path)
+        return None
+
+
+# ========== LOCAL THUMBNAIL CACHE ==========
+class ThumbnailCache:
+    """Disk LRU of small images keyed by url, capped at max_bytes.
+    get() never blocks: on a miss it returns None, downloads in the background
+    and calls on_ready(url) once the file is there. Whatever is downloaded is
+    shrunk to THUMB_SIZE first, so a full-size photo url (items saved before
+    thumbnails existed) also ends up as a small file."""
+
+    def __init__(self, on_ready: Callable[[str], None], cache_dir: str = THUMB_CACHE_DIR,
+                 max_bytes: int = THUMB_CACHE_BYTES, workers: int = 4):
+        self.on_ready = on_ready
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.loading = set()
+        # filename -> (monotonic time of the next attempt, current delay) for failed downloads
+        self.failed: Dict[str, Tuple[float, float]] = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+
+        os.makedirs(cache_dir, exist_ok=True)
+        # filename -> size, least recently used first (recency survives restarts via mtime)
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        files = [entry for entry in os.scandir(cache_dir) if entry.name.endswith(".jpg")]
+        for entry in sorted(files, key=lambda entry: entry.stat().st_mtime):
+            self.entries[entry.name] = entry.stat().st_size
+        self.total_bytes = sum(self.entries.values())
+
+    def _filename(self, url: str) -> str:
+        return hashlib.sha1(url.encode()).hexdigest() + ".jpg"
+
+    def get(self, url: str) -> Optional[str]:
+        """Local path of the thumbnail for url, or None while it is being fetched"""
+        name = self._filename(url)
+        path = os.path.join(self.cache_dir, name)
+        with self.lock:
+            if name in self.entries:
+                self.entries.move_to_end(name)
+                try:
+                    os.utime(path)
+                    return path
+                except OSError:
+                    # Removed behind our back; forget it and fetch again
+                    self.total_bytes -= self.entries.pop(name)
+            if name in self.failed and time.monotonic() < self.failed[name][0]:
+                return None  # failed recently; don't refetch on every render
+            if name in self.loading:
+                return None
+            self.loading.add(name)
+        # Outside the lock: _fetch takes it, and an executor may run it right here
+        self.executor.submit(self._fetch, url, name)
+        return None
+
+    def add_file(self, url: str, thumb_path: str) -> None:
+        """Adopt a thumbnail made locally (e.g. during upload) so it isn't downloaded again.
+        Moved rather than renamed, so it may come from another filesystem."""
+        name = self._filename(url)
+        shutil.move(thumb_path, os.path.join(self.cache_dir, name))
+        self._store(name)
+
+    def _fetch(self, url: str, name: str) -> None:
+        path = os.path.join(self.cache_dir, name)
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = response.read()
+            write_thumbnail(io.BytesIO(data), path + ".part")
+            os.replace(path + ".part", path)
+        except Exception as ex:
+            with self.lock:
+                delay = min(MAX_RETRY_SECONDS, self.failed[name][1] * 2) if name in self.failed else RETRY_SECONDS
+                self.failed[name] = (time.monotonic() + delay, delay)
+            print(f"Thumbnail download error, retrying in {delay:.0f}s: {ex}")
+            try:
+                os.remove(path + ".part")
+            except OSError:
+                pass
+            return
+        finally:
+            with self.lock:
+                self.loading.discard(name)
+        with self.lock:
+            self.failed.pop(name, None)
+        self._store(name)
+        self.on_ready(url)
+
+    def _store(self, name: str) -> None:
+        size = os.path.getsize(os.path.join(self.cache_dir, name))
+        with self.lock:
+            self.total_bytes += size - self.entries.pop(name, 0)
+            self.entries[name] = size
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                old_name, old_size = self.entries.popitem(last=False)
+                self.total_bytes -= old_size
+                try:
+                    os.remove(os.path.join(self.cache_dir, old_name))
+                except OSError:
+                    pass